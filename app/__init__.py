@@ -4,8 +4,10 @@ from flask import Flask
 from flask_login import LoginManager
 from flask_sqlalchemy import SQLAlchemy
 
+from app.utils.replica import RoutingSession
+
 # Initialize extensions
-db = SQLAlchemy()
+db = SQLAlchemy(session_options={"class_": RoutingSession})
 login_manager = LoginManager()
 
 
@@ -19,20 +21,57 @@ def create_app(test_config=None):
     else:
         app.config.update(test_config)
 
+    from app.utils.json_provider import FinanceJSONProvider
+
+    app.json = FinanceJSONProvider(app)
+
     # Ensure the instance folder exists
     try:
         os.makedirs(app.instance_path)
     except OSError:
         pass
 
+    from app.utils.database import engine_options, set_sqlite_pragmas, sqlite_pragmas
+
+    app.config["SQLALCHEMY_ENGINE_OPTIONS"] = engine_options(app.config)
+
     # Initialize extensions with app
     db.init_app(app)
     login_manager.init_app(app)
 
+    # Money columns resolve their storage on first use, and pragmas run as
+    # connections open, so set both up before anything connects
+    from app.utils.money import DEFAULT_MONEY_STORAGE, set_money_storage
+
+    pragmas = sqlite_pragmas(app.config)
+    with app.app_context():
+        for engine in db.engines.values():
+            set_money_storage(
+                engine, app.config.get("MONEY_STORAGE", DEFAULT_MONEY_STORAGE)
+            )
+            set_sqlite_pragmas(engine, pragmas)
+
     # Set up login manager
     login_manager.login_view = "auth.login"
     login_manager.login_message_category = "info"
 
+    # Rollup and data-version maintenance hook into the session, so load
+    # them before any write
+    from app.models import data_version, rollup  # noqa: F401
+    from app.utils.chart_cache import init_chart_cache
+    from app.utils.charts import init_render_pool
+    from app.utils.passwords import init_password_hasher
+    from app.utils.replica import init_read_replica
+    from app.utils.transaction_cache import init_transaction_cache
+    from app.utils.user_cache import init_user_cache
+
+    init_chart_cache(app)
+    init_transaction_cache(app)
+    init_user_cache(app)
+    init_render_pool(app)
+    init_password_hasher(app)
+    init_read_replica(app)
+
     # Register blueprints
     from app.routes import auth, charts, goals, main, transactions
 
@@ -42,8 +81,9 @@ def create_app(test_config=None):
     app.register_blueprint(goals.bp)
     app.register_blueprint(charts.bp)
 
-    # Create database tables
-    with app.app_context():
-        db.create_all()
+    # Register CLI commands
+    from app.cli import register_commands
+
+    register_commands(app)
 
     return app
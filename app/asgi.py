@@ -0,0 +1,254 @@
+"""ASGI application serving the read-only chart and stats JSON APIs asynchronously.
+
+A dashboard polls several of these endpoints at once and each spends most
+of its time waiting on the database. Here every request runs on an asyncio
+event loop over an async SQLAlchemy engine, so one worker multiplexes many
+polls. The datasets are built by the same functions the Flask routes use,
+run through ``AsyncSession.run_sync``: their queries go through the async
+driver and yield to the event loop while they wait.
+
+Every other path is handed to the Flask application (through asgiref when
+it is installed), so a single ASGI server can serve the whole site:
+
+    uvicorn asgi:app
+
+Needs SQLAlchemy's asyncio extra (greenlet) and an async driver for the
+database, such as aiosqlite or asyncpg.
+"""
+
+from contextlib import contextmanager
+from http.cookies import SimpleCookie
+from typing import Optional
+from urllib.parse import parse_qsl
+
+from sqlalchemy.engine import make_url
+from werkzeug.datastructures import MultiDict
+from werkzeug.http import http_date, is_resource_modified, quote_etag
+
+from app import create_app, db
+from app.routes.charts import (
+    BUNDLE_DATASETS,
+    build_bundle,
+    parse_bundle_specs,
+    parse_chart_params,
+)
+from app.utils.conditional import data_validators
+from app.utils.data_aggregation import get_goal_stats_data
+from app.utils.database import set_sqlite_pragmas, sqlite_pragmas
+from app.utils.money import DEFAULT_MONEY_STORAGE, set_money_storage
+from app.utils.user_cache import get_user_cache
+
+# Sync driver name -> the async driver used for the same database
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+    "mysql": "mysql+aiomysql",
+}
+
+CHART_API_PREFIX = "/charts/api/"
+BUNDLE_PATH = "/charts/api/bundle"
+GOAL_STATS_PATH = "/goals/api/stats"
+
+
+def async_database_uri(uri: str) -> str:
+    """Return uri with its driver swapped for the matching async driver"""
+    url = make_url(uri)
+    backend = url.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver known for {backend!r} databases")
+    return url.set(drivername=ASYNC_DRIVERS[backend]).render_as_string(
+        hide_password=False
+    )
+
+
+def session_user_id(app, cookie_header: str) -> Optional[int]:
+    """Return the logged-in user id stored in Flask's session cookie, if any"""
+    cookie = SimpleCookie()
+    cookie.load(cookie_header)
+    morsel = cookie.get(app.config["SESSION_COOKIE_NAME"])
+    if morsel is None:
+        return None
+    serializer = app.session_interface.get_signing_serializer(app)
+    try:
+        session = serializer.loads(
+            morsel.value,
+            max_age=int(app.permanent_session_lifetime.total_seconds()),
+        )
+        return int(session["_user_id"])
+    except Exception:
+        # Tampered, expired or logged out
+        return None
+
+
+def is_read_api(path: str) -> bool:
+    """Whether path is one of the JSON endpoints served here"""
+    if path == GOAL_STATS_PATH or path == BUNDLE_PATH:
+        return True
+    return path.startswith(CHART_API_PREFIX) and (
+        path[len(CHART_API_PREFIX) :] in BUNDLE_DATASETS
+    )
+
+
+@contextmanager
+def bound_session(app, session):
+    """Run Flask-SQLAlchemy code against session in a fresh app context
+
+    The aggregation functions use db.session and Model.query; both resolve
+    to session here.
+    """
+    with app.app_context():
+        db.session.registry.set(session)
+        try:
+            yield
+        finally:
+            db.session.registry.clear()
+
+
+def _build(user_id, path, args):
+    if path == GOAL_STATS_PATH:
+        return get_goal_stats_data(user_id)
+    if path == BUNDLE_PATH:
+        return build_bundle(user_id, parse_bundle_specs(args.getlist("chart")))
+
+    kind = path[len(CHART_API_PREFIX) :]
+    return BUNDLE_DATASETS[kind][0](user_id, **parse_chart_params(kind, args))
+
+
+def handle_read(app, session, user_id, path, args, headers):
+    """Answer one read API request using session
+
+    Synchronous, so it can run through AsyncSession.run_sync, or directly
+    on a sync session. headers are the request's headers in WSGI environ
+    form. Returns (status, payload, response headers); payload is None for
+    responses without a body.
+    """
+    with bound_session(app, session):
+        if get_user_cache().load(user_id) is None:
+            return 401, {"error": "Sign in to use this API"}, {}
+
+        # The same validators as conditional_on_data_version, so ETags
+        # carry over between the WSGI and ASGI servers; as there, only the
+        # ETag can produce a 304
+        etag, last_modified = data_validators(
+            user_id, path, sorted(args.items(multi=True))
+        )
+        validators = {
+            "ETag": quote_etag(etag),
+            "Last-Modified": http_date(last_modified),
+            "Cache-Control": "private, no-cache",
+        }
+        if not is_resource_modified(headers, etag=etag):
+            return 304, None, validators
+
+        try:
+            payload = _build(user_id, path, args)
+        except ValueError as exc:
+            return 400, {"error": str(exc)}, {}
+        return 200, payload, validators
+
+
+class AsyncReadAPI:
+    """The ASGI application: read APIs on the event loop, the rest via Flask"""
+
+    def __init__(self, app, engine, fallback=None):
+        self.app = app
+        self.engine = engine
+        self.fallback = fallback
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            await self._lifespan(receive, send)
+        elif (
+            scope["type"] == "http"
+            and scope["method"] in ("GET", "HEAD")
+            and is_read_api(scope["path"])
+        ):
+            await self._read_api(scope, send)
+        elif self.fallback is not None:
+            await self.fallback(scope, receive, send)
+        else:
+            await self._send(send, 404, {"error": "Not found"}, {}, scope)
+
+    async def _read_api(self, scope, send):
+        from sqlalchemy.ext.asyncio import AsyncSession
+
+        headers = {}
+        for name, value in scope["headers"]:
+            key = "HTTP_" + name.decode("latin-1").upper().replace("-", "_")
+            headers[key] = value.decode("latin-1")
+
+        user_id = session_user_id(self.app, headers.get("HTTP_COOKIE", ""))
+        if user_id is None:
+            await self._send(send, 401, {"error": "Sign in to use this API"}, {}, scope)
+            return
+
+        args = MultiDict(
+            parse_qsl(scope["query_string"].decode("latin-1"), keep_blank_values=True)
+        )
+        async with AsyncSession(self.engine) as session:
+            status, payload, extra = await session.run_sync(
+                lambda sync_session: handle_read(
+                    self.app, sync_session, user_id, scope["path"], args, headers
+                )
+            )
+        await self._send(send, status, payload, extra, scope)
+
+    async def _send(self, send, status, payload, extra, scope):
+        body = b""
+        headers = [
+            (name.lower().encode(), value.encode()) for name, value in extra.items()
+        ]
+        if payload is not None or status == 200:
+            body = self.app.json.dumps(payload).encode() + b"\n"
+            headers.append((b"content-type", self.app.json.mimetype.encode()))
+        headers.append((b"content-length", str(len(body)).encode()))
+        await send(
+            {"type": "http.response.start", "status": status, "headers": headers}
+        )
+        await send(
+            {
+                "type": "http.response.body",
+                "body": b"" if scope.get("method") == "HEAD" else body,
+            }
+        )
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                await self.engine.dispose()
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+
+def create_asgi_app(app=None) -> AsyncReadAPI:
+    """Wrap the Flask app (created from config when None) for ASGI servers
+
+    ASYNC_DATABASE_URI overrides the async engine's URI, which otherwise is
+    SQLALCHEMY_DATABASE_URI with the matching async driver.
+    """
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    if app is None:
+        app = create_app()
+    uri = app.config.get("ASYNC_DATABASE_URI") or async_database_uri(
+        app.config["SQLALCHEMY_DATABASE_URI"]
+    )
+    engine = create_async_engine(uri, **app.config.get("ASYNC_ENGINE_OPTIONS", {}))
+    set_money_storage(
+        engine.sync_engine, app.config.get("MONEY_STORAGE", DEFAULT_MONEY_STORAGE)
+    )
+    set_sqlite_pragmas(engine.sync_engine, sqlite_pragmas(app.config))
+
+    try:
+        from asgiref.wsgi import WsgiToAsgi
+    except ImportError:  # pragma: no cover - optional dependency
+        fallback = None
+        app.logger.warning(
+            "asgiref is not installed; the ASGI app serves only the read APIs"
+        )
+    else:
+        fallback = WsgiToAsgi(app)
+    return AsyncReadAPI(app, engine, fallback)
@@ -0,0 +1,146 @@
+import click
+from flask.cli import AppGroup
+
+from app import db, migrations
+from app.models.rollup import rebuild_monthly_rollups
+from app.models.user import User
+from app.utils import importer
+from app.utils.money import (
+    MONEY_STORAGES,
+    convert_money_storage,
+    money_columns,
+    money_storage,
+    stored_money_storage,
+)
+
+rollups_cli = AppGroup("rollups", help="Maintain the monthly transaction rollups.")
+transactions_cli = AppGroup("transactions", help="Bulk transaction maintenance.")
+money_cli = AppGroup("money", help="Change how money amounts are stored.")
+db_cli = AppGroup("db", help="Create and migrate the database schema.")
+
+
+def check_money_storage():
+    """Warn when the database stores money differently from MONEY_STORAGE"""
+    configured = money_storage(db.engine.dialect)
+    with db.engine.connect() as connection:
+        for table, column in money_columns(db.metadata):
+            stored = stored_money_storage(connection, table, column)
+            if stored != configured:
+                click.echo(
+                    f"Warning: {table.name}.{column.name} is stored as {stored} "
+                    f"but MONEY_STORAGE is {configured}; run 'flask money convert "
+                    f"--to {configured}' or change the setting.",
+                    err=True,
+                )
+                return
+
+
+@db_cli.command("upgrade")
+@click.option("--to", "target", type=int, help="Stop after this migration version.")
+def upgrade_command(target):
+    """Apply pending schema migrations."""
+    applied = migrations.upgrade(db.engine, target)
+    for migration in applied:
+        click.echo(f"Applied {migration.name}: {migration.description}")
+    if not applied:
+        click.echo("The database schema is up to date.")
+    check_money_storage()
+
+
+@db_cli.command("current")
+def current_command():
+    """Show the applied and pending schema migrations."""
+    with db.engine.connect() as connection:
+        applied = migrations.applied_versions(connection)
+    for migration in migrations.load_migrations():
+        state = "applied" if migration.version in applied else "pending"
+        click.echo(f"{migration.name} ({state}): {migration.description}")
+
+
+@db_cli.command("stamp")
+@click.argument("version", type=click.IntRange(min=0))
+def stamp_command(version):
+    """Mark migrations up to VERSION as applied without running them."""
+    try:
+        migrations.stamp(db.engine, version)
+    except ValueError as exc:
+        raise click.BadParameter(str(exc), param_hint="VERSION") from exc
+    click.echo(f"Stamped the database at version {version}.")
+
+
+@rollups_cli.command("rebuild")
+@click.option("--user-id", type=int, help="Only rebuild rollups for this user.")
+def rebuild_rollups_command(user_id):
+    """Recompute monthly rollups from the transaction table."""
+    count = rebuild_monthly_rollups(user_id)
+    click.echo(f"Rebuilt {count} monthly rollup rows.")
+
+
+@transactions_cli.command("import")
+@click.argument("path", type=click.Path(exists=True, dir_okay=False))
+@click.option("--user-id", type=int, required=True, help="Owner of the transactions.")
+@click.option(
+    "--format",
+    "file_format",
+    type=click.Choice(importer.FORMATS),
+    help="File format; guessed from the file extension by default.",
+)
+@click.option(
+    "--chunk-size",
+    type=click.IntRange(min=1),
+    default=importer.DEFAULT_CHUNK_SIZE,
+    show_default=True,
+    help="Rows inserted and committed per batch.",
+)
+@click.option("--encoding", default="utf-8-sig", show_default=True)
+def import_transactions_command(path, user_id, file_format, chunk_size, encoding):
+    """Import a CSV, OFX or QIF bank export into a user's transactions."""
+    if User.query.get(user_id) is None:
+        raise click.BadParameter(f"No user with id {user_id}", param_hint="--user-id")
+
+    file_format = file_format or importer.detect_format(path)
+    if file_format is None:
+        raise click.BadParameter(
+            "Cannot tell the format from the file name", param_hint="--format"
+        )
+
+    with open(path, encoding=encoding, errors="replace", newline="") as stream:
+        result = importer.import_transactions(user_id, stream, file_format, chunk_size)
+
+    for line, message in result.errors:
+        click.echo(f"line {line}: {message}", err=True)
+    click.echo(
+        f"Imported {result.imported} transactions, skipped {result.failed} rows"
+        f" in {result.elapsed:.2f}s ({result.rows_per_second:,.0f} rows/s)."
+    )
+
+
+@money_cli.command("convert")
+@click.option(
+    "--to",
+    "storage",
+    type=click.Choice(MONEY_STORAGES),
+    required=True,
+    help="decimal for NUMERIC(p, 2) columns, cents for integer cents.",
+)
+def convert_money_command(storage):
+    """Rewrite every stored amount in the given representation."""
+    try:
+        with db.engine.begin() as connection:
+            tables = convert_money_storage(connection, db.metadata, storage)
+    except NotImplementedError as exc:
+        raise click.ClickException(str(exc)) from exc
+
+    if tables:
+        click.echo(f"Converted {', '.join(tables)} to {storage} storage.")
+    else:
+        click.echo(f"Money is already stored as {storage}.")
+    click.echo(f"Set MONEY_STORAGE = {storage!r} in the configuration to match.")
+
+
+def register_commands(app):
+    """Attach the application's CLI command groups"""
+    app.cli.add_command(rollups_cli)
+    app.cli.add_command(transactions_cli)
+    app.cli.add_command(money_cli)
+    app.cli.add_command(db_cli)
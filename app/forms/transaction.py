@@ -1,7 +1,8 @@
-from datetime import date, datetime
+from datetime import date, datetime, timedelta
 from decimal import Decimal, InvalidOperation
 
 from flask_wtf import FlaskForm
+from flask_wtf.file import FileAllowed, FileField, FileRequired
 from wtforms import (
     DateField,
     DecimalField,
@@ -13,6 +14,70 @@ from wtforms import (
 )
 from wtforms.validators import DataRequired, Length, NumberRange, ValidationError
 
+INCOME_CATEGORIES = [
+    ("salary", "Salary"),
+    ("freelance", "Freelance"),
+    ("business", "Business"),
+    ("investment", "Investment"),
+    ("gift", "Gift"),
+    ("other_income", "Other Income"),
+]
+
+EXPENSE_CATEGORIES = [
+    ("food", "Food & Dining"),
+    ("transportation", "Transportation"),
+    ("shopping", "Shopping"),
+    ("entertainment", "Entertainment"),
+    ("bills", "Bills & Utilities"),
+    ("healthcare", "Healthcare"),
+    ("education", "Education"),
+    ("travel", "Travel"),
+    ("housing", "Housing"),
+    ("insurance", "Insurance"),
+    ("other_expense", "Other Expense"),
+]
+
+AMOUNT_MIN = Decimal("0.01")
+AMOUNT_MAX = Decimal("999999.99")
+DESCRIPTION_MIN_LENGTH = 2
+DESCRIPTION_MAX_LENGTH = 200
+NOTES_MAX_LENGTH = 500
+
+
+# Field rules shared by TransactionForm and the bulk importer, which checks
+# plain values without building a form per row
+def check_transaction_date(value):
+    """Validate that date is neither in the future nor over 5 years old"""
+    if value > date.today():
+        raise ValidationError("Transaction date cannot be in the future")
+
+    five_years_ago = date.today() - timedelta(days=365 * 5)
+    if value < five_years_ago:
+        raise ValidationError("Transaction date cannot be more than 5 years ago")
+
+
+def check_amount(value):
+    """Validate that amount is a number with at most 2 decimal places"""
+    try:
+        decimal_amount = Decimal(str(value))
+    except (InvalidOperation, ValueError):
+        decimal_amount = None
+    if decimal_amount is None or not decimal_amount.is_finite():
+        raise ValidationError("Please enter a valid amount")
+
+    # Ensure amount has at most 2 decimal places
+    if decimal_amount.as_tuple().exponent < -2:
+        raise ValidationError("Amount cannot have more than 2 decimal places")
+
+
+def check_category(transaction_type, category):
+    """Validate that category is one of the choices for transaction_type"""
+    choices = INCOME_CATEGORIES if transaction_type == "income" else EXPENSE_CATEGORIES
+    if category not in [value for value, label in choices]:
+        raise ValidationError(
+            "Please select a valid category for this transaction type"
+        )
+
 
 class TransactionForm(FlaskForm):
     type = SelectField(
@@ -26,8 +91,8 @@ class TransactionForm(FlaskForm):
         validators=[
             DataRequired(message="Description is required"),
             Length(
-                min=2,
-                max=200,
+                min=DESCRIPTION_MIN_LENGTH,
+                max=DESCRIPTION_MAX_LENGTH,
                 message="Description must be between 2 and 200 characters",
             ),
         ],
@@ -38,8 +103,8 @@ class TransactionForm(FlaskForm):
         validators=[
             DataRequired(message="Amount is required"),
             NumberRange(
-                min=0.01,
-                max=999999.99,
+                min=AMOUNT_MIN,
+                max=AMOUNT_MAX,
                 message="Amount must be between $0.01 and $999,999.99",
             ),
         ],
@@ -60,87 +125,52 @@ class TransactionForm(FlaskForm):
 
     notes = TextAreaField(
         "Notes (Optional)",
-        validators=[Length(max=500, message="Notes cannot exceed 500 characters")],
+        validators=[
+            Length(max=NOTES_MAX_LENGTH, message="Notes cannot exceed 500 characters")
+        ],
     )
 
     submit = SubmitField("Save Transaction")
 
     def validate_date(self, date_field):
         """Validate that date is not in the future"""
-        if date_field.data > date.today():
-            raise ValidationError("Transaction date cannot be in the future")
-
-        # Don't allow dates older than 5 years
-        from datetime import timedelta
-
-        five_years_ago = date.today() - timedelta(days=365 * 5)
-        if date_field.data < five_years_ago:
-            raise ValidationError("Transaction date cannot be more than 5 years ago")
+        check_transaction_date(date_field.data)
 
     def validate_amount(self, amount_field):
         """Additional amount validation"""
         if amount_field.data:
-            try:
-                # Ensure amount has at most 2 decimal places
-                decimal_amount = Decimal(str(amount_field.data))
-                if decimal_amount.as_tuple().exponent < -2:
-                    raise ValidationError(
-                        "Amount cannot have more than 2 decimal places"
-                    )
-            except (InvalidOperation, ValueError):
-                raise ValidationError("Please enter a valid amount")
+            check_amount(amount_field.data)
 
     def validate_category(self, category_field):
         """Validate category based on transaction type"""
         if self.type.data and category_field.data:
-            valid_categories = []
-            if self.type.data == "income":
-                valid_categories = [choice[0] for choice in self.income_categories]
-            elif self.type.data == "expense":
-                valid_categories = [choice[0] for choice in self.expense_categories]
-
-            if category_field.data not in [
-                cat[1]
-                for cat in (
-                    self.income_categories
-                    if self.type.data == "income"
-                    else self.expense_categories
-                )
-            ]:
-                raise ValidationError(
-                    "Please select a valid category for this transaction type"
-                )
+            check_category(self.type.data, category_field.data)
 
     def __init__(self, *args, **kwargs):
         super(TransactionForm, self).__init__(*args, **kwargs)
 
         # Define category choices based on transaction type
-        self.income_categories = [
-            ("salary", "Salary"),
-            ("freelance", "Freelance"),
-            ("business", "Business"),
-            ("investment", "Investment"),
-            ("gift", "Gift"),
-            ("other_income", "Other Income"),
-        ]
-
-        self.expense_categories = [
-            ("food", "Food & Dining"),
-            ("transportation", "Transportation"),
-            ("shopping", "Shopping"),
-            ("entertainment", "Entertainment"),
-            ("bills", "Bills & Utilities"),
-            ("healthcare", "Healthcare"),
-            ("education", "Education"),
-            ("travel", "Travel"),
-            ("housing", "Housing"),
-            ("insurance", "Insurance"),
-            ("other_expense", "Other Expense"),
-        ]
+        self.income_categories = list(INCOME_CATEGORIES)
+        self.expense_categories = list(EXPENSE_CATEGORIES)
 
         # Set default categories (will be updated via JavaScript)
         self.category.choices = self.expense_categories
 
 
+class ImportTransactionsForm(FlaskForm):
+    file = FileField(
+        "Bank Export File",
+        validators=[
+            FileRequired(message="Please choose a file to import"),
+            FileAllowed(
+                ["csv", "ofx", "qfx", "qif"],
+                message="Only CSV, OFX/QFX and QIF files can be imported",
+            ),
+        ],
+    )
+
+    submit = SubmitField("Import Transactions")
+
+
 class DeleteTransactionForm(FlaskForm):
     submit = SubmitField("Delete Transaction")
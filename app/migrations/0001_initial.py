@@ -0,0 +1,144 @@
+"""Create the users, transactions, goals, rollups and data versions tables
+
+The schema as it stood before migrations were introduced. Tables and
+indexes that already exist are left alone, so databases created by
+earlier versions of the app can be upgraded too; their monthly rollups
+are recomputed from the transactions they already hold.
+"""
+
+from sqlalchemy import (
+    Column,
+    Date,
+    DateTime,
+    ForeignKey,
+    Index,
+    Integer,
+    MetaData,
+    String,
+    Table,
+    Text,
+    UniqueConstraint,
+    delete,
+    extract,
+    func,
+    insert,
+    select,
+)
+
+from app.utils.money import MoneyType
+
+metadata = MetaData()
+
+Table(
+    "user",
+    metadata,
+    Column("id", Integer, primary_key=True),
+    Column("username", String(64), unique=True, nullable=False),
+    Column("password_hash", String(128), nullable=False),
+    Column("created_at", DateTime),
+)
+
+Table(
+    "transaction",
+    metadata,
+    Column("id", Integer, primary_key=True),
+    Column("type", String(10), nullable=False),
+    Column("category", String(50), nullable=False),
+    Column("amount", MoneyType(precision=10), nullable=False),
+    Column("date", Date, nullable=False),
+    Column("description", Text, nullable=False),
+    Column("notes", Text),
+    Column("created_at", DateTime),
+    Column("user_id", Integer, ForeignKey("user.id"), nullable=False),
+    Index("ix_transaction_user_date_created", "user_id", "date", "created_at"),
+    Index("ix_transaction_user_type_date", "user_id", "type", "date"),
+    Index("ix_transaction_user_category", "user_id", "category"),
+)
+
+Table(
+    "goal",
+    metadata,
+    Column("id", Integer, primary_key=True),
+    Column("name", String(100), nullable=False),
+    Column("description", Text),
+    Column("target_amount", MoneyType(precision=10), nullable=False),
+    Column("current_amount", MoneyType(precision=10), nullable=False),
+    Column("deadline", Date, nullable=False),
+    Column("status", String(20), nullable=False),
+    Column("created_at", DateTime),
+    Column("user_id", Integer, ForeignKey("user.id"), nullable=False),
+    Index("ix_goal_user_status_deadline", "user_id", "status", "deadline"),
+)
+
+Table(
+    "monthly_rollup",
+    metadata,
+    Column("id", Integer, primary_key=True),
+    Column("user_id", Integer, ForeignKey("user.id"), nullable=False),
+    Column("month", String(7), nullable=False),
+    Column("type", String(10), nullable=False),
+    Column("category", String(50), nullable=False),
+    Column("total", MoneyType(precision=14), nullable=False),
+    Column("count", Integer, nullable=False),
+    UniqueConstraint(
+        "user_id", "month", "type", "category", name="uq_monthly_rollup_key"
+    ),
+)
+
+Table(
+    "data_version",
+    metadata,
+    Column("user_id", Integer, ForeignKey("user.id"), primary_key=True),
+    Column("version", Integer, nullable=False),
+    Column("updated_at", DateTime, nullable=False),
+)
+
+
+def backfill_monthly_rollups(connection):
+    """Recompute every monthly_rollup row from the transaction table
+
+    Rollups are only updated as transactions are written, so transactions
+    stored before the table existed would be missing from chart totals.
+    """
+    transaction = metadata.tables["transaction"]
+    rollup = metadata.tables["monthly_rollup"]
+    year = extract("year", transaction.c.date).label("year")
+    month = extract("month", transaction.c.date).label("month")
+    key = (
+        transaction.c.user_id,
+        year,
+        month,
+        transaction.c.type,
+        transaction.c.category,
+    )
+
+    query = select(
+        *key,
+        func.sum(transaction.c.amount).label("total"),
+        func.count(transaction.c.id).label("count"),
+    ).group_by(*key)
+    rows = [
+        {
+            "user_id": row.user_id,
+            "month": f"{int(row.year):04d}-{int(row.month):02d}",
+            "type": row.type,
+            "category": row.category,
+            "total": row.total,
+            "count": row.count,
+        }
+        for row in connection.execute(query)
+    ]
+
+    connection.execute(delete(rollup))
+    if rows:
+        connection.execute(insert(rollup), rows)
+
+
+def upgrade(connection):
+    metadata.create_all(connection)
+    # create_all only indexes the tables it creates; older databases may
+    # predate some of the indexes
+    for table in metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(connection, checkfirst=True)
+    backfill_monthly_rollups(connection)
@@ -0,0 +1,134 @@
+"""Versioned schema migrations, applied with ``flask db upgrade``.
+
+Each migration is a module in this package named ``NNNN_description.py``
+with an ``upgrade(connection)`` function and a one-line docstring. Pending
+migrations run in version order, each in its own transaction, and every
+applied version is recorded in the schema_version table.
+
+The application does not create or inspect tables when it starts, so any
+model change needs a migration here.
+"""
+
+import importlib
+import pkgutil
+import re
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Callable, List, Optional, Set
+
+from sqlalchemy import (
+    Column,
+    DateTime,
+    Integer,
+    MetaData,
+    String,
+    Table,
+    delete,
+    insert,
+    inspect,
+    select,
+)
+
+_MODULE_NAME = re.compile(r"(\d{4})_\w+")
+
+_metadata = MetaData()
+
+schema_version = Table(
+    "schema_version",
+    _metadata,
+    Column("version", Integer, primary_key=True, autoincrement=False),
+    Column("name", String(100), nullable=False),
+    Column("applied_at", DateTime, nullable=False),
+)
+
+
+@dataclass(frozen=True)
+class Migration:
+    """One migration module"""
+
+    version: int
+    name: str
+    description: str
+    upgrade: Callable
+
+
+def load_migrations() -> List[Migration]:
+    """Return the migrations in this package, oldest first"""
+    migrations = []
+    for module_info in pkgutil.iter_modules(__path__):
+        match = _MODULE_NAME.fullmatch(module_info.name)
+        if match is None:
+            continue
+        module = importlib.import_module(f"{__name__}.{module_info.name}")
+        migrations.append(
+            Migration(
+                version=int(match[1]),
+                name=module_info.name,
+                description=(module.__doc__ or "").strip().split("\n")[0],
+                upgrade=module.upgrade,
+            )
+        )
+    migrations.sort(key=lambda migration: migration.version)
+    versions = [migration.version for migration in migrations]
+    if len(set(versions)) != len(versions):
+        raise RuntimeError("Two migrations share a version number")
+    return migrations
+
+
+def applied_versions(connection) -> Set[int]:
+    """Return the versions recorded as applied to the database"""
+    if not inspect(connection).has_table(schema_version.name):
+        return set()
+    return set(connection.scalars(select(schema_version.c.version)))
+
+
+def pending_migrations(connection, target: Optional[int] = None) -> List[Migration]:
+    """Return the migrations up to target (default: all) not yet applied"""
+    applied = applied_versions(connection)
+    return [
+        migration
+        for migration in load_migrations()
+        if migration.version not in applied
+        and (target is None or migration.version <= target)
+    ]
+
+
+def _record(connection, migration):
+    connection.execute(
+        insert(schema_version).values(
+            version=migration.version,
+            name=migration.name,
+            applied_at=datetime.now(timezone.utc),
+        )
+    )
+
+
+def upgrade(engine, target: Optional[int] = None) -> List[Migration]:
+    """Apply pending migrations up to target on engine; return those applied"""
+    with engine.begin() as connection:
+        _metadata.create_all(connection)
+        pending = pending_migrations(connection, target)
+
+    for migration in pending:
+        with engine.begin() as connection:
+            migration.upgrade(connection)
+            _record(connection, migration)
+    return pending
+
+
+def stamp(engine, target: int) -> None:
+    """Record exactly the migrations up to target as applied, running none
+
+    For databases whose schema was created some other way, such as by
+    db.create_all() or from a restored dump.
+    """
+    migrations = load_migrations()
+    if target and target not in {migration.version for migration in migrations}:
+        raise ValueError(f"No migration with version {target}")
+
+    with engine.begin() as connection:
+        _metadata.create_all(connection)
+        connection.execute(delete(schema_version))
+        for migration in migrations:
+            if migration.version <= target:
+                _record(connection, migration)
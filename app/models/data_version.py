@@ -0,0 +1,102 @@
+from datetime import datetime, timezone
+
+from blinker import Namespace
+from sqlalchemy import event, inspect
+
+from app import db
+from app.models.goal import Goal
+from app.models.transaction import Transaction
+from app.utils.upsert import upsert
+
+_signals = Namespace()
+
+# Sent after a commit that changed transactions or goals, with user_ids=set()
+data_changed = _signals.signal("data-changed")
+
+# Models whose writes change what a user's charts and stats show
+VERSIONED_MODELS = (Transaction, Goal)
+
+_CHANGED_KEY = "data_version_changed_users"
+
+
+class DataVersion(db.Model):
+    """Per-user counter bumped whenever the user's transactions or goals change"""
+
+    user_id = db.Column(db.Integer, db.ForeignKey("user.id"), primary_key=True)
+    version = db.Column(db.Integer, default=0, nullable=False)
+    updated_at = db.Column(
+        db.DateTime, default=lambda: datetime.now(timezone.utc), nullable=False
+    )
+
+    def __repr__(self):
+        return f"<DataVersion {self.user_id}: {self.version}>"
+
+
+def get_data_version(user_id):
+    """Return (version, updated_at) for a user; (0, None) before any write"""
+    row = db.session.execute(
+        db.select(DataVersion.version, DataVersion.updated_at).where(
+            DataVersion.user_id == user_id
+        )
+    ).first()
+    if row is None:
+        return 0, None
+    return row.version, row.updated_at
+
+
+def bump_data_versions(connection, user_ids):
+    """Increment the data version of each user on connection"""
+    table = DataVersion.__table__
+    now = datetime.now(timezone.utc)
+    for user_id in sorted(user_ids):
+        upsert(
+            connection,
+            table,
+            {"user_id": user_id, "version": 1, "updated_at": now},
+            ("user_id",),
+            lambda new: {"version": table.c.version + 1, "updated_at": new.updated_at},
+        )
+
+
+def _owners(obj):
+    """Return the user ids whose data a pending change to obj affects"""
+    history = inspect(obj).attrs.user_id.history
+    return {
+        user_id for user_id in (obj.user_id, *history.deleted) if user_id is not None
+    }
+
+
+@event.listens_for(db.session, "after_flush")
+def _bump_changed_users(session, flush_context):
+    """Bump the data version of every user touched by this flush"""
+    user_ids = set()
+    for obj in session.new | session.deleted:
+        if isinstance(obj, VERSIONED_MODELS):
+            user_ids |= _owners(obj)
+    for obj in session.dirty:
+        if isinstance(obj, VERSIONED_MODELS) and session.is_modified(obj):
+            user_ids |= _owners(obj)
+    if user_ids:
+        touch_users(session, user_ids)
+
+
+def touch_users(session, user_ids):
+    """Bump the users' data versions and announce them when session commits
+
+    Bulk writes that bypass the unit of work call this themselves.
+    """
+    bump_data_versions(session.connection(), user_ids)
+    session.info.setdefault(_CHANGED_KEY, set()).update(user_ids)
+
+
+@event.listens_for(db.session, "after_commit")
+def _announce_changes(session):
+    """Tell in-process caches which users' data changed"""
+    user_ids = session.info.pop(_CHANGED_KEY, None)
+    if user_ids:
+        data_changed.send(session, user_ids=user_ids)
+
+
+@event.listens_for(db.session, "after_soft_rollback")
+def _forget_changes(session, previous_transaction):
+    session.info.pop(_CHANGED_KEY, None)
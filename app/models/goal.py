@@ -1,16 +1,18 @@
 from datetime import date, datetime, timezone
-from decimal import Decimal
+
+from sqlalchemy.orm import validates
 
 from app import db
+from app.utils.money import Money, MoneyType
 
 
 class Goal(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), nullable=False)
     description = db.Column(db.Text)
-    target_amount = db.Column(db.Numeric(precision=10, scale=2), nullable=False)
+    target_amount = db.Column(MoneyType(precision=10), nullable=False)
     current_amount = db.Column(
-        db.Numeric(precision=10, scale=2), default=Decimal("0.00"), nullable=False
+        MoneyType(precision=10), default=Money(0), nullable=False
     )
     deadline = db.Column(db.Date, nullable=False)
     status = db.Column(
@@ -21,9 +23,17 @@ class Goal(db.Model):
     # Foreign key to User
     user_id = db.Column(db.Integer, db.ForeignKey("user.id"), nullable=False)
 
+    __table_args__ = (
+        db.Index("ix_goal_user_status_deadline", "user_id", "status", "deadline"),
+    )
+
     def __repr__(self):
         return f"<Goal {self.id}: {self.name} (${self.target_amount})>"
 
+    @validates("target_amount", "current_amount")
+    def _coerce_amount(self, key, value):
+        return None if value is None else Money.coerce(value)
+
     @property
     def progress_percentage(self):
         """Calculate progress as a percentage"""
@@ -34,7 +44,7 @@ class Goal(db.Model):
     @property
     def remaining_amount(self):
         """Calculate remaining amount to reach goal"""
-        return max(self.target_amount - self.current_amount, Decimal("0.00"))
+        return max(self.target_amount - self.current_amount, Money(0))
 
     @property
     def is_completed(self):
@@ -67,7 +77,7 @@ class Goal(db.Model):
 
     def update_progress(self, amount):
         """Update current progress and check if goal is completed"""
-        self.current_amount = max(Decimal(str(amount)), Decimal("0.00"))
+        self.current_amount = max(Money.coerce(amount), Money(0))
         if self.current_amount >= self.target_amount and self.status == "active":
             self.status = "completed"
         elif self.current_amount < self.target_amount and self.status == "completed":
@@ -75,5 +85,5 @@ class Goal(db.Model):
 
     def add_progress(self, amount):
         """Add to current progress"""
-        new_amount = self.current_amount + Decimal(str(amount))
+        new_amount = self.current_amount + Money.coerce(amount)
         self.update_progress(new_amount)
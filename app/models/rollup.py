@@ -0,0 +1,199 @@
+from collections import defaultdict
+
+from sqlalchemy import delete, event, extract, func, insert, inspect
+
+from app import db
+from app.models.transaction import Transaction
+from app.utils.money import Money, MoneyType
+from app.utils.upsert import upsert
+
+# Transaction columns that decide which rollup row an amount belongs to
+TRACKED_COLUMNS = ("user_id", "date", "type", "category", "amount")
+
+_PENDING_KEY = "monthly_rollup_pending"
+
+
+class MonthlyRollup(db.Model):
+    """Per-user monthly transaction totals, kept in step with every write"""
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey("user.id"), nullable=False)
+    month = db.Column(db.String(7), nullable=False)  # "YYYY-MM"
+    type = db.Column(db.String(10), nullable=False)
+    category = db.Column(db.String(50), nullable=False)
+    total = db.Column(MoneyType(precision=14), default=Money(0), nullable=False)
+    count = db.Column(db.Integer, default=0, nullable=False)
+
+    __table_args__ = (
+        db.UniqueConstraint(
+            "user_id", "month", "type", "category", name="uq_monthly_rollup_key"
+        ),
+    )
+
+    def __repr__(self):
+        return (
+            f"<MonthlyRollup {self.user_id} {self.month} {self.type}/{self.category}>"
+        )
+
+
+def rollup_key(user_id, day, transaction_type, category):
+    """Return the (user_id, month, type, category) key for a transaction"""
+    return (user_id, day.strftime("%Y-%m"), transaction_type, category)
+
+
+def apply_rollup_deltas(connection, deltas):
+    """Add {key: (amount, count)} deltas to the rollup table
+
+    Used by the session events below and by write paths that bypass the
+    unit of work, such as bulk inserts.
+    """
+    table = MonthlyRollup.__table__
+    for (user_id, month, transaction_type, category), (amount, count) in sorted(
+        deltas.items()
+    ):
+        if not amount and not count:
+            continue
+
+        upsert(
+            connection,
+            table,
+            {
+                "user_id": user_id,
+                "month": month,
+                "type": transaction_type,
+                "category": category,
+                "total": amount,
+                "count": count,
+            },
+            ("user_id", "month", "type", "category"),
+            lambda new: {
+                "total": table.c.total + new.total,
+                "count": table.c.count + new.count,
+            },
+        )
+        if count < 0:
+            # Drop months that no longer hold any transaction
+            connection.execute(
+                delete(table).where(
+                    (table.c.user_id == user_id)
+                    & (table.c.month == month)
+                    & (table.c.type == transaction_type)
+                    & (table.c.category == category)
+                    & (table.c.count <= 0)
+                )
+            )
+
+
+def rebuild_monthly_rollups(user_id=None):
+    """Recompute rollups from the transaction table, for one user or everyone
+
+    Returns the number of rollup rows written.
+    """
+    table = MonthlyRollup.__table__
+    year = extract("year", Transaction.date).label("year")
+    month = extract("month", Transaction.date).label("month")
+
+    query = db.session.query(
+        Transaction.user_id,
+        year,
+        month,
+        Transaction.type,
+        Transaction.category,
+        func.sum(Transaction.amount).label("total"),
+        func.count(Transaction.id).label("count"),
+    ).group_by(Transaction.user_id, year, month, Transaction.type, Transaction.category)
+
+    clear = delete(table)
+    if user_id is not None:
+        query = query.filter(Transaction.user_id == user_id)
+        clear = clear.where(table.c.user_id == user_id)
+
+    rows = [
+        {
+            "user_id": row.user_id,
+            "month": f"{int(row.year):04d}-{int(row.month):02d}",
+            "type": row.type,
+            "category": row.category,
+            "total": row.total,
+            "count": row.count,
+        }
+        for row in query.all()
+    ]
+
+    db.session.execute(clear)
+    if rows:
+        db.session.execute(insert(table), rows)
+    db.session.commit()
+    return len(rows)
+
+
+def _has_tracked_changes(transaction):
+    state = inspect(transaction)
+    return any(state.attrs[column].history.has_changes() for column in TRACKED_COLUMNS)
+
+
+def _new_pending():
+    return {"deltas": defaultdict(lambda: [Money(0), 0]), "changed": []}
+
+
+@event.listens_for(db.session, "before_flush")
+def _remove_stored_amounts(session, flush_context, instances):
+    """Subtract the stored values of transactions about to change or go away"""
+    changed = [
+        obj
+        for obj in session.dirty
+        if isinstance(obj, Transaction) and _has_tracked_changes(obj)
+    ]
+    deleted = [obj for obj in session.deleted if isinstance(obj, Transaction)]
+    if not changed and not deleted:
+        return
+
+    pending = session.info.setdefault(_PENDING_KEY, _new_pending())
+    pending["changed"].extend(changed)
+
+    # Read what is actually stored: in-memory history may not hold the old
+    # value of an attribute that was expired before it was reassigned.
+    ids = [obj.id for obj in changed + deleted if obj.id is not None]
+    if not ids:
+        return
+    with session.no_autoflush:
+        stored = session.execute(
+            db.select(
+                Transaction.user_id,
+                Transaction.date,
+                Transaction.type,
+                Transaction.category,
+                Transaction.amount,
+            ).where(Transaction.id.in_(ids))
+        ).all()
+
+    for user_id, day, transaction_type, category, amount in stored:
+        delta = pending["deltas"][rollup_key(user_id, day, transaction_type, category)]
+        delta[0] -= amount
+        delta[1] -= 1
+
+
+@event.listens_for(db.session, "after_flush")
+def _add_new_amounts(session, flush_context):
+    """Add the values written by this flush and update the rollup table"""
+    pending = session.info.pop(_PENDING_KEY, None)
+    written = [obj for obj in session.new if isinstance(obj, Transaction)]
+    if pending is None and not written:
+        return
+
+    pending = pending or _new_pending()
+    deltas = pending["deltas"]
+    for obj in written + [
+        obj for obj in pending["changed"] if obj not in session.deleted
+    ]:
+        delta = deltas[rollup_key(obj.user_id, obj.date, obj.type, obj.category)]
+        delta[0] += obj.amount
+        delta[1] += 1
+
+    apply_rollup_deltas(session.connection(), deltas)
+
+
+@event.listens_for(db.session, "after_soft_rollback")
+def _discard_pending(session, previous_transaction):
+    """Forget deltas collected by a flush that did not complete"""
+    session.info.pop(_PENDING_KEY, None)
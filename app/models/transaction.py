@@ -1,14 +1,16 @@
 from datetime import datetime, timezone
-from decimal import Decimal
+
+from sqlalchemy.orm import validates
 
 from app import db
+from app.utils.money import Money, MoneyType
 
 
 class Transaction(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     type = db.Column(db.String(10), nullable=False)  # 'income' or 'expense'
     category = db.Column(db.String(50), nullable=False)
-    amount = db.Column(db.Numeric(precision=10, scale=2), nullable=False)
+    amount = db.Column(MoneyType(precision=10), nullable=False)
     date = db.Column(
         db.Date, nullable=False, default=lambda: datetime.now(timezone.utc).date()
     )
@@ -19,9 +21,21 @@ class Transaction(db.Model):
     # Foreign key to User
     user_id = db.Column(db.Integer, db.ForeignKey("user.id"), nullable=False)
 
+    # Every listing and aggregation filters by user first, so each index leads
+    # with user_id and follows the filter/sort order of the queries it serves.
+    __table_args__ = (
+        db.Index("ix_transaction_user_date_created", "user_id", "date", "created_at"),
+        db.Index("ix_transaction_user_type_date", "user_id", "type", "date"),
+        db.Index("ix_transaction_user_category", "user_id", "category"),
+    )
+
     def __repr__(self):
         return f"<Transaction {self.id}: {self.type} ${self.amount}>"
 
+    @validates("amount")
+    def _coerce_amount(self, key, value):
+        return None if value is None else Money.coerce(value)
+
     @property
     def formatted_amount(self):
         return f"${self.amount:,.2f}"
@@ -1,9 +1,10 @@
 from datetime import datetime, timezone
 
 from flask_login import UserMixin
-from werkzeug.security import check_password_hash, generate_password_hash
+from werkzeug.security import check_password_hash
 
 from app import db, login_manager
+from app.utils.passwords import hash_password
 
 
 class User(UserMixin, db.Model):
@@ -17,8 +18,8 @@ class User(UserMixin, db.Model):
     goals = db.relationship("Goal", backref="user", lazy=True)
 
     def set_password(self, password):
-        """Set password hash."""
-        self.password_hash = generate_password_hash(password)
+        """Set password hash with the configured PASSWORD_HASH_METHOD."""
+        self.password_hash = hash_password(password)
 
     def check_password(self, password):
         """Check password against hash."""
@@ -30,4 +31,6 @@ class User(UserMixin, db.Model):
 
 @login_manager.user_loader
 def load_user(id):
-    return User.query.get(int(id))
+    from app.utils.user_cache import get_user_cache
+
+    return get_user_cache().load(int(id))
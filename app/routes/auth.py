@@ -1,10 +1,13 @@
-from flask import Blueprint, flash, redirect, render_template, request, url_for
+from concurrent.futures import TimeoutError as FutureTimeoutError
+
+from flask import Blueprint, abort, flash, redirect, render_template, request, url_for
 from flask_login import current_user, login_required, login_user, logout_user
-from werkzeug.security import check_password_hash
 
 from app import db
 from app.forms.auth import LoginForm, RegistrationForm
 from app.models.user import User
+from app.utils.passwords import get_password_hasher
+from app.utils.workers import QueueFull
 
 bp = Blueprint("auth", __name__, url_prefix="/auth")
 
@@ -57,7 +60,18 @@ def login():
         # Try to find user by username
         user = User.query.filter_by(username=form.username.data.lower().strip()).first()
 
-        if user and check_password_hash(user.password_hash, form.password.data):
+        hasher = get_password_hasher()
+        try:
+            valid = user is not None and hasher.verify(
+                user.password_hash, form.password.data
+            )
+        except QueueFull:
+            abort(503, description="Too many sign-ins at once, please retry shortly.")
+        except FutureTimeoutError:
+            abort(504, description="Checking the password timed out.")
+
+        if valid:
+            hasher.rehash_if_needed(user, form.password.data)
             login_user(user, remember=form.remember_me.data)
 
             # Get next page or redirect to dashboard
@@ -1,16 +1,28 @@
-import base64
 import io
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
 from datetime import datetime, timedelta
 
-from flask import Blueprint, jsonify, render_template, request, send_file
+from flask import (
+    Blueprint,
+    abort,
+    current_app,
+    jsonify,
+    render_template,
+    request,
+    send_file,
+)
 from flask_login import current_user, login_required
 
+from app.utils.chart_cache import cached_chart, get_chart_cache
 from app.utils.charts import (
-    create_goals_progress_chart,
-    create_income_vs_expenses_chart,
-    create_savings_trend_chart,
-    create_spending_by_category_chart,
+    get_render_pool,
+    goals_progress_series,
+    income_vs_expenses_series,
+    savings_trend_series,
+    spending_by_category_series,
 )
+from app.utils.conditional import conditional_on_data_version
 from app.utils.data_aggregation import (
     get_goals_progress_data,
     get_income_vs_expenses_data,
@@ -18,9 +30,14 @@ from app.utils.data_aggregation import (
     get_spending_by_category_data,
     get_transaction_summary_data,
 )
+from app.utils.replica import enable_replica_reads
+from app.utils.workers import QueueFull
 
 bp = Blueprint("charts", __name__, url_prefix="/charts")
 
+# Every chart view only reads
+bp.before_request(enable_replica_reads)
+
 
 @bp.route("/")
 @login_required
@@ -30,139 +47,241 @@ def index():
 
 
 # Matplotlib chart routes (backend generated images)
+def _serve_chart(kind, prepare):
+    """Serve a PNG chart for the current user, rendering it only on a cache miss
+
+    The query parameters are parsed as the chart's JSON API parses them.
+    prepare queries the chart's plain data on this thread; the image itself
+    is drawn by the render pool so request threads never run Matplotlib.
+    The PNG bytes are wrapped in BytesIO, which shares the cached buffer
+    instead of copying it.
+    """
+    try:
+        params = parse_chart_params(kind, request.args)
+    except ValueError as exc:
+        abort(400, description=str(exc))
+
+    def render():
+        data = prepare(current_user.id, **params)
+        return get_render_pool().render(kind, data, output="bytes") if data else None
+
+    try:
+        chart_data = cached_chart(
+            current_user.id, kind, tuple(sorted(params.items())), render
+        )
+    except QueueFull:
+        abort(503, description="Chart rendering is busy, please retry shortly.")
+    except BrokenProcessPool:
+        # The pool has already dropped the dead executor; the next render
+        # starts a new one
+        abort(503, description="Chart rendering restarted, please retry shortly.")
+    except FutureTimeoutError:
+        abort(504, description="Chart rendering timed out.")
+
+    if not chart_data:
+        # Nothing to draw for this user
+        abort(404)
+
+    return send_file(io.BytesIO(chart_data), mimetype="image/png", as_attachment=False)
+
+
 @bp.route("/spending-by-category.png")
 @login_required
+@conditional_on_data_version
 def spending_by_category_png():
     """Generate and serve spending by category chart as PNG"""
-    # Get date range from query parameters
-    start_date = request.args.get("start_date")
-    end_date = request.args.get("end_date")
-
-    if start_date:
-        start_date = datetime.strptime(start_date, "%Y-%m-%d").date()
-    if end_date:
-        end_date = datetime.strptime(end_date, "%Y-%m-%d").date()
-
-    chart_base64 = create_spending_by_category_chart(
-        current_user.id, start_date, end_date
-    )
-
-    if chart_base64:
-        # Convert base64 back to bytes for serving
-        chart_data = base64.b64decode(chart_base64)
-        return send_file(
-            io.BytesIO(chart_data), mimetype="image/png", as_attachment=False
-        )
-    else:
-        # Return empty response if no data
-        from flask import abort
-
-        abort(404)
+    return _serve_chart("spending-by-category", spending_by_category_series)
 
 
 @bp.route("/income-vs-expenses.png")
 @login_required
+@conditional_on_data_version
 def income_vs_expenses_png():
     """Generate and serve income vs expenses chart as PNG"""
-    months = request.args.get("months", 6, type=int)
-    chart_base64 = create_income_vs_expenses_chart(current_user.id, months)
-
-    if chart_base64:
-        chart_data = base64.b64decode(chart_base64)
-        return send_file(
-            io.BytesIO(chart_data), mimetype="image/png", as_attachment=False
-        )
-    else:
-        from flask import abort
-
-        abort(404)
+    return _serve_chart("income-vs-expenses", income_vs_expenses_series)
 
 
 @bp.route("/goals-progress.png")
 @login_required
+@conditional_on_data_version
 def goals_progress_png():
     """Generate and serve goals progress chart as PNG"""
-    chart_base64 = create_goals_progress_chart(current_user.id)
-
-    if chart_base64:
-        chart_data = base64.b64decode(chart_base64)
-        return send_file(
-            io.BytesIO(chart_data), mimetype="image/png", as_attachment=False
-        )
-    else:
-        from flask import abort
-
-        abort(404)
+    return _serve_chart("goals-progress", goals_progress_series)
 
 
 @bp.route("/savings-trend.png")
 @login_required
+@conditional_on_data_version
 def savings_trend_png():
     """Generate and serve savings trend chart as PNG"""
-    months = request.args.get("months", 12, type=int)
-    chart_base64 = create_savings_trend_chart(current_user.id, months)
+    return _serve_chart("savings-trend", savings_trend_series)
 
-    if chart_base64:
-        chart_data = base64.b64decode(chart_base64)
-        return send_file(
-            io.BytesIO(chart_data), mimetype="image/png", as_attachment=False
-        )
-    else:
-        from flask import abort
 
+@bp.route("/api/cache-stats")
+@login_required
+def api_cache_stats():
+    """Get hit, miss and eviction counters of the rendered chart cache
+
+    The counters cover every user of this process, so they are only served
+    when the operator sets CHART_CACHE_STATS.
+    """
+    if not current_app.config.get("CHART_CACHE_STATS", False):
         abort(404)
+    return jsonify(get_chart_cache().stats())
 
 
 # Chart.js data API routes (JSON data for frontend)
+def _chart_api(kind):
+    """Answer a Chart.js data request for the current user"""
+    builder = BUNDLE_DATASETS[kind][0]
+    try:
+        params = parse_chart_params(kind, request.args)
+    except ValueError as exc:
+        return jsonify({"error": str(exc)}), 400
+    return jsonify(builder(current_user.id, **params))
+
+
 @bp.route("/api/spending-by-category")
 @login_required
+@conditional_on_data_version
 def api_spending_by_category():
     """Get spending by category data for Chart.js"""
-    start_date = request.args.get("start_date")
-    end_date = request.args.get("end_date")
-
-    if start_date:
-        start_date = datetime.strptime(start_date, "%Y-%m-%d").date()
-    if end_date:
-        end_date = datetime.strptime(end_date, "%Y-%m-%d").date()
-
-    data = get_spending_by_category_data(current_user.id, start_date, end_date)
-    return jsonify(data)
+    return _chart_api("spending-by-category")
 
 
 @bp.route("/api/income-vs-expenses")
 @login_required
+@conditional_on_data_version
 def api_income_vs_expenses():
     """Get income vs expenses data for Chart.js"""
-    months = request.args.get("months", 6, type=int)
-    data = get_income_vs_expenses_data(current_user.id, months)
-    return jsonify(data)
+    return _chart_api("income-vs-expenses")
 
 
 @bp.route("/api/goals-progress")
 @login_required
+@conditional_on_data_version
 def api_goals_progress():
     """Get goals progress data for Chart.js"""
-    data = get_goals_progress_data(current_user.id)
-    return jsonify(data)
+    return _chart_api("goals-progress")
 
 
 @bp.route("/api/savings-trend")
 @login_required
+@conditional_on_data_version
 def api_savings_trend():
     """Get savings trend data for Chart.js"""
-    months = request.args.get("months", 12, type=int)
-    data = get_savings_trend_data(current_user.id, months)
-    return jsonify(data)
+    return _chart_api("savings-trend")
 
 
 @bp.route("/api/dashboard-summary")
 @login_required
+@conditional_on_data_version
 def api_dashboard_summary():
     """Get dashboard summary data"""
-    days = request.args.get("days", 30, type=int)
-    data = get_transaction_summary_data(current_user.id, days)
-    return jsonify(data)
+    return _chart_api("dashboard-summary")
+
+
+def _parse_date(value):
+    return datetime.strptime(value, "%Y-%m-%d").date()
+
+
+def _parse_positive(value):
+    number = int(value)
+    if number < 1:
+        raise ValueError(f"{value} is not a positive number")
+    return number
+
+
+# Datasets the bundle can hold: kind -> (builder, {param: parser})
+BUNDLE_DATASETS = {
+    "spending-by-category": (
+        get_spending_by_category_data,
+        {"start_date": _parse_date, "end_date": _parse_date},
+    ),
+    "income-vs-expenses": (get_income_vs_expenses_data, {"months": _parse_positive}),
+    "goals-progress": (get_goals_progress_data, {}),
+    "savings-trend": (get_savings_trend_data, {"months": _parse_positive}),
+    "dashboard-summary": (get_transaction_summary_data, {"days": _parse_positive}),
+}
+
+MAX_BUNDLE_CHARTS = 20
+
+
+def parse_chart_spec(spec):
+    """Split "kind:name=value,name=value" into (kind, {name: parsed value})"""
+    kind, _, arguments = spec.partition(":")
+    if kind not in BUNDLE_DATASETS:
+        raise ValueError(f"Unknown chart: {kind!r}")
+    parsers = BUNDLE_DATASETS[kind][1]
+
+    params = {}
+    for argument in filter(None, arguments.split(",")):
+        name, _, value = argument.partition("=")
+        if name not in parsers:
+            raise ValueError(f"Unknown parameter {name!r} for {kind}")
+        try:
+            params[name] = parsers[name](value)
+        except ValueError:
+            raise ValueError(f"Invalid {name} for {kind}: {value!r}") from None
+    return kind, params
+
+
+def parse_chart_params(kind, args):
+    """Parse the query parameters kind takes from args into {name: value}
+
+    The chart routes and the ASGI read API both parse with this, so they
+    accept the same values. Parameters the chart does not take, like
+    cache-busting ones, are ignored; missing ones keep the builder's
+    default.
+    """
+    params = {}
+    for name, parse in BUNDLE_DATASETS[kind][1].items():
+        if name in args:
+            try:
+                params[name] = parse(args[name])
+            except ValueError:
+                raise ValueError(f"Invalid {name}: {args[name]!r}") from None
+    return params
+
+
+def parse_bundle_specs(specs):
+    """Validate a bundle's chart specs into {spec: (kind, params)}"""
+    if not specs:
+        raise ValueError("Name at least one chart")
+    if len(specs) > MAX_BUNDLE_CHARTS:
+        raise ValueError(f"At most {MAX_BUNDLE_CHARTS} charts per bundle")
+    return {spec: parse_chart_spec(spec) for spec in specs}
+
+
+def build_bundle(user_id, parsed):
+    """Build every dataset named by parse_bundle_specs for user_id
+
+    Each dataset uses the configured aggregation backend: the SQL backend
+    reads the monthly rollups, and the numpy backend computes every
+    dataset from the user's cached transaction arrays.
+    """
+    charts = {}
+    for spec, (kind, params) in parsed.items():
+        builder = BUNDLE_DATASETS[kind][0]
+        charts[spec] = builder(user_id, **params)
+    return {"charts": charts}
+
+
+@bp.route("/api/bundle")
+@login_required
+@conditional_on_data_version
+def api_bundle():
+    """Get several Chart.js datasets in one response
+
+    Each chart query parameter names a dataset and, optionally, its
+    parameters, e.g. ?chart=spending-by-category&chart=savings-trend:months=24.
+    The datasets are keyed by their spec in the response.
+    """
+    try:
+        parsed = parse_bundle_specs(request.args.getlist("chart"))
+    except ValueError as exc:
+        return jsonify({"error": str(exc)}), 400
+    return jsonify(build_bundle(current_user.id, parsed))
 
 
 # Combined chart views
@@ -6,12 +6,17 @@ from flask_login import current_user, login_required
 from app import db
 from app.forms.goal import DeleteGoalForm, GoalForm, SetProgressForm, UpdateProgressForm
 from app.models.goal import Goal
+from app.utils.conditional import conditional_on_data_version
+from app.utils.data_aggregation import get_goal_stats_data
+from app.utils.money import Money
+from app.utils.replica import replica_reads
 
 bp = Blueprint("goals", __name__, url_prefix="/goals")
 
 
 @bp.route("/")
 @login_required
+@replica_reads
 def index():
     """Display all goals for the current user"""
     goals = (
@@ -27,8 +32,8 @@ def index():
 
     # Calculate statistics
     total_goals = len(goals)
-    total_target = sum(g.target_amount for g in goals)
-    total_progress = sum(g.current_amount for g in goals)
+    total_target = Money.sum(g.target_amount for g in goals)
+    total_progress = Money.sum(g.current_amount for g in goals)
     overall_progress = (total_progress / total_target * 100) if total_target > 0 else 0
 
     return render_template(
@@ -56,9 +61,11 @@ def create():
                 description=(
                     form.description.data.strip() if form.description.data else None
                 ),
-                target_amount=float(form.target_amount.data),
+                target_amount=Money.coerce(form.target_amount.data),
                 current_amount=(
-                    float(form.current_amount.data) if form.current_amount.data else 0.0
+                    Money.coerce(form.current_amount.data)
+                    if form.current_amount.data
+                    else Money(0)
                 ),
                 deadline=form.deadline.data,
                 status=form.status.data,
@@ -118,9 +125,11 @@ def edit(id):
             goal.description = (
                 form.description.data.strip() if form.description.data else None
             )
-            goal.target_amount = float(form.target_amount.data)
+            goal.target_amount = Money.coerce(form.target_amount.data)
             goal.update_progress(
-                float(form.current_amount.data) if form.current_amount.data else 0.0
+                Money.coerce(form.current_amount.data)
+                if form.current_amount.data
+                else Money(0)
             )
             goal.deadline = form.deadline.data
             goal.status = form.status.data
@@ -170,7 +179,7 @@ def update_progress(id):
             old_progress = goal.progress_percentage
             old_amount = goal.current_amount
 
-            goal.add_progress(float(form.amount.data))
+            goal.add_progress(Money.coerce(form.amount.data))
             db.session.commit()
 
             # Check if goal was completed
@@ -215,7 +224,7 @@ def set_progress(id):
         try:
             old_progress = goal.progress_percentage
 
-            goal.update_progress(float(form.current_amount.data))
+            goal.update_progress(Money.coerce(form.current_amount.data))
             db.session.commit()
 
             # Check if goal was completed
@@ -308,23 +317,9 @@ def complete(id):
 
 @bp.route("/api/stats")
 @login_required
+@replica_reads
+@conditional_on_data_version
 def api_stats():
     """API endpoint for goal statistics"""
-    goals = Goal.query.filter_by(user_id=current_user.id).all()
-
-    stats = {
-        "total_goals": len(goals),
-        "active_goals": len([g for g in goals if g.status == "active"]),
-        "completed_goals": len([g for g in goals if g.is_completed]),
-        "overdue_goals": len([g for g in goals if g.is_overdue]),
-        "total_target_amount": sum(g.target_amount for g in goals),
-        "total_current_amount": sum(g.current_amount for g in goals),
-        "overall_progress": 0,
-    }
-
-    if stats["total_target_amount"] > 0:
-        stats["overall_progress"] = (
-            stats["total_current_amount"] / stats["total_target_amount"]
-        ) * 100
-
+    stats = get_goal_stats_data(current_user.id)
     return jsonify(stats)
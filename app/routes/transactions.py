@@ -1,56 +1,105 @@
+import codecs
 from datetime import datetime
 
-from flask import Blueprint, flash, jsonify, redirect, render_template, request, url_for
+from flask import (
+    Blueprint,
+    Response,
+    abort,
+    current_app,
+    flash,
+    jsonify,
+    redirect,
+    render_template,
+    request,
+    stream_with_context,
+    url_for,
+)
 from flask_login import current_user, login_required
 
 from app import db
-from app.forms.transaction import DeleteTransactionForm, TransactionForm
+from app.forms.transaction import (
+    DeleteTransactionForm,
+    ImportTransactionsForm,
+    TransactionForm,
+)
 from app.models.transaction import Transaction
+from app.utils import exporter, importer
+from app.utils.data_aggregation import FinancialSummary
+from app.utils.helpers import TransactionHelper
+from app.utils.money import Money
+from app.utils.pagination import InvalidCursor, keyset_paginate
+from app.utils.replica import replica_reads
 
 bp = Blueprint("transactions", __name__, url_prefix="/transactions")
 
 
+# Newest first; id breaks ties so every row has a unique position
+TRANSACTION_KEYSET = (Transaction.date, Transaction.created_at, Transaction.id)
+
+# Query parameters that select a page rather than filter the list
+PAGING_ARGS = ("page", "cursor", "mode", "per_page")
+
+
+def _list_filters(on_error):
+    """Build the transaction list filters from the query string
+
+    Malformed dates are reported through on_error and ignored.
+    """
+    dates = {}
+    for name, label in (("start_date", "start"), ("end_date", "end")):
+        value = request.args.get(name)
+        dates[name] = None
+        if value:
+            try:
+                dates[name] = datetime.strptime(value, "%Y-%m-%d").date()
+            except ValueError:
+                on_error(f"Invalid {label} date format")
+
+    return TransactionHelper.build_filters(
+        current_user.id,
+        request.args.get("type"),
+        request.args.get("category"),
+        dates["start_date"],
+        dates["end_date"],
+    )
+
+
 @bp.route("/")
 @login_required
+@replica_reads
 def index():
-    """Display all transactions for the current user"""
-    page = request.args.get("page", 1, type=int)
+    """Display all transactions for the current user
 
-    # Get filter parameters
-    transaction_type = request.args.get("type")
-    category = request.args.get("category")
-    start_date = request.args.get("start_date")
-    end_date = request.args.get("end_date")
+    Pages are numbered by default. With ?mode=cursor, or when following a
+    cursor link, the list is paged by keyset instead, which costs the same
+    on every page but does not compute the filtered totals.
+    """
+    page = request.args.get("page", 1, type=int)
+    cursor = request.args.get("cursor")
+    cursor_mode = bool(cursor) or request.args.get("mode") == "cursor"
 
-    # Build query with filters
-    query = Transaction.query.filter_by(user_id=current_user.id)
+    filters = _list_filters(lambda message: flash(message, "error"))
 
-    if transaction_type:
-        query = query.filter_by(type=transaction_type)
-    if category:
-        query = query.filter_by(category=category)
-    if start_date:
+    if cursor_mode:
+        query = Transaction.query.filter(*filters)
         try:
-            start_date_obj = datetime.strptime(start_date, "%Y-%m-%d").date()
-            query = query.filter(Transaction.date >= start_date_obj)
-        except ValueError:
-            flash("Invalid start date format", "error")
-    if end_date:
-        try:
-            end_date_obj = datetime.strptime(end_date, "%Y-%m-%d").date()
-            query = query.filter(Transaction.date <= end_date_obj)
-        except ValueError:
-            flash("Invalid end date format", "error")
-
-    transactions = query.order_by(
-        Transaction.date.desc(), Transaction.created_at.desc()
-    ).paginate(page=page, per_page=20, error_out=False)
-
-    # Calculate filtered totals
-    filtered_transactions = query.all()
-    total_income = sum(t.amount for t in filtered_transactions if t.type == "income")
-    total_expenses = sum(t.amount for t in filtered_transactions if t.type == "expense")
-    net_balance = total_income - total_expenses
+            transactions = keyset_paginate(query, TRANSACTION_KEYSET, 20, cursor)
+        except InvalidCursor:
+            flash("Invalid page link, showing the latest transactions", "error")
+            transactions = keyset_paginate(query, TRANSACTION_KEYSET, 20)
+        summary = None
+    else:
+        # Filtered totals and the row count for pagination come from one
+        # aggregate query, so the page never loads more than its own rows
+        totals = TransactionHelper.calculate_filtered_totals(filters)
+
+        transactions = (
+            Transaction.query.filter(*filters)
+            .order_by(Transaction.date.desc(), Transaction.created_at.desc())
+            .paginate(page=page, per_page=20, error_out=False, count=False)
+        )
+        transactions.total = totals["count"]
+        summary = FinancialSummary(totals["income"], totals["expenses"], totals["net"])
 
     # Get all categories for filter dropdown
     categories = (
@@ -61,20 +110,62 @@ def index():
     )
     categories = [cat[0] for cat in categories]
 
-    # Create summary object
-    class Summary:
-        def __init__(self, income, expenses, balance):
-            self.total_income = income
-            self.total_expenses = expenses
-            self.net_balance = balance
-
-    summary = Summary(total_income, total_expenses, net_balance)
+    filter_args = {
+        key: value for key, value in request.args.items() if key not in PAGING_ARGS
+    }
 
     return render_template(
         "transactions/index.html",
         transactions=transactions,
         summary=summary,
         categories=categories,
+        cursor_mode=cursor_mode,
+        filter_args=filter_args,
+    )
+
+
+@bp.route("/api/list")
+@login_required
+@replica_reads
+def api_list():
+    """API endpoint listing transactions a page at a time by cursor
+
+    Accepts the list filters plus per_page (at most 100) and the opaque
+    cursor returned as next_cursor or prev_cursor by a previous call.
+    """
+    errors = []
+    filters = _list_filters(errors.append)
+    if errors:
+        return jsonify({"error": "; ".join(errors)}), 400
+
+    per_page = max(1, min(request.args.get("per_page", 20, type=int), 100))
+    try:
+        page = keyset_paginate(
+            Transaction.query.filter(*filters),
+            TRANSACTION_KEYSET,
+            per_page,
+            request.args.get("cursor"),
+        )
+    except InvalidCursor as exc:
+        return jsonify({"error": str(exc)}), 400
+
+    return jsonify(
+        {
+            "transactions": [
+                {
+                    "id": t.id,
+                    "type": t.type,
+                    "category": t.category,
+                    "amount": float(t.amount),
+                    "date": t.date.isoformat(),
+                    "description": t.description,
+                    "notes": t.notes,
+                }
+                for t in page.items
+            ],
+            "next_cursor": page.next_cursor,
+            "prev_cursor": page.prev_cursor,
+        }
     )
 
 
@@ -96,7 +187,7 @@ def create():
             transaction = Transaction(
                 type=form.type.data,
                 category=form.category.data,
-                amount=float(form.amount.data),
+                amount=Money.coerce(form.amount.data),
                 date=form.date.data,
                 description=form.description.data,
                 notes=form.notes.data,
@@ -130,6 +221,71 @@ def create():
     return render_template("transactions/create.html", form=form)
 
 
+@bp.route("/export")
+@login_required
+@replica_reads
+def export():
+    """Stream the filtered transaction list as CSV, NDJSON or columnar binary
+
+    Takes the same filters as the list. Rows are fetched and encoded a
+    batch at a time while the response is being sent.
+    """
+    file_format = request.args.get("format", "csv")
+    if file_format not in exporter.EXPORT_FORMATS:
+        abort(400, description=f"Unsupported export format: {file_format}")
+
+    errors = []
+    filters = _list_filters(errors.append)
+    if errors:
+        abort(400, description="; ".join(errors))
+
+    mimetype, extension = exporter.EXPORT_FORMATS[file_format]
+    chunks = exporter.export_chunks(
+        filters,
+        file_format,
+        current_app.config.get("EXPORT_BATCH_SIZE", exporter.DEFAULT_BATCH_SIZE),
+    )
+    return Response(
+        stream_with_context(chunks),
+        mimetype=mimetype,
+        headers={
+            "Content-Disposition": f'attachment; filename="transactions.{extension}"'
+        },
+    )
+
+
+@bp.route("/import", methods=["GET", "POST"])
+@login_required
+def import_transactions():
+    """Bulk import transactions from a CSV, OFX or QIF bank export"""
+    form = ImportTransactionsForm()
+    result = None
+
+    if form.validate_on_submit():
+        upload = form.file.data
+        file_format = importer.detect_format(upload.filename)
+        # Decode as the upload streams in rather than reading it into memory.
+        # Not io.TextIOWrapper: before Python 3.11 the SpooledTemporaryFile
+        # Werkzeug spools uploads to lacks readable() and is rejected
+        stream = codecs.getreader("utf-8-sig")(upload.stream, errors="replace")
+        result = importer.import_transactions(
+            current_user.id,
+            stream,
+            file_format,
+            chunk_size=current_app.config.get(
+                "IMPORT_CHUNK_SIZE", importer.DEFAULT_CHUNK_SIZE
+            ),
+        )
+        category = "success" if not result.failed else "warning"
+        flash(
+            f"Imported {result.imported} transactions"
+            f" ({result.failed} rows skipped).",
+            category,
+        )
+
+    return render_template("transactions/import.html", form=form, result=result)
+
+
 @bp.route("/<int:id>")
 @login_required
 def view(id):
@@ -170,7 +326,7 @@ def edit(id):
 
             transaction.type = form.type.data
             transaction.category = form.category.data
-            transaction.amount = float(form.amount.data)
+            transaction.amount = Money.coerce(form.amount.data)
             transaction.date = form.date.data
             transaction.description = form.description.data
             transaction.notes = form.notes.data
@@ -0,0 +1,71 @@
+"""Per-application cache of rendered chart images."""
+
+from typing import Callable, Hashable, Optional
+
+from flask import current_app
+
+from app.models.data_version import data_changed, get_data_version
+from app.utils.cache import LRUCache
+
+DEFAULT_MAX_ENTRIES = 256
+DEFAULT_MAX_BYTES = 32 * 1024 * 1024
+
+
+class ChartCache(LRUCache):
+    """LRU cache of PNG bytes keyed by (user_id, kind, params, data_version).
+
+    The data version in the key means a stale image can never be served,
+    even when another process wrote the data; dropping a user's entries on
+    commit only frees their memory early.
+    """
+
+    def __init__(self, max_entries: int, max_bytes: Optional[int]):
+        super().__init__(max_entries=max_entries, max_bytes=max_bytes)
+        # Connected weakly, so the signal does not keep old apps' caches alive
+        data_changed.connect(self._on_data_changed)
+
+    def invalidate_users(self, user_ids) -> int:
+        """Drop every cached chart belonging to the given users."""
+        user_ids = set(user_ids)
+        return self.invalidate(lambda key: key[0] in user_ids)
+
+    def _on_data_changed(self, sender, user_ids, **kwargs):
+        self.invalidate_users(user_ids)
+
+
+def init_chart_cache(app) -> ChartCache:
+    """Create the chart cache for app from its configuration."""
+    cache = ChartCache(
+        max_entries=app.config.get("CHART_CACHE_MAX_ENTRIES", DEFAULT_MAX_ENTRIES),
+        max_bytes=app.config.get("CHART_CACHE_MAX_BYTES", DEFAULT_MAX_BYTES),
+    )
+    app.extensions["chart_cache"] = cache
+    return cache
+
+
+def get_chart_cache() -> ChartCache:
+    """Return the current application's chart cache."""
+    return current_app.extensions["chart_cache"]
+
+
+def cached_chart(
+    user_id: int,
+    kind: str,
+    params: Hashable,
+    render: Callable[[], Optional[bytes]],
+) -> Optional[bytes]:
+    """Return PNG bytes for a chart, rendering only on a cache miss.
+
+    ``render`` returns the PNG bytes, or None when there is nothing to
+    draw; empty results are not cached.
+    """
+    cache = get_chart_cache()
+    version, _ = get_data_version(user_id)
+    key = (user_id, kind, params, version)
+
+    png = cache.get(key)
+    if png is None:
+        png = render()
+        if png:
+            cache.set(key, png)
+    return png
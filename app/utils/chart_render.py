@@ -0,0 +1,262 @@
+"""Matplotlib chart rendering from plain, already aggregated data.
+
+Nothing here touches the database or the application context, so every
+function can run in a worker process; ``render_chart`` is the picklable
+entry point used by the render pool.
+
+Matplotlib and NumPy are imported by the functions that draw, not by this
+module, so the web app can import it (and hand ``render_chart`` to the
+pool) without loading them; only the process that renders pays for them.
+"""
+
+import base64
+import io
+from datetime import datetime
+
+# Ways a chart function can hand back its PNG
+OUTPUT_MODES = ("base64", "bytes", "buffer")
+
+
+def new_figure(figsize):
+    """Return (fig, ax) drawn by their own Agg canvas
+
+    Figures made this way are never registered with pyplot's global figure
+    manager, so they need no closing, are freed with their last reference,
+    and can be rendered from several threads at once.
+    """
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    fig = Figure(figsize=figsize)
+    FigureCanvasAgg(fig)
+    return fig, fig.subplots()
+
+
+def export_figure(fig, output="base64"):
+    """Save fig as a PNG
+
+    output picks the return type: "base64" for embedding in data URIs,
+    "bytes" for the raw PNG, or "buffer" for a BytesIO positioned at the
+    start, ready to stream without further copies.
+    """
+    if output not in OUTPUT_MODES:
+        raise ValueError(f"Unknown chart output mode: {output!r}")
+
+    img_buffer = io.BytesIO()
+    fig.savefig(img_buffer, format="png", dpi=150, bbox_inches="tight")
+
+    if output == "buffer":
+        img_buffer.seek(0)
+        return img_buffer
+    if output == "bytes":
+        return img_buffer.getvalue()
+    return base64.b64encode(img_buffer.getbuffer()).decode()
+
+
+def render_spending_by_category(categories, amounts, output="base64"):
+    """Draw a pie chart of expense totals per category"""
+    import numpy as np
+    from matplotlib import colormaps
+
+    fig, ax = new_figure(figsize=(10, 8))
+    colors = colormaps["Set3"](np.linspace(0, 1, len(categories)))
+
+    wedges, texts, autotexts = ax.pie(
+        amounts, labels=categories, autopct="%1.1f%%", colors=colors, startangle=90
+    )
+
+    # Customize the chart
+    ax.set_title("Spending by Category", fontsize=16, fontweight="bold", pad=20)
+
+    # Improve label formatting
+    for autotext in autotexts:
+        autotext.set_color("white")
+        autotext.set_fontweight("bold")
+
+    # Add total spending
+    total_spending = sum(amounts)
+    fig.suptitle(f"Total Spending: ${total_spending:,.2f}", fontsize=12, y=0.02)
+
+    fig.tight_layout()
+
+    return export_figure(fig, output)
+
+
+def render_income_vs_expenses(months, income, expenses, output="base64"):
+    """Draw side-by-side monthly income and expense bars
+
+    months are "YYYY-MM" strings in display order.
+    """
+    import numpy as np
+
+    fig, ax = new_figure(figsize=(12, 6))
+
+    x = np.arange(len(months))
+    width = 0.35
+
+    bars1 = ax.bar(
+        x - width / 2, income, width, label="Income", color="#2ecc71", alpha=0.8
+    )
+    bars2 = ax.bar(
+        x + width / 2, expenses, width, label="Expenses", color="#e74c3c", alpha=0.8
+    )
+
+    # Customize the chart
+    ax.set_xlabel("Month", fontweight="bold")
+    ax.set_ylabel("Amount ($)", fontweight="bold")
+    ax.set_title("Income vs Expenses by Month", fontsize=16, fontweight="bold")
+    ax.set_xticks(x)
+    ax.set_xticklabels(
+        [datetime.strptime(m, "%Y-%m").strftime("%b %Y") for m in months],
+        rotation=45,
+    )
+    ax.legend()
+    ax.grid(True, alpha=0.3)
+
+    # Add value labels on bars
+    def add_value_labels(bars):
+        for bar in bars:
+            height = bar.get_height()
+            if height > 0:
+                ax.text(
+                    bar.get_x() + bar.get_width() / 2.0,
+                    height + max(income + expenses) * 0.01,
+                    f"${height:,.0f}",
+                    ha="center",
+                    va="bottom",
+                    fontsize=8,
+                )
+
+    add_value_labels(bars1)
+    add_value_labels(bars2)
+
+    fig.tight_layout()
+
+    return export_figure(fig, output)
+
+
+def render_goals_progress(names, percentages, targets, output="base64"):
+    """Draw horizontal progress bars, one per goal"""
+    fig, ax = new_figure(figsize=(12, max(6, len(names) * 0.8)))
+
+    # Create horizontal bars
+    colors = [
+        "#2ecc71" if p >= 100 else "#f39c12" if p >= 75 else "#e74c3c"
+        for p in percentages
+    ]
+    bars = ax.barh(names, percentages, color=colors, alpha=0.8)
+
+    # Customize the chart
+    ax.set_xlabel("Progress (%)", fontweight="bold")
+    ax.set_title("Financial Goals Progress", fontsize=16, fontweight="bold", pad=20)
+    ax.set_xlim(0, 100)
+
+    # Add percentage labels
+    for bar, percentage, target in zip(bars, percentages, targets):
+        width = bar.get_width()
+        ax.text(
+            width + 1,
+            bar.get_y() + bar.get_height() / 2,
+            f"{percentage:.1f}%",
+            ha="left",
+            va="center",
+            fontweight="bold",
+        )
+        ax.text(
+            -2,
+            bar.get_y() + bar.get_height() / 2,
+            f"${target:,.0f}",
+            ha="right",
+            va="center",
+            fontsize=9,
+            alpha=0.7,
+        )
+
+    # Add a 100% reference line
+    ax.axvline(x=100, color="black", linestyle="--", alpha=0.5)
+    ax.text(100, len(names) - 0.5, "100%", ha="center", va="bottom", fontweight="bold")
+
+    # Add grid
+    ax.grid(True, axis="x", alpha=0.3)
+
+    fig.tight_layout()
+
+    return export_figure(fig, output)
+
+
+def render_savings_trend(months, cumulative_savings, output="base64"):
+    """Draw cumulative savings per "YYYY-MM" month as a filled line"""
+    import matplotlib.dates as mdates
+
+    fig, ax = new_figure(figsize=(12, 6))
+
+    dates = [datetime.strptime(m, "%Y-%m") for m in months]
+    ax.plot(
+        dates,
+        cumulative_savings,
+        marker="o",
+        linewidth=2,
+        markersize=6,
+        color="#3498db",
+    )
+
+    # Fill area under curve
+    ax.fill_between(dates, cumulative_savings, alpha=0.3, color="#3498db")
+
+    # Customize the chart
+    ax.set_xlabel("Month", fontweight="bold")
+    ax.set_ylabel("Cumulative Savings ($)", fontweight="bold")
+    ax.set_title("Savings Trend Over Time", fontsize=16, fontweight="bold")
+    ax.grid(True, alpha=0.3)
+
+    # Format x-axis
+    ax.xaxis.set_major_formatter(mdates.DateFormatter("%b %Y"))
+    ax.xaxis.set_major_locator(mdates.MonthLocator(interval=2))
+    ax.tick_params(axis="x", labelrotation=45)
+
+    # Add value annotations for key points
+    if cumulative_savings:
+        # Annotate the latest value
+        latest_value = cumulative_savings[-1]
+        ax.annotate(
+            f"${latest_value:,.0f}",
+            xy=(dates[-1], latest_value),
+            xytext=(10, 10),
+            textcoords="offset points",
+            bbox=dict(boxstyle="round,pad=0.3", facecolor="yellow", alpha=0.7),
+            arrowprops=dict(arrowstyle="->", connectionstyle="arc3,rad=0"),
+        )
+
+    fig.tight_layout()
+
+    return export_figure(fig, output)
+
+
+RENDERERS = {
+    "spending-by-category": render_spending_by_category,
+    "income-vs-expenses": render_income_vs_expenses,
+    "goals-progress": render_goals_progress,
+    "savings-trend": render_savings_trend,
+}
+
+
+def load_matplotlib():
+    """Import everything the renderers use; the render pool's initializer
+
+    Render workers call this as they start, so the first chart they draw
+    does not wait for the imports.
+    """
+    import matplotlib.dates  # noqa: F401
+    import numpy  # noqa: F401
+    from matplotlib import colormaps  # noqa: F401
+    from matplotlib.backends import backend_agg  # noqa: F401
+    from matplotlib.figure import Figure  # noqa: F401
+
+
+def render_chart(kind, data, output="bytes"):
+    """Render chart kind from its data dict; the render pool's entry point"""
+    try:
+        renderer = RENDERERS[kind]
+    except KeyError:
+        raise ValueError(f"Unknown chart kind: {kind!r}") from None
+    return renderer(**data, output=output)
@@ -1,166 +1,76 @@
-import base64
-import io
+import multiprocessing
+import threading
 from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from datetime import datetime, timedelta
 
-import matplotlib.dates as mdates
-import matplotlib.pyplot as plt
-import numpy as np
-from matplotlib.backends.backend_agg import FigureCanvasAgg
+from flask import current_app
 
-from app import db
 from app.models.goal import Goal
-from app.models.transaction import Transaction
-
-# Set matplotlib to use non-interactive backend
-plt.switch_backend("Agg")
-
-
-def create_spending_by_category_chart(user_id, start_date=None, end_date=None):
-    """Generate a pie chart of spending by category using Matplotlib"""
-    # Query expenses by category
-    query = Transaction.query.filter_by(user_id=user_id, type="expense")
-
-    if start_date:
-        query = query.filter(Transaction.date >= start_date)
-    if end_date:
-        query = query.filter(Transaction.date <= end_date)
-
-    transactions = query.all()
-
-    if not transactions:
-        return None
-
-    # Aggregate spending by category
-    category_totals = defaultdict(float)
-    for transaction in transactions:
-        category_totals[transaction.category] += transaction.amount
-
-    # Prepare data for chart
-    categories = list(category_totals.keys())
-    amounts = list(category_totals.values())
-
-    # Create the chart
-    fig, ax = plt.subplots(figsize=(10, 8))
-    colors = plt.cm.Set3(np.linspace(0, 1, len(categories)))
-
-    wedges, texts, autotexts = ax.pie(
-        amounts, labels=categories, autopct="%1.1f%%", colors=colors, startangle=90
+from app.utils.chart_render import load_matplotlib, render_chart
+from app.utils.data_aggregation import aggregate_transactions, monthly_net_savings
+from app.utils.money import Money
+from app.utils.workers import BoundedExecutor
+
+DEFAULT_RENDER_WORKERS = 2
+DEFAULT_RENDER_TIMEOUT = 10.0
+
+
+# Data preparation: query the database and reduce to plain, picklable data
+def spending_by_category_series(user_id, start_date=None, end_date=None):
+    """Return pie chart data for a user's expenses, or None if there are none"""
+    # Aggregate expenses by category in SQL
+    rows = aggregate_transactions(
+        user_id,
+        group_by=("category",),
+        start_date=start_date,
+        end_date=end_date,
+        transaction_type="expense",
     )
 
-    # Customize the chart
-    ax.set_title("Spending by Category", fontsize=16, fontweight="bold", pad=20)
-
-    # Improve label formatting
-    for autotext in autotexts:
-        autotext.set_color("white")
-        autotext.set_fontweight("bold")
-
-    # Add total spending
-    total_spending = sum(amounts)
-    fig.suptitle(f"Total Spending: ${total_spending:,.2f}", fontsize=12, y=0.02)
-
-    plt.tight_layout()
-
-    # Convert to base64 string for web display
-    img_buffer = io.BytesIO()
-    plt.savefig(img_buffer, format="png", dpi=150, bbox_inches="tight")
-    img_buffer.seek(0)
-    img_base64 = base64.b64encode(img_buffer.getvalue()).decode()
-    plt.close()
+    if not rows:
+        return None
 
-    return img_base64
+    return {
+        "categories": [row.category for row in rows],
+        "amounts": [float(row.total) for row in rows],
+    }
 
 
-def create_income_vs_expenses_chart(user_id, months=6):
-    """Generate a bar chart comparing income vs expenses over time"""
+def income_vs_expenses_series(user_id, months=6):
+    """Return monthly income and expense totals, or None if there are none"""
     # Calculate date range
     end_date = datetime.now().date()
     start_date = end_date - timedelta(days=months * 30)
 
-    # Query transactions
-    transactions = (
-        Transaction.query.filter_by(user_id=user_id)
-        .filter(Transaction.date >= start_date)
-        .filter(Transaction.date <= end_date)
-        .order_by(Transaction.date)
-        .all()
+    # Aggregate transactions by month and type in SQL
+    rows = aggregate_transactions(
+        user_id, group_by=("month", "type"), start_date=start_date, end_date=end_date
     )
 
-    if not transactions:
+    if not rows:
         return None
 
     # Aggregate by month
-    monthly_data = defaultdict(lambda: {"income": 0, "expenses": 0})
+    monthly_data = defaultdict(lambda: {"income": Money(0), "expenses": Money(0)})
 
-    for transaction in transactions:
-        month_key = transaction.date.strftime("%Y-%m")
-        if transaction.type == "income":
-            monthly_data[month_key]["income"] += transaction.amount
+    for row in rows:
+        if row.type == "income":
+            monthly_data[row.month]["income"] += row.total
         else:
-            monthly_data[month_key]["expenses"] += transaction.amount
+            monthly_data[row.month]["expenses"] += row.total
 
-    # Prepare data for chart
     months_list = sorted(monthly_data.keys())
-    income_data = [monthly_data[month]["income"] for month in months_list]
-    expense_data = [monthly_data[month]["expenses"] for month in months_list]
-
-    # Create the chart
-    fig, ax = plt.subplots(figsize=(12, 6))
-
-    x = np.arange(len(months_list))
-    width = 0.35
-
-    bars1 = ax.bar(
-        x - width / 2, income_data, width, label="Income", color="#2ecc71", alpha=0.8
-    )
-    bars2 = ax.bar(
-        x + width / 2, expense_data, width, label="Expenses", color="#e74c3c", alpha=0.8
-    )
-
-    # Customize the chart
-    ax.set_xlabel("Month", fontweight="bold")
-    ax.set_ylabel("Amount ($)", fontweight="bold")
-    ax.set_title("Income vs Expenses by Month", fontsize=16, fontweight="bold")
-    ax.set_xticks(x)
-    ax.set_xticklabels(
-        [datetime.strptime(m, "%Y-%m").strftime("%b %Y") for m in months_list],
-        rotation=45,
-    )
-    ax.legend()
-    ax.grid(True, alpha=0.3)
-
-    # Add value labels on bars
-    def add_value_labels(bars):
-        for bar in bars:
-            height = bar.get_height()
-            if height > 0:
-                ax.text(
-                    bar.get_x() + bar.get_width() / 2.0,
-                    height + max(income_data + expense_data) * 0.01,
-                    f"${height:,.0f}",
-                    ha="center",
-                    va="bottom",
-                    fontsize=8,
-                )
-
-    add_value_labels(bars1)
-    add_value_labels(bars2)
-
-    plt.tight_layout()
-
-    # Convert to base64
-    img_buffer = io.BytesIO()
-    plt.savefig(img_buffer, format="png", dpi=150, bbox_inches="tight")
-    img_buffer.seek(0)
-    img_base64 = base64.b64encode(img_buffer.getvalue()).decode()
-    plt.close()
+    return {
+        "months": months_list,
+        "income": [float(monthly_data[month]["income"]) for month in months_list],
+        "expenses": [float(monthly_data[month]["expenses"]) for month in months_list],
+    }
 
-    return img_base64
 
-
-def create_goals_progress_chart(user_id):
-    """Generate a horizontal bar chart showing progress on financial goals"""
+def goals_progress_series(user_id):
+    """Return progress of active and completed goals, or None if there are none"""
     goals = (
         Goal.query.filter_by(user_id=user_id)
         .filter(Goal.status.in_(["active", "completed"]))
@@ -171,155 +81,126 @@ def create_goals_progress_chart(user_id):
     if not goals:
         return None
 
-    # Prepare data
-    goal_names = [
-        goal.title[:20] + "..." if len(goal.title) > 20 else goal.title
-        for goal in goals
-    ]
-    progress_percentages = [goal.progress_percentage for goal in goals]
-    target_amounts = [goal.target_amount for goal in goals]
-
-    # Create the chart
-    fig, ax = plt.subplots(figsize=(12, max(6, len(goals) * 0.8)))
-
-    # Create horizontal bars
-    colors = [
-        "#2ecc71" if p >= 100 else "#f39c12" if p >= 75 else "#e74c3c"
-        for p in progress_percentages
-    ]
-    bars = ax.barh(goal_names, progress_percentages, color=colors, alpha=0.8)
-
-    # Customize the chart
-    ax.set_xlabel("Progress (%)", fontweight="bold")
-    ax.set_title("Financial Goals Progress", fontsize=16, fontweight="bold", pad=20)
-    ax.set_xlim(0, 100)
-
-    # Add percentage labels
-    for i, (bar, percentage, target) in enumerate(
-        zip(bars, progress_percentages, target_amounts)
-    ):
-        width = bar.get_width()
-        ax.text(
-            width + 1,
-            bar.get_y() + bar.get_height() / 2,
-            f"{percentage:.1f}%",
-            ha="left",
-            va="center",
-            fontweight="bold",
-        )
-        ax.text(
-            -2,
-            bar.get_y() + bar.get_height() / 2,
-            f"${target:,.0f}",
-            ha="right",
-            va="center",
-            fontsize=9,
-            alpha=0.7,
-        )
-
-    # Add a 100% reference line
-    ax.axvline(x=100, color="black", linestyle="--", alpha=0.5)
-    ax.text(100, len(goals) - 0.5, "100%", ha="center", va="bottom", fontweight="bold")
-
-    # Add grid
-    ax.grid(True, axis="x", alpha=0.3)
-
-    plt.tight_layout()
-
-    # Convert to base64
-    img_buffer = io.BytesIO()
-    plt.savefig(img_buffer, format="png", dpi=150, bbox_inches="tight")
-    img_buffer.seek(0)
-    img_base64 = base64.b64encode(img_buffer.getvalue()).decode()
-    plt.close()
-
-    return img_base64
-
-
-def create_savings_trend_chart(user_id, months=12):
-    """Generate a line chart showing savings trend over time"""
+    return {
+        "names": [
+            goal.name[:20] + "..." if len(goal.name) > 20 else goal.name
+            for goal in goals
+        ],
+        "percentages": [goal.progress_percentage for goal in goals],
+        "targets": [float(goal.target_amount) for goal in goals],
+    }
+
+
+def savings_trend_series(user_id, months=12):
+    """Return cumulative savings per month, or None if there are no transactions"""
     # Calculate date range
     end_date = datetime.now().date()
     start_date = end_date - timedelta(days=months * 30)
 
-    # Query transactions
-    transactions = (
-        Transaction.query.filter_by(user_id=user_id)
-        .filter(Transaction.date >= start_date)
-        .filter(Transaction.date <= end_date)
-        .order_by(Transaction.date)
-        .all()
+    months_list, _, cumulative_savings = monthly_net_savings(
+        user_id, start_date, end_date
     )
 
-    if not transactions:
+    if not months_list:
         return None
 
-    # Calculate cumulative savings by month
-    monthly_savings = defaultdict(float)
+    return {"months": months_list, "cumulative_savings": cumulative_savings}
 
-    for transaction in transactions:
-        month_key = transaction.date.strftime("%Y-%m")
-        if transaction.type == "income":
-            monthly_savings[month_key] += transaction.amount
-        else:
-            monthly_savings[month_key] -= transaction.amount
-
-    # Convert to cumulative savings
-    months_list = sorted(monthly_savings.keys())
-    cumulative_savings = []
-    total = 0
-
-    for month in months_list:
-        total += monthly_savings[month]
-        cumulative_savings.append(total)
-
-    # Create the chart
-    fig, ax = plt.subplots(figsize=(12, 6))
-
-    dates = [datetime.strptime(m, "%Y-%m") for m in months_list]
-    ax.plot(
-        dates,
-        cumulative_savings,
-        marker="o",
-        linewidth=2,
-        markersize=6,
-        color="#3498db",
+
+# In-process chart functions: prepare the data and render it on this thread
+def create_spending_by_category_chart(
+    user_id, start_date=None, end_date=None, output="base64"
+):
+    """Generate a pie chart of spending by category using Matplotlib"""
+    data = spending_by_category_series(user_id, start_date, end_date)
+    return render_chart("spending-by-category", data, output) if data else None
+
+
+def create_income_vs_expenses_chart(user_id, months=6, output="base64"):
+    """Generate a bar chart comparing income vs expenses over time"""
+    data = income_vs_expenses_series(user_id, months)
+    return render_chart("income-vs-expenses", data, output) if data else None
+
+
+def create_goals_progress_chart(user_id, output="base64"):
+    """Generate a horizontal bar chart showing progress on financial goals"""
+    data = goals_progress_series(user_id)
+    return render_chart("goals-progress", data, output) if data else None
+
+
+def create_savings_trend_chart(user_id, months=12, output="base64"):
+    """Generate a line chart showing savings trend over time"""
+    data = savings_trend_series(user_id, months)
+    return render_chart("savings-trend", data, output) if data else None
+
+
+class ChartRenderPool:
+    """Render charts in worker processes, off the request threads
+
+    Jobs take plain data from the *_series functions, never ORM objects.
+    At most queue_size renders are queued or running; render() raises
+    workers.QueueFull beyond that and concurrent.futures.TimeoutError when a
+    render takes longer than timeout seconds. If a worker dies, render()
+    raises BrokenProcessPool and the next call starts a new executor. With
+    workers=0 charts are rendered inline on the calling thread.
+    """
+
+    def __init__(self, workers, queue_size=None, timeout=DEFAULT_RENDER_TIMEOUT):
+        self.workers = workers
+        self.queue_size = queue_size or max(workers, 1) * 4
+        self.timeout = timeout
+        self._pool = None
+        self._lock = threading.Lock()
+
+    def render(self, kind, data, output="bytes"):
+        """Render chart kind from data and return it in the given output mode"""
+        if not self.workers:
+            return render_chart(kind, data, output)
+
+        pool = self._get_pool()
+        try:
+            return pool.run(render_chart, kind, data, output, timeout=self.timeout)
+        except BrokenProcessPool:
+            # A worker died; start a fresh pool for the next request
+            with self._lock:
+                if self._pool is pool:
+                    self._pool = None
+            pool.shutdown(wait=False)
+            raise
+
+    def shutdown(self, wait=True):
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=wait)
+
+    def _get_pool(self):
+        # Started on first use so CLI commands and tests never fork workers.
+        # "spawn" keeps workers free of the parent's threads, locks and
+        # database connections. Workers import Matplotlib as they start; the
+        # web process itself never does.
+        with self._lock:
+            if self._pool is None:
+                executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=load_matplotlib,
+                )
+                self._pool = BoundedExecutor(executor, self.queue_size)
+            return self._pool
+
+
+def init_render_pool(app):
+    """Create the chart render pool for app from its configuration"""
+    pool = ChartRenderPool(
+        workers=app.config.get("CHART_RENDER_WORKERS", DEFAULT_RENDER_WORKERS),
+        queue_size=app.config.get("CHART_RENDER_QUEUE_SIZE"),
+        timeout=app.config.get("CHART_RENDER_TIMEOUT", DEFAULT_RENDER_TIMEOUT),
     )
+    app.extensions["chart_render_pool"] = pool
+    return pool
+
 
-    # Fill area under curve
-    ax.fill_between(dates, cumulative_savings, alpha=0.3, color="#3498db")
-
-    # Customize the chart
-    ax.set_xlabel("Month", fontweight="bold")
-    ax.set_ylabel("Cumulative Savings ($)", fontweight="bold")
-    ax.set_title("Savings Trend Over Time", fontsize=16, fontweight="bold")
-    ax.grid(True, alpha=0.3)
-
-    # Format x-axis
-    ax.xaxis.set_major_formatter(mdates.DateFormatter("%b %Y"))
-    ax.xaxis.set_major_locator(mdates.MonthLocator(interval=2))
-    plt.xticks(rotation=45)
-
-    # Add value annotations for key points
-    if cumulative_savings:
-        # Annotate the latest value
-        latest_value = cumulative_savings[-1]
-        ax.annotate(
-            f"${latest_value:,.0f}",
-            xy=(dates[-1], latest_value),
-            xytext=(10, 10),
-            textcoords="offset points",
-            bbox=dict(boxstyle="round,pad=0.3", facecolor="yellow", alpha=0.7),
-            arrowprops=dict(arrowstyle="->", connectionstyle="arc3,rad=0"),
-        )
-
-    plt.tight_layout()
-
-    # Convert to base64
-    img_buffer = io.BytesIO()
-    plt.savefig(img_buffer, format="png", dpi=150, bbox_inches="tight")
-    img_buffer.seek(0)
-    img_base64 = base64.b64encode(img_buffer.getvalue()).decode()
-    plt.close()
-
-    return img_base64
+def get_render_pool():
+    """Return the current application's chart render pool"""
+    return current_app.extensions["chart_render_pool"]
@@ -0,0 +1,68 @@
+"""Conditional GET for views whose output depends only on the user's data."""
+
+import hashlib
+import json
+from datetime import date, datetime, time, timezone
+from functools import wraps
+
+from flask import make_response, request
+from flask_login import current_user
+from werkzeug.http import is_resource_modified
+
+from app.models.data_version import get_data_version
+
+
+def data_validators(user_id, *parts):
+    """Return (strong ETag, Last-Modified) for a user's data-derived resource
+
+    Both change whenever the user's data version does. Date-relative views
+    ("the last 6 months") also change at midnight, so today's date is part
+    of the ETag and Last-Modified is never earlier than the start of today.
+    """
+    version, updated_at = get_data_version(user_id)
+    today = date.today()
+    payload = json.dumps([user_id, version, today.isoformat(), *parts], default=str)
+    etag = hashlib.sha256(payload.encode()).hexdigest()[:32]
+
+    last_modified = datetime.combine(today, time()).astimezone(timezone.utc)
+    if updated_at is not None:
+        if updated_at.tzinfo is None:
+            # SQLite hands back the stored UTC timestamps naive
+            updated_at = updated_at.replace(tzinfo=timezone.utc)
+        last_modified = max(last_modified, updated_at)
+    return etag, last_modified.replace(microsecond=0)
+
+
+def conditional_on_data_version(view):
+    """Answer If-None-Match / If-Modified-Since with 304 before running view
+
+    For views whose response is a function of the current user's
+    transactions and goals, the path and the query string. The validators
+    are checked before view is called, so a matching request skips all of
+    its queries and aggregation. Successful responses carry the ETag and
+    Last-Modified, and must be revalidated on every use.
+
+    Only a matching ETag gets a 304. Last-Modified has one-second
+    resolution, so a write in the same second as a client's last fetch
+    would leave its If-Modified-Since matching the changed data.
+    """
+
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        etag, last_modified = data_validators(
+            current_user.id, request.path, sorted(request.args.items(multi=True))
+        )
+        if not is_resource_modified(request.environ, etag=etag):
+            response = make_response("", 304)
+        else:
+            response = make_response(view(*args, **kwargs))
+            if response.status_code != 200:
+                return response
+
+        response.set_etag(etag)
+        response.last_modified = last_modified
+        response.cache_control.private = True
+        response.cache_control.no_cache = True
+        return response
+
+    return wrapper
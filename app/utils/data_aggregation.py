@@ -1,52 +1,281 @@
-from collections import defaultdict
+from collections import defaultdict, namedtuple
 from datetime import datetime, timedelta
 
+from flask import current_app
+from sqlalchemy import case, extract, func, true
+
+from app import db
 from app.models.goal import Goal
+from app.models.rollup import MonthlyRollup
 from app.models.transaction import Transaction
+from app.utils.json_provider import JSONFragment
+from app.utils.money import Money
+
+# One aggregated group; dimensions that were not grouped on are None
+GroupTotal = namedtuple("GroupTotal", ["type", "category", "month", "total", "count"])
+
+GROUP_DIMENSIONS = ("type", "category", "month")
+
+# "sql" groups in the database (using rollups); "numpy" groups each user's
+# cached transaction arrays in process
+AGGREGATION_BACKENDS = ("sql", "numpy")
+DEFAULT_AGGREGATION_BACKEND = "sql"
+
+# Slice colors of the spending chart, in order
+CATEGORY_PALETTE = (
+    "#FF6384",
+    "#36A2EB",
+    "#FFCE56",
+    "#4BC0C0",
+    "#9966FF",
+    "#FF9F40",
+    "#FF6384",
+    "#C9CBCF",
+    "#4BC0C0",
+    "#FF6384",
+    "#36A2EB",
+)
+
+# Every prefix of the palette, encoded to JSON once
+_PALETTE_FRAGMENTS = [
+    JSONFragment(list(CATEGORY_PALETTE[:length]))
+    for length in range(len(CATEGORY_PALETTE) + 1)
+]
+
+# Home page dashboard figures
+FinancialSummary = namedtuple(
+    "FinancialSummary", ["total_income", "total_expenses", "net_balance"]
+)
+GoalSummary = namedtuple(
+    "GoalSummary", ["active_goals", "completed_goals", "total_goals"]
+)
+
+
+def aggregate_transactions(
+    user_id,
+    group_by=("type",),
+    start_date=None,
+    end_date=None,
+    transaction_type=None,
+    use_rollups=True,
+    backend=None,
+):
+    """Sum and count a user's transactions in SQL, grouped by type/category/month
+
+    Only one scalar row per group leaves the database, so the cost on the
+    Python side is proportional to the number of groups rather than the
+    number of transactions. Months are returned as "YYYY-MM" strings.
+
+    Calendar months lying entirely inside the date range are read from the
+    MonthlyRollup table; only the partial months at either edge are summed
+    from the transaction table, so long ranges cost the same as short ones.
+
+    backend overrides the AGGREGATION_BACKEND setting for this call; the
+    "numpy" backend ignores use_rollups and always reads raw transactions.
+    """
+    unknown = set(group_by) - set(GROUP_DIMENSIONS)
+    if unknown:
+        raise ValueError(f"Cannot group transactions by {sorted(unknown)}")
+
+    if resolve_backend(backend) == "numpy":
+        from app.utils import vector_aggregation
+
+        return vector_aggregation.aggregate(
+            user_id, group_by, start_date, end_date, transaction_type
+        )
+
+    if not use_rollups:
+        return _aggregate_raw(user_id, group_by, start_date, end_date, transaction_type)
+
+    first_full, after_full = _full_month_bounds(start_date, end_date)
+    if first_full is not None and after_full is not None and first_full >= after_full:
+        # No complete month in range
+        return _aggregate_raw(user_id, group_by, start_date, end_date, transaction_type)
+
+    parts = [
+        _aggregate_rollups(user_id, group_by, first_full, after_full, transaction_type)
+    ]
+    if start_date and start_date < first_full:
+        parts.append(
+            _aggregate_raw(
+                user_id,
+                group_by,
+                start_date,
+                first_full - timedelta(days=1),
+                transaction_type,
+            )
+        )
+    if end_date and after_full <= end_date:
+        parts.append(
+            _aggregate_raw(user_id, group_by, after_full, end_date, transaction_type)
+        )
+    return _merge_groups(parts) if len(parts) > 1 else parts[0]
+
+
+def resolve_backend(backend=None):
+    """Return backend, or the configured default, checking it is known"""
+    backend = backend or current_app.config.get(
+        "AGGREGATION_BACKEND", DEFAULT_AGGREGATION_BACKEND
+    )
+    if backend not in AGGREGATION_BACKENDS:
+        raise ValueError(f"Unknown aggregation backend: {backend!r}")
+    return backend
 
 
-def get_spending_by_category_data(user_id, start_date=None, end_date=None):
-    """Get spending data by category for Chart.js pie chart"""
-    query = Transaction.query.filter_by(user_id=user_id, type="expense")
+def _month_start(day):
+    return day.replace(day=1)
+
+
+def _next_month_start(day):
+    return (day.replace(day=1) + timedelta(days=32)).replace(day=1)
+
+
+def _full_month_bounds(start_date, end_date):
+    """Return [first, after) covering the whole calendar months in the range"""
+    first_full = None
+    if start_date:
+        first_full = (
+            start_date if start_date.day == 1 else _next_month_start(start_date)
+        )
+    after_full = None
+    if end_date:
+        after_full = _month_start(end_date + timedelta(days=1))
+    return first_full, after_full
+
+
+def _merge_groups(parts):
+    totals = {}
+    for rows in parts:
+        for row in rows:
+            key = (row.type, row.category, row.month)
+            if key in totals:
+                previous = totals[key]
+                row = previous._replace(
+                    total=previous.total + row.total, count=previous.count + row.count
+                )
+            totals[key] = row
+    return list(totals.values())
+
+
+def _aggregate_rollups(user_id, group_by, first_month, after_month, transaction_type):
+    """Sum the rollup rows for the whole months in [first_month, after_month)"""
+    columns = []
+    if "type" in group_by:
+        columns.append(MonthlyRollup.type.label("type"))
+    if "category" in group_by:
+        columns.append(MonthlyRollup.category.label("category"))
+    if "month" in group_by:
+        columns.append(MonthlyRollup.month.label("month"))
+
+    query = db.session.query(
+        *columns,
+        func.sum(MonthlyRollup.total).label("total"),
+        func.sum(MonthlyRollup.count).label("count"),
+    ).filter(MonthlyRollup.user_id == user_id)
+
+    if transaction_type:
+        query = query.filter(MonthlyRollup.type == transaction_type)
+    if first_month:
+        query = query.filter(MonthlyRollup.month >= first_month.strftime("%Y-%m"))
+    if after_month:
+        query = query.filter(MonthlyRollup.month < after_month.strftime("%Y-%m"))
+    if columns:
+        query = query.group_by(*columns)
+
+    return [
+        GroupTotal(
+            type=getattr(row, "type", None),
+            category=getattr(row, "category", None),
+            month=getattr(row, "month", None),
+            total=row.total,
+            count=row.count,
+        )
+        for row in query.all()
+        if row.count
+    ]
+
 
+def _aggregate_raw(user_id, group_by, start_date, end_date, transaction_type):
+    """Sum the transaction table directly over [start_date, end_date]"""
+    columns = []
+    if "type" in group_by:
+        columns.append(Transaction.type.label("type"))
+    if "category" in group_by:
+        columns.append(Transaction.category.label("category"))
+    if "month" in group_by:
+        columns.append(extract("year", Transaction.date).label("year"))
+        columns.append(extract("month", Transaction.date).label("month"))
+
+    query = db.session.query(
+        *columns,
+        func.sum(Transaction.amount).label("total"),
+        func.count(Transaction.id).label("count"),
+    ).filter(Transaction.user_id == user_id)
+
+    if transaction_type:
+        query = query.filter(Transaction.type == transaction_type)
     if start_date:
         query = query.filter(Transaction.date >= start_date)
     if end_date:
         query = query.filter(Transaction.date <= end_date)
+    if columns:
+        query = query.group_by(*columns)
+
+    return [
+        GroupTotal(
+            type=getattr(row, "type", None),
+            category=getattr(row, "category", None),
+            month=(
+                f"{int(row.year):04d}-{int(row.month):02d}"
+                if "month" in group_by
+                else None
+            ),
+            total=row.total,
+            count=row.count,
+        )
+        for row in query.all()
+        if row.count
+    ]
+
+
+def _category_palette(count):
+    """The colors of the first count slices, as a pre-encoded JSON list"""
+    return _PALETTE_FRAGMENTS[min(count, len(CATEGORY_PALETTE))]
+
 
-    transactions = query.all()
+def get_spending_by_category_data(
+    user_id, start_date=None, end_date=None, backend=None
+):
+    """Get spending data by category for Chart.js pie chart"""
+    rows = aggregate_transactions(
+        user_id,
+        group_by=("category",),
+        start_date=start_date,
+        end_date=end_date,
+        transaction_type="expense",
+        backend=backend,
+    )
 
-    # Aggregate by category
-    category_totals = defaultdict(float)
-    for transaction in transactions:
-        category_totals[transaction.category] += transaction.amount
+    # Largest slices first
+    category_totals = {
+        row.category: row.total
+        for row in sorted(rows, key=lambda row: row.total, reverse=True)
+    }
 
     # Prepare data for Chart.js
     data = {
         "labels": list(category_totals.keys()),
         "datasets": [
             {
-                "data": list(category_totals.values()),
-                "backgroundColor": [
-                    "#FF6384",
-                    "#36A2EB",
-                    "#FFCE56",
-                    "#4BC0C0",
-                    "#9966FF",
-                    "#FF9F40",
-                    "#FF6384",
-                    "#C9CBCF",
-                    "#4BC0C0",
-                    "#FF6384",
-                    "#36A2EB",
-                ][: len(category_totals)],
+                "data": [float(total) for total in category_totals.values()],
+                "backgroundColor": _category_palette(len(category_totals)),
                 "borderWidth": 2,
                 "borderColor": "#fff",
             }
         ],
     }
 
-    total_spending = sum(category_totals.values())
+    total_spending = float(Money.sum(category_totals.values()))
 
     return {
         "chart_data": data,
@@ -55,33 +284,34 @@ def get_spending_by_category_data(user_id, start_date=None, end_date=None):
     }
 
 
-def get_income_vs_expenses_data(user_id, months=6):
+def get_income_vs_expenses_data(user_id, months=6, backend=None):
     """Get income vs expenses data for Chart.js bar chart"""
     end_date = datetime.now().date()
     start_date = end_date - timedelta(days=months * 30)
 
-    transactions = (
-        Transaction.query.filter_by(user_id=user_id)
-        .filter(Transaction.date >= start_date)
-        .filter(Transaction.date <= end_date)
-        .order_by(Transaction.date)
-        .all()
+    rows = aggregate_transactions(
+        user_id,
+        group_by=("month", "type"),
+        start_date=start_date,
+        end_date=end_date,
+        backend=backend,
     )
 
     # Aggregate by month
-    monthly_data = defaultdict(lambda: {"income": 0, "expenses": 0})
+    monthly_data = defaultdict(lambda: {"income": Money(0), "expenses": Money(0)})
 
-    for transaction in transactions:
-        month_key = transaction.date.strftime("%Y-%m")
-        if transaction.type == "income":
-            monthly_data[month_key]["income"] += transaction.amount
+    for row in rows:
+        if row.type == "income":
+            monthly_data[row.month]["income"] += row.total
         else:
-            monthly_data[month_key]["expenses"] += transaction.amount
+            monthly_data[row.month]["expenses"] += row.total
 
     # Prepare data for Chart.js
     months_list = sorted(monthly_data.keys())
-    income_data = [monthly_data[month]["income"] for month in months_list]
-    expense_data = [monthly_data[month]["expenses"] for month in months_list]
+    income_totals = [monthly_data[month]["income"] for month in months_list]
+    expense_totals = [monthly_data[month]["expenses"] for month in months_list]
+    income_data = [float(total) for total in income_totals]
+    expense_data = [float(total) for total in expense_totals]
     month_labels = [
         datetime.strptime(m, "%Y-%m").strftime("%b %Y") for m in months_list
     ]
@@ -106,11 +336,13 @@ def get_income_vs_expenses_data(user_id, months=6):
         ],
     }
 
+    total_income = Money.sum(income_totals)
+    total_expenses = Money.sum(expense_totals)
     return {
         "chart_data": data,
-        "total_income": sum(income_data),
-        "total_expenses": sum(expense_data),
-        "net_savings": sum(income_data) - sum(expense_data),
+        "total_income": float(total_income),
+        "total_expenses": float(total_expenses),
+        "net_savings": float(total_income - total_expenses),
     }
 
 
@@ -128,8 +360,7 @@ def get_goals_progress_data(user_id):
 
     # Prepare data
     goal_labels = [
-        goal.title[:20] + "..." if len(goal.title) > 20 else goal.title
-        for goal in goals
+        goal.name[:20] + "..." if len(goal.name) > 20 else goal.name for goal in goals
     ]
     progress_data = [goal.progress_percentage for goal in goals]
 
@@ -174,43 +405,67 @@ def get_goals_progress_data(user_id):
     }
 
 
-def get_savings_trend_data(user_id, months=12):
-    """Get savings trend data for Chart.js line chart"""
-    end_date = datetime.now().date()
-    start_date = end_date - timedelta(days=months * 30)
-
-    transactions = (
-        Transaction.query.filter_by(user_id=user_id)
-        .filter(Transaction.date >= start_date)
-        .filter(Transaction.date <= end_date)
-        .order_by(Transaction.date)
-        .all()
+def monthly_net_savings(user_id, start_date, end_date, backend=None):
+    """Return (months, net savings per month, cumulative savings) as floats
+
+    Months are sorted "YYYY-MM" strings; all three lists are empty when the
+    user has no transactions in the range.
+    """
+    if resolve_backend(backend) == "numpy":
+        from app.utils import vector_aggregation
+
+        savings = vector_aggregation.monthly_savings(
+            vector_aggregation.user_arrays(user_id, start_date, end_date)
+        )
+        return (
+            savings.months,
+            (savings.net / 100).tolist(),
+            (savings.cumulative / 100).tolist(),
+        )
+
+    rows = aggregate_transactions(
+        user_id,
+        group_by=("month", "type"),
+        start_date=start_date,
+        end_date=end_date,
+        backend="sql",
     )
 
-    if not transactions:
-        return None
-
     # Calculate monthly net savings
-    monthly_savings = defaultdict(float)
+    monthly_savings = defaultdict(Money)
 
-    for transaction in transactions:
-        month_key = transaction.date.strftime("%Y-%m")
-        if transaction.type == "income":
-            monthly_savings[month_key] += transaction.amount
+    for row in rows:
+        if row.type == "income":
+            monthly_savings[row.month] += row.total
         else:
-            monthly_savings[month_key] -= transaction.amount
+            monthly_savings[row.month] -= row.total
 
     # Convert to cumulative savings
     months_list = sorted(monthly_savings.keys())
     cumulative_savings = []
     monthly_net = []
-    total = 0
+    total = Money(0)
 
     for month in months_list:
         monthly_amount = monthly_savings[month]
         total += monthly_amount
-        cumulative_savings.append(total)
-        monthly_net.append(monthly_amount)
+        cumulative_savings.append(float(total))
+        monthly_net.append(float(monthly_amount))
+
+    return months_list, monthly_net, cumulative_savings
+
+
+def get_savings_trend_data(user_id, months=12, backend=None):
+    """Get savings trend data for Chart.js line chart"""
+    end_date = datetime.now().date()
+    start_date = end_date - timedelta(days=months * 30)
+
+    months_list, monthly_net, cumulative_savings = monthly_net_savings(
+        user_id, start_date, end_date, backend
+    )
+
+    if not months_list:
+        return None
 
     month_labels = [
         datetime.strptime(m, "%Y-%m").strftime("%b %Y") for m in months_list
@@ -246,38 +501,140 @@ def get_savings_trend_data(user_id, months=12):
     }
 
 
-def get_transaction_summary_data(user_id, days=30):
+def get_transaction_summary_data(user_id, days=30, backend=None):
     """Get recent transaction summary for dashboard widgets"""
     end_date = datetime.now().date()
     start_date = end_date - timedelta(days=days)
 
-    transactions = (
-        Transaction.query.filter_by(user_id=user_id)
-        .filter(Transaction.date >= start_date)
-        .filter(Transaction.date <= end_date)
-        .all()
+    # A single (type, category) grouping yields every figure below
+    rows = aggregate_transactions(
+        user_id,
+        group_by=("type", "category"),
+        start_date=start_date,
+        end_date=end_date,
+        backend=backend,
     )
 
     # Calculate summaries
-    total_income = sum(t.amount for t in transactions if t.type == "income")
-    total_expenses = sum(t.amount for t in transactions if t.type == "expense")
-    transaction_count = len(transactions)
+    total_income = Money.sum(row.total for row in rows if row.type == "income")
+    total_expenses = Money.sum(row.total for row in rows if row.type == "expense")
+    transaction_count = sum(row.count for row in rows)
 
     # Top spending categories
-    expense_categories = defaultdict(float)
-    for transaction in transactions:
-        if transaction.type == "expense":
-            expense_categories[transaction.category] += transaction.amount
-
-    top_categories = sorted(
-        expense_categories.items(), key=lambda x: x[1], reverse=True
-    )[:5]
+    expense_categories = defaultdict(Money)
+    for row in rows:
+        if row.type == "expense":
+            expense_categories[row.category] += row.total
+
+    top_categories = [
+        (category, float(total))
+        for category, total in sorted(
+            expense_categories.items(), key=lambda x: x[1], reverse=True
+        )[:5]
+    ]
 
     return {
-        "total_income": total_income,
-        "total_expenses": total_expenses,
-        "net_amount": total_income - total_expenses,
+        "total_income": float(total_income),
+        "total_expenses": float(total_expenses),
+        "net_amount": float(total_income - total_expenses),
         "transaction_count": transaction_count,
         "top_spending_categories": top_categories,
         "period_days": days,
     }
+
+
+def get_goal_stats_data(user_id):
+    """Get goal counts and overall progress for the goals stats API"""
+    goals = Goal.query.filter_by(user_id=user_id).all()
+
+    stats = {
+        "total_goals": len(goals),
+        "active_goals": len([g for g in goals if g.status == "active"]),
+        "completed_goals": len([g for g in goals if g.is_completed]),
+        "overdue_goals": len([g for g in goals if g.is_overdue]),
+        "overall_progress": 0,
+    }
+    total_target = Money.sum(g.target_amount for g in goals)
+    total_current = Money.sum(g.current_amount for g in goals)
+    stats["total_target_amount"] = total_target.to_decimal()
+    stats["total_current_amount"] = total_current.to_decimal()
+
+    if total_target > 0:
+        stats["overall_progress"] = (total_current / total_target) * 100
+
+    return stats
+
+
+def get_dashboard_data(user_id):
+    """Get everything the home page dashboard shows, in three queries
+
+    Income and expense totals and the goal counts come back as one row:
+    each table is aggregated once with conditional sums in a subquery, and
+    the two single-row subqueries are joined. Recent transactions and the
+    active goals shown as cards are the other two queries.
+    """
+    active_statuses = ("active", "overdue")
+
+    transaction_totals = (
+        db.select(
+            func.coalesce(
+                func.sum(
+                    case((Transaction.type == "income", Transaction.amount), else_=0)
+                ),
+                0,
+            ).label("total_income"),
+            func.coalesce(
+                func.sum(
+                    case((Transaction.type == "expense", Transaction.amount), else_=0)
+                ),
+                0,
+            ).label("total_expenses"),
+        )
+        .where(Transaction.user_id == user_id)
+        .subquery()
+    )
+    goal_counts = (
+        db.select(
+            func.count(Goal.id).label("total_goals"),
+            func.coalesce(
+                func.sum(case((Goal.status == "completed", 1), else_=0)), 0
+            ).label("completed_goals"),
+            func.coalesce(
+                func.sum(case((Goal.status.in_(active_statuses), 1), else_=0)), 0
+            ).label("active_goals"),
+        )
+        .where(Goal.user_id == user_id)
+        .subquery()
+    )
+    totals = db.session.execute(
+        db.select(transaction_totals, goal_counts).select_from(
+            transaction_totals.join(goal_counts, true())
+        )
+    ).one()
+
+    total_income = Money.coerce(totals.total_income)
+    total_expenses = Money.coerce(totals.total_expenses)
+
+    recent_transactions = (
+        Transaction.query.filter_by(user_id=user_id)
+        .order_by(Transaction.date.desc(), Transaction.created_at.desc())
+        .limit(5)
+        .all()
+    )
+    active_goals = (
+        Goal.query.filter_by(user_id=user_id)
+        .filter(Goal.status.in_(active_statuses))
+        .limit(3)
+        .all()
+    )
+
+    return {
+        "recent_transactions": recent_transactions,
+        "financial_summary": FinancialSummary(
+            total_income, total_expenses, total_income - total_expenses
+        ),
+        "goal_summary": GoalSummary(
+            totals.active_goals, totals.completed_goals, totals.total_goals
+        ),
+        "active_goals": active_goals,
+    }
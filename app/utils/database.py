@@ -0,0 +1,78 @@
+"""Connection pool and SQLite connection settings for the app's engines.
+
+Pool settings come from flat config keys and are passed to every engine
+through SQLALCHEMY_ENGINE_OPTIONS, whose own entries win. SQLite
+connections additionally run SQLITE_PRAGMAS as they are opened. The
+defaults put the database in WAL mode, so readers keep reading the last
+committed data while a writer works instead of waiting for its lock.
+"""
+
+import re
+
+from sqlalchemy import event
+
+# Config key -> create_engine argument
+POOL_SETTINGS = {
+    "SQLALCHEMY_POOL_SIZE": "pool_size",
+    "SQLALCHEMY_MAX_OVERFLOW": "max_overflow",
+    "SQLALCHEMY_POOL_TIMEOUT": "pool_timeout",
+    "SQLALCHEMY_POOL_RECYCLE": "pool_recycle",
+    "SQLALCHEMY_POOL_PRE_PING": "pool_pre_ping",
+}
+
+# Applied in this order; busy_timeout comes first so that switching the
+# journal mode waits for other connections' locks
+DEFAULT_SQLITE_PRAGMAS = {
+    "busy_timeout": 5000,  # ms to wait for a lock before "database is locked"
+    "journal_mode": "wal",
+    "synchronous": "normal",  # safe with WAL; fsyncs at checkpoints only
+    "cache_size": -65536,  # negative means KiB: 64 MiB per connection
+    "mmap_size": 256 * 1024 * 1024,
+}
+
+_PRAGMA_VALUE = re.compile(r"-?\d+|[A-Za-z_]+")
+
+
+def engine_options(config) -> dict:
+    """Return SQLALCHEMY_ENGINE_OPTIONS with the configured pool settings"""
+    options = {
+        argument: config[key]
+        for key, argument in POOL_SETTINGS.items()
+        if key in config
+    }
+    options.update(config.get("SQLALCHEMY_ENGINE_OPTIONS", {}))
+    return options
+
+
+def sqlite_pragmas(config) -> dict:
+    """Return the pragmas to run on new SQLite connections
+
+    SQLITE_PRAGMAS entries override the defaults; an entry set to None
+    leaves that pragma at SQLite's own default.
+    """
+    pragmas = {**DEFAULT_SQLITE_PRAGMAS, **config.get("SQLITE_PRAGMAS", {})}
+    for name, value in pragmas.items():
+        if not name.isidentifier() or (
+            value is not None and not _PRAGMA_VALUE.fullmatch(str(value))
+        ):
+            raise ValueError(f"Invalid SQLite pragma: {name}={value!r}")
+    return {name: value for name, value in pragmas.items() if value is not None}
+
+
+def set_sqlite_pragmas(engine, pragmas: dict) -> None:
+    """Run pragmas on each connection engine opens; ignored for other databases
+
+    Must be called before engine opens its first connection.
+    """
+    if engine.dialect.name != "sqlite" or not pragmas:
+        return
+    statements = [f"PRAGMA {name}={value}" for name, value in pragmas.items()]
+
+    @event.listens_for(engine, "connect")
+    def run_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for statement in statements:
+                cursor.execute(statement)
+        finally:
+            cursor.close()
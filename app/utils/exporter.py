@@ -0,0 +1,233 @@
+"""Streaming transaction exports (CSV, NDJSON and a columnar binary format)."""
+
+import csv
+import io
+import json
+import struct
+import sys
+from array import array
+from datetime import date
+from typing import BinaryIO, Iterable, Iterator, List, Sequence
+
+from app import db
+from app.models.transaction import Transaction
+from app.utils.money import Money
+
+DEFAULT_BATCH_SIZE = 1000
+
+EXPORT_COLUMNS = ("id", "date", "type", "category", "amount", "description", "notes")
+
+# format name -> (mimetype, file extension)
+EXPORT_FORMATS = {
+    "csv": ("text/csv", "csv"),
+    "ndjson": ("application/x-ndjson", "ndjson"),
+    "columnar": ("application/octet-stream", "pftcol"),
+}
+
+# Columnar layout: MAGIC, a length-prefixed JSON schema, then row groups of
+# <uint32 row count> followed by one length-prefixed block per column, and a
+# zero row count at the end. All integers are little-endian.
+COLUMNAR_MAGIC = b"PFTCOL1\n"
+COLUMNAR_SCHEMA = [
+    {"name": "id", "type": "int64"},
+    {"name": "date", "type": "date32"},  # days since 1970-01-01
+    {"name": "type", "type": "string"},
+    {"name": "category", "type": "string"},
+    {"name": "amount", "type": "decimal64(2)"},  # integer cents
+    {"name": "description", "type": "string"},
+    {"name": "notes", "type": "string?"},
+]
+_NULL_LENGTH = 0xFFFFFFFF
+_EPOCH = date(1970, 1, 1).toordinal()
+_UINT32 = struct.Struct("<I")
+
+
+def iter_batches(filters, batch_size: int = DEFAULT_BATCH_SIZE) -> Iterator[List]:
+    """Yield lists of export rows matching filters, oldest first.
+
+    Rows are plain column tuples fetched batch_size at a time from a
+    server-side cursor where the driver supports one, never ORM objects.
+    """
+    statement = (
+        db.select(*(getattr(Transaction, name) for name in EXPORT_COLUMNS))
+        .where(*filters)
+        .order_by(Transaction.date, Transaction.created_at, Transaction.id)
+        .execution_options(yield_per=batch_size)
+    )
+    result = db.session.execute(statement)
+    try:
+        for partition in result.partitions():
+            yield partition
+    finally:
+        result.close()
+
+
+def csv_chunks(batches: Iterable[Sequence]) -> Iterator[str]:
+    """Encode batches as CSV whose header the importer reads back."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_COLUMNS)
+    for batch in batches:
+        writer.writerows(
+            (
+                row.id,
+                row.date.isoformat(),
+                row.type,
+                row.category,
+                row.amount,
+                row.description,
+                row.notes or "",
+            )
+            for row in batch
+        )
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def ndjson_chunks(batches: Iterable[Sequence]) -> Iterator[str]:
+    """Encode batches as one JSON object per line."""
+    for batch in batches:
+        yield "".join(
+            json.dumps(
+                {
+                    "id": row.id,
+                    "date": row.date.isoformat(),
+                    "type": row.type,
+                    "category": row.category,
+                    "amount": float(row.amount),
+                    "description": row.description,
+                    "notes": row.notes,
+                }
+            )
+            + "\n"
+            for row in batch
+        )
+
+
+def _block(data: bytes) -> bytes:
+    return _UINT32.pack(len(data)) + data
+
+
+def _int_block(typecode: str, values) -> bytes:
+    column = array(typecode, values)
+    if sys.byteorder == "big":
+        column.byteswap()
+    return _block(column.tobytes())
+
+
+def _string_block(values, nullable: bool = False) -> bytes:
+    encoded = [None if v is None else v.encode() for v in values]
+    if not nullable and None in encoded:
+        raise ValueError("NULL in a non-nullable string column")
+    lengths = [_NULL_LENGTH if v is None else len(v) for v in encoded]
+    return _int_block("I", lengths) + _block(b"".join(v for v in encoded if v))
+
+
+def columnar_chunks(batches: Iterable[Sequence]) -> Iterator[bytes]:
+    """Encode batches as row groups of the columnar binary format."""
+    yield COLUMNAR_MAGIC + _block(json.dumps(COLUMNAR_SCHEMA).encode())
+    for batch in batches:
+        if not batch:
+            continue
+        ids, days, types, categories, cents, descriptions, notes = zip(
+            *(
+                (
+                    row.id,
+                    row.date.toordinal() - _EPOCH,
+                    row.type,
+                    row.category,
+                    row.amount.cents,
+                    row.description,
+                    row.notes,
+                )
+                for row in batch
+            )
+        )
+        yield b"".join(
+            (
+                _UINT32.pack(len(batch)),
+                _int_block("q", ids),
+                _int_block("i", days),
+                _string_block(types),
+                _string_block(categories),
+                _int_block("q", cents),
+                _string_block(descriptions),
+                _string_block(notes, nullable=True),
+            )
+        )
+    yield _UINT32.pack(0)
+
+
+def _read_exact(stream: BinaryIO, size: int) -> bytes:
+    data = stream.read(size)
+    if len(data) != size:
+        raise ValueError("Truncated columnar export")
+    return data
+
+
+def _read_block(stream: BinaryIO) -> bytes:
+    (size,) = _UINT32.unpack(_read_exact(stream, 4))
+    return _read_exact(stream, size)
+
+
+def _read_ints(stream: BinaryIO, typecode: str) -> array:
+    column = array(typecode)
+    column.frombytes(_read_block(stream))
+    if sys.byteorder == "big":
+        column.byteswap()
+    return column
+
+
+def _read_strings(stream: BinaryIO) -> List:
+    lengths = _read_ints(stream, "I")
+    blob = _read_block(stream)
+    values, offset = [], 0
+    for length in lengths:
+        if length == _NULL_LENGTH:
+            values.append(None)
+            continue
+        values.append(blob[offset : offset + length].decode())
+        offset += length
+    return values
+
+
+def read_columnar(stream: BinaryIO) -> Iterator[dict]:
+    """Decode a columnar export back into row dicts, one row group at a time."""
+    if _read_exact(stream, len(COLUMNAR_MAGIC)) != COLUMNAR_MAGIC:
+        raise ValueError("Not a columnar transaction export")
+    json.loads(_read_block(stream))
+
+    while True:
+        (count,) = _UINT32.unpack(_read_exact(stream, 4))
+        if count == 0:
+            return
+        ids = _read_ints(stream, "q")
+        days = _read_ints(stream, "i")
+        types = _read_strings(stream)
+        categories = _read_strings(stream)
+        cents = _read_ints(stream, "q")
+        descriptions = _read_strings(stream)
+        notes = _read_strings(stream)
+        for i in range(count):
+            yield {
+                "id": ids[i],
+                "date": date.fromordinal(days[i] + _EPOCH),
+                "type": types[i],
+                "category": categories[i],
+                "amount": Money(cents[i]),
+                "description": descriptions[i],
+                "notes": notes[i],
+            }
+
+
+ENCODERS = {"csv": csv_chunks, "ndjson": ndjson_chunks, "columnar": columnar_chunks}
+
+
+def export_chunks(filters, file_format: str, batch_size: int = DEFAULT_BATCH_SIZE):
+    """Return an iterator of encoded chunks for a streaming response."""
+    if file_format not in ENCODERS:
+        raise ValueError(f"Unsupported export format: {file_format!r}")
+    return ENCODERS[file_format](iter_batches(filters, batch_size))
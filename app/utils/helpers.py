@@ -1,19 +1,22 @@
 """Helper utilities for the application."""
 
+from datetime import date
 from decimal import Decimal
 from typing import Dict, List, Optional, Tuple, Union
 
 from flask import flash
-from sqlalchemy import and_, extract, func
+from sqlalchemy import and_, case, extract, func
+from sqlalchemy.sql.expression import ColumnElement
 
 from app import db
 from app.models.goal import Goal
 from app.models.transaction import Transaction
+from app.utils.money import Money
 
 
-def format_currency(amount: Decimal) -> str:
-    """Format decimal amount as currency string."""
-    return f"${amount:,.2f}"
+def format_currency(amount: Union[Money, Decimal]) -> str:
+    """Format a money amount as a currency string."""
+    return f"${Money.coerce(amount):,.2f}"
 
 
 def calculate_percentage(current: Decimal, target: Decimal) -> float:
@@ -94,10 +97,66 @@ class TransactionHelper:
 
         return income_categories if transaction_type == "income" else expense_categories
 
+    @staticmethod
+    def build_filters(
+        user_id: int,
+        transaction_type: Optional[str] = None,
+        category: Optional[str] = None,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+    ) -> List[ColumnElement]:
+        """Build the WHERE conditions for a user's filtered transaction list."""
+        filters = [Transaction.user_id == user_id]
+        if transaction_type:
+            filters.append(Transaction.type == transaction_type)
+        if category:
+            filters.append(Transaction.category == category)
+        if start_date:
+            filters.append(Transaction.date >= start_date)
+        if end_date:
+            filters.append(Transaction.date <= end_date)
+        return filters
+
+    @staticmethod
+    def calculate_filtered_totals(
+        filters: List[ColumnElement],
+    ) -> Dict[str, Union[int, Money]]:
+        """Count and sum income and expenses of the matching transactions.
+
+        One aggregate query, so the cost does not grow with the number of
+        rows the ORM would otherwise have to load.
+        """
+
+        def type_total(transaction_type: str) -> ColumnElement:
+            return func.coalesce(
+                func.sum(
+                    case(
+                        (Transaction.type == transaction_type, Transaction.amount),
+                        else_=0,
+                    )
+                ),
+                0,
+            )
+
+        count, income, expenses = db.session.execute(
+            db.select(
+                func.count(Transaction.id),
+                type_total("income"),
+                type_total("expense"),
+            ).where(*filters)
+        ).one()
+        income, expenses = Money.coerce(income), Money.coerce(expenses)
+        return {
+            "count": count,
+            "income": income,
+            "expenses": expenses,
+            "net": income - expenses,
+        }
+
     @staticmethod
     def calculate_monthly_summary(
         user_id: int, year: int, month: int
-    ) -> Dict[str, Decimal]:
+    ) -> Dict[str, Money]:
         """Calculate monthly income, expenses, and net for a user."""
         base_query = Transaction.query.filter(
             and_(
@@ -109,11 +168,11 @@ class TransactionHelper:
 
         income = base_query.filter(Transaction.type == "income").with_entities(
             func.sum(Transaction.amount)
-        ).scalar() or Decimal("0")
+        ).scalar() or Money(0)
 
         expenses = base_query.filter(Transaction.type == "expense").with_entities(
             func.sum(Transaction.amount)
-        ).scalar() or Decimal("0")
+        ).scalar() or Money(0)
 
         return {"income": income, "expenses": expenses, "net": income - expenses}
 
@@ -0,0 +1,317 @@
+"""Streaming bulk import of bank exports (CSV, OFX and QIF)."""
+
+import csv
+import re
+import time
+from collections import defaultdict
+from datetime import datetime
+from decimal import Decimal
+from typing import Dict, Iterable, Iterator, List, Optional, TextIO, Tuple
+
+from sqlalchemy import insert
+from wtforms import ValidationError
+
+from app import db
+from app.forms.transaction import (
+    AMOUNT_MAX,
+    AMOUNT_MIN,
+    DESCRIPTION_MAX_LENGTH,
+    DESCRIPTION_MIN_LENGTH,
+    EXPENSE_CATEGORIES,
+    INCOME_CATEGORIES,
+    NOTES_MAX_LENGTH,
+    check_amount,
+    check_category,
+    check_transaction_date,
+)
+from app.models.data_version import touch_users
+from app.models.rollup import apply_rollup_deltas, rollup_key
+from app.models.transaction import Transaction
+from app.utils.money import Money
+
+FORMATS = ("csv", "ofx", "qif")
+DEFAULT_CHUNK_SIZE = 1000
+
+# Only this many row errors are kept for the report; all are counted
+MAX_REPORTED_ERRORS = 200
+
+DATE_FORMATS = ("%Y-%m-%d", "%m/%d/%Y", "%m/%d/%y", "%Y%m%d")
+
+# Accepted CSV header spellings for each transaction field
+CSV_COLUMNS = {
+    "date": ("date", "transaction date", "posted date", "posted"),
+    "description": ("description", "payee", "name", "merchant"),
+    "amount": ("amount", "value"),
+    "type": ("type", "transaction type"),
+    "category": ("category",),
+    "notes": ("notes", "memo"),
+}
+
+RawRow = Dict[str, str]
+
+
+class RowError(ValueError):
+    """Raised for an import row that fails validation."""
+
+
+class ImportResult:
+    """Outcome of one import: counts, row errors and throughput."""
+
+    def __init__(self):
+        self.imported = 0
+        self.failed = 0
+        self.errors: List[Tuple[int, str]] = []
+        self.elapsed = 0.0
+
+    def add_error(self, line: int, message: str) -> None:
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append((line, message))
+
+    @property
+    def processed(self) -> int:
+        return self.imported + self.failed
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.processed / self.elapsed if self.elapsed else 0.0
+
+
+def detect_format(filename: str) -> Optional[str]:
+    """Guess the import format from a file name."""
+    extension = filename.rsplit(".", 1)[-1].lower() if "." in filename else ""
+    if extension == "qfx":
+        return "ofx"
+    return extension if extension in FORMATS else None
+
+
+# Parsers: yield (line number, raw string fields) one record at a time
+def iter_csv(stream: TextIO) -> Iterator[Tuple[int, RawRow]]:
+    """Parse a CSV export with a header row."""
+    reader = csv.reader(stream)
+    header = next(reader, None)
+    if header is None:
+        return
+
+    names = [name.strip().lower() for name in header]
+    positions = {}
+    for field, aliases in CSV_COLUMNS.items():
+        for alias in aliases:
+            if alias in names:
+                positions[field] = names.index(alias)
+                break
+
+    for values in reader:
+        if not any(value.strip() for value in values):
+            continue
+        yield reader.line_num, {
+            field: values[index] if index < len(values) else ""
+            for field, index in positions.items()
+        }
+
+
+_OFX_TAG = re.compile(r"<(/?)([A-Za-z0-9.]+)>([^<]*)")
+
+
+def iter_ofx(stream: TextIO) -> Iterator[Tuple[int, RawRow]]:
+    """Parse the statement transactions of an OFX (or QFX) export.
+
+    Handles both SGML (OFX 1.x, unclosed elements) and XML (OFX 2.x) files.
+    """
+    record = None
+    start = 0
+    for line_number, line in enumerate(stream, 1):
+        for closing, tag, value in _OFX_TAG.findall(line):
+            tag = tag.upper()
+            value = value.strip()
+            if tag == "STMTTRN":
+                if closing:
+                    if record is not None:
+                        yield start, record
+                    record = None
+                else:
+                    record, start = {}, line_number
+            elif record is not None and not closing:
+                if tag == "DTPOSTED":
+                    record["date"] = value[:8]
+                elif tag == "TRNAMT":
+                    record["amount"] = value
+                elif tag == "NAME":
+                    record["description"] = value
+                elif tag == "MEMO":
+                    record["notes"] = value
+
+
+def iter_qif(stream: TextIO) -> Iterator[Tuple[int, RawRow]]:
+    """Parse a QIF bank register export."""
+    record: RawRow = {}
+    start = 0
+    for line_number, line in enumerate(stream, 1):
+        line = line.rstrip("\r\n")
+        if not line or line.startswith("!"):
+            continue
+        code, value = line[0], line[1:].strip()
+        if code == "^":
+            if record:
+                yield start, record
+            record = {}
+            continue
+        if not record:
+            start = line_number
+        if code == "D":
+            # Quicken writes dates like 1/ 5'24 or 01/05/2024
+            record["date"] = value.replace(" ", "").replace("'", "/")
+        elif code in ("T", "U"):
+            record["amount"] = value
+        elif code == "P":
+            record["description"] = value
+        elif code == "M":
+            record["notes"] = value
+        elif code == "L":
+            record["category"] = value.split(":", 1)[0]
+    if record:
+        yield start, record
+
+
+PARSERS = {"csv": iter_csv, "ofx": iter_ofx, "qif": iter_qif}
+
+
+def _parse_date(text: str):
+    for date_format in DATE_FORMATS:
+        try:
+            return datetime.strptime(text, date_format).date()
+        except ValueError:
+            continue
+    raise RowError(f"Unrecognised date {text!r}")
+
+
+def _category_value(transaction_type: str, text: str) -> str:
+    """Map a category value or label to its value; blank means "other"."""
+    choices = INCOME_CATEGORIES if transaction_type == "income" else EXPENSE_CATEGORIES
+    text = text.strip().lower()
+    if not text:
+        return choices[-1][0]
+    for value, label in choices:
+        if text in (value, label.lower()):
+            return value
+    return text
+
+
+def validate_row(raw: RawRow, user_id: int) -> dict:
+    """Check one raw record with the TransactionForm rules.
+
+    Returns the column values to insert, or raises RowError. Rows without a
+    type take it from the sign of the amount, as bank exports do.
+    """
+    try:
+        description = (raw.get("description") or "").strip()
+        if not description:
+            raise RowError("Description is required")
+        if not DESCRIPTION_MIN_LENGTH <= len(description) <= DESCRIPTION_MAX_LENGTH:
+            raise RowError("Description must be between 2 and 200 characters")
+
+        amount_text = (raw.get("amount") or "").strip().replace(",", "")
+        amount_text = amount_text.replace("$", "")
+        if not amount_text:
+            raise RowError("Amount is required")
+        check_amount(amount_text)
+        amount = Decimal(amount_text)
+
+        transaction_type = (raw.get("type") or "").strip().lower()
+        if not transaction_type:
+            transaction_type = "expense" if amount < 0 else "income"
+            amount = abs(amount)
+        elif transaction_type not in ("income", "expense"):
+            raise RowError("Please select a transaction type")
+        if not AMOUNT_MIN <= amount <= AMOUNT_MAX:
+            raise RowError("Amount must be between $0.01 and $999,999.99")
+
+        date_text = (raw.get("date") or "").strip()
+        if not date_text:
+            raise RowError("Date is required")
+        day = _parse_date(date_text)
+        check_transaction_date(day)
+
+        category = _category_value(transaction_type, raw.get("category") or "")
+        check_category(transaction_type, category)
+
+        notes = (raw.get("notes") or "").strip() or None
+        if notes and len(notes) > NOTES_MAX_LENGTH:
+            raise RowError("Notes cannot exceed 500 characters")
+    except ValidationError as exc:
+        raise RowError(str(exc)) from exc
+
+    return {
+        "user_id": user_id,
+        "type": transaction_type,
+        "category": category,
+        "amount": Money.coerce(amount),
+        "date": day,
+        "description": description,
+        "notes": notes,
+    }
+
+
+def _write_chunk(user_id: int, rows: List[dict]) -> None:
+    """Insert rows with one executemany and keep derived tables in step.
+
+    The bulk insert skips the session's flush events, so the rollups and
+    the user's data version are updated here in the same transaction.
+    """
+    session = db.session
+    # render_nulls keeps rows with and without notes in a single batch
+    session.execute(insert(Transaction).execution_options(render_nulls=True), rows)
+
+    deltas = defaultdict(lambda: [Money(0), 0])
+    for row in rows:
+        delta = deltas[rollup_key(user_id, row["date"], row["type"], row["category"])]
+        delta[0] += row["amount"]
+        delta[1] += 1
+    apply_rollup_deltas(session.connection(), deltas)
+    touch_users(session, {user_id})
+    session.commit()
+
+
+def import_transactions(
+    user_id: int,
+    stream: TextIO,
+    file_format: str,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> ImportResult:
+    """Stream records from an export into the user's transactions.
+
+    Valid rows are inserted and committed chunk_size at a time, so memory
+    use is bounded by the chunk, not the file. Invalid rows are skipped and
+    reported with their line number. A file that cannot be parsed any
+    further stops the import; chunks already committed are kept.
+    """
+    if file_format not in PARSERS:
+        raise ValueError(f"Unsupported import format: {file_format!r}")
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be at least 1")
+
+    result = ImportResult()
+    started = time.perf_counter()
+    chunk: List[dict] = []
+    records: Iterable[Tuple[int, RawRow]] = PARSERS[file_format](stream)
+    line = 0
+    try:
+        for line, raw in records:
+            try:
+                chunk.append(validate_row(raw, user_id))
+            except RowError as exc:
+                result.add_error(line, str(exc))
+                continue
+            if len(chunk) >= chunk_size:
+                _write_chunk(user_id, chunk)
+                result.imported += len(chunk)
+                chunk = []
+    except (csv.Error, UnicodeDecodeError) as exc:
+        result.add_error(line + 1, f"Could not read the file any further: {exc}")
+
+    if chunk:
+        _write_chunk(user_id, chunk)
+        result.imported += len(chunk)
+
+    result.elapsed = time.perf_counter() - started
+    return result
@@ -0,0 +1,110 @@
+"""The application's JSON provider: money-aware, and fast when orjson is installed."""
+
+import json
+from datetime import date
+from decimal import Decimal
+
+from flask.json.provider import DefaultJSONProvider
+
+from app.utils.money import Money
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+JSON_ENCODERS = ("auto", "orjson", "stdlib")
+
+# orjson gained Fragment (pre-encoded JSON spliced in as is) in 3.9
+_ORJSON_FRAGMENT = getattr(orjson, "Fragment", None)
+
+
+class JSONFragment:
+    """A constant JSON value encoded once, when it is created
+
+    Put one anywhere in a payload in place of the value itself. Encoders
+    that can splice raw JSON copy the encoded form into the output; the
+    others encode the value as usual, so the output is the same either way.
+    """
+
+    __slots__ = ("value", "encoded", "_raw")
+
+    def __init__(self, value):
+        self.value = value
+        self.encoded = json.dumps(value, separators=(",", ":"), sort_keys=True)
+        self._raw = _ORJSON_FRAGMENT(self.encoded) if _ORJSON_FRAGMENT else None
+
+    def __eq__(self, other):
+        if isinstance(other, JSONFragment):
+            return self.value == other.value
+        return self.value == other
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"JSONFragment({self.encoded})"
+
+
+def _default(o):
+    """Encode the types json and orjson do not know about"""
+    if isinstance(o, JSONFragment):
+        return o._raw if o._raw is not None else o.value
+    if isinstance(o, Money):
+        return float(o)
+    if isinstance(o, Decimal):
+        return float(o)
+    if isinstance(o, date):
+        return o.isoformat()
+    if type(o).__module__ == "numpy":
+        # Scalars and arrays; checked by module so numpy is never imported here
+        return o.tolist()
+    return DefaultJSONProvider.default(o)
+
+
+class FinanceJSONProvider(DefaultJSONProvider):
+    """JSON provider encoding Money and Decimal as numbers and dates as ISO 8601
+
+    Uses orjson for dumps and responses when it is installed and the
+    JSON_ENCODER setting allows it ("auto", the default, or "orjson");
+    "stdlib" keeps Python's json module. Both produce the same documents,
+    keys sorted, apart from whitespace.
+    """
+
+    default = staticmethod(_default)
+
+    def __init__(self, app):
+        super().__init__(app)
+        encoder = app.config.get("JSON_ENCODER", "auto")
+        if encoder not in JSON_ENCODERS:
+            raise ValueError(f"Unknown JSON encoder: {encoder!r}")
+        if encoder == "orjson" and orjson is None:
+            raise RuntimeError("JSON_ENCODER is 'orjson' but orjson is not installed")
+        self.use_orjson = orjson is not None and encoder != "stdlib"
+
+    def _orjson_dumps(self, obj, indent=None) -> bytes:
+        option = orjson.OPT_SERIALIZE_NUMPY
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=self.default, option=option)
+
+    def dumps(self, obj, **kwargs) -> str:
+        # orjson can honour layout options only; anything else needs json
+        if self.use_orjson and kwargs.keys() <= {"indent", "separators"}:
+            return self._orjson_dumps(obj, kwargs.get("indent")).decode()
+        return super().dumps(obj, **kwargs)
+
+    def loads(self, s, **kwargs):
+        if self.use_orjson and not kwargs:
+            return orjson.loads(s)
+        return super().loads(s, **kwargs)
+
+    def response(self, *args, **kwargs):
+        if not self.use_orjson:
+            return super().response(*args, **kwargs)
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = (self.compact is None and self._app.debug) or self.compact is False
+        return self._app.response_class(
+            self._orjson_dumps(obj, indent) + b"\n", mimetype=self.mimetype
+        )
@@ -0,0 +1,298 @@
+"""Exact money amounts held as integer cents, and the column type storing them."""
+
+import operator
+from decimal import ROUND_HALF_UP, Decimal, InvalidOperation
+from typing import Iterable
+
+from sqlalchemy import BigInteger, Numeric, cast, func, inspect, type_coerce
+from sqlalchemy.schema import CreateIndex, CreateTable
+from sqlalchemy.types import Integer, TypeDecorator
+
+# How MoneyType columns are stored: fixed-point NUMERIC(p, 2), or a whole
+# number of cents in an integer column
+MONEY_STORAGES = ("decimal", "cents")
+DEFAULT_MONEY_STORAGE = "decimal"
+
+_CENT = Decimal("0.01")
+
+
+class Money:
+    """An amount of money as a whole number of cents
+
+    Addition, subtraction and comparison are plain integer operations, so
+    summing many amounts is fast and exact. Plain numbers (int, Decimal,
+    float, str) are read as dollars wherever a Money is expected.
+    """
+
+    __slots__ = ("cents",)
+
+    def __init__(self, cents: int = 0):
+        self.cents = cents if cents.__class__ is int else int(cents)
+
+    @classmethod
+    def coerce(cls, value) -> "Money":
+        """Return value as Money, rounding dollars to the nearest cent"""
+        if isinstance(value, Money):
+            return value
+        if isinstance(value, int):
+            return cls(value * 100)
+        if isinstance(value, float):
+            value = repr(value)
+        try:
+            amount = Decimal(value)
+        except (InvalidOperation, TypeError, ValueError):
+            raise TypeError(f"Cannot convert {value!r} to Money") from None
+        return cls(int(amount.quantize(_CENT, rounding=ROUND_HALF_UP).scaleb(2)))
+
+    @classmethod
+    def sum(cls, amounts: Iterable) -> "Money":
+        """Add up amounts with integer arithmetic"""
+        return cls(
+            sum(
+                amount.cents if amount.__class__ is cls else cls.coerce(amount).cents
+                for amount in amounts
+            )
+        )
+
+    def to_decimal(self) -> Decimal:
+        return Decimal(self.cents).scaleb(-2)
+
+    def __float__(self) -> float:
+        return self.cents / 100
+
+    def __bool__(self) -> bool:
+        return self.cents != 0
+
+    def __hash__(self) -> int:
+        # Equal to the Decimal it compares equal to
+        return hash(self.to_decimal())
+
+    def __repr__(self) -> str:
+        return f"Money('{self}')"
+
+    def __str__(self) -> str:
+        sign = "-" if self.cents < 0 else ""
+        dollars, cents = divmod(abs(self.cents), 100)
+        return f"{sign}{dollars}.{cents:02d}"
+
+    def __format__(self, spec: str) -> str:
+        return format(self.to_decimal(), spec) if spec else str(self)
+
+    def __neg__(self) -> "Money":
+        return Money(-self.cents)
+
+    def __pos__(self) -> "Money":
+        return self
+
+    def __abs__(self) -> "Money":
+        return Money(abs(self.cents))
+
+    def _other_cents(self, other):
+        if other.__class__ is Money:
+            return other.cents
+        if isinstance(other, Money):
+            return other.cents
+        if isinstance(other, (int, Decimal, float)):
+            return Money.coerce(other).cents
+        return None
+
+    def __add__(self, other):
+        if other.__class__ is Money:
+            return Money(self.cents + other.cents)
+        cents = self._other_cents(other)
+        return NotImplemented if cents is None else Money(self.cents + cents)
+
+    __radd__ = __add__
+
+    def __sub__(self, other):
+        if other.__class__ is Money:
+            return Money(self.cents - other.cents)
+        cents = self._other_cents(other)
+        return NotImplemented if cents is None else Money(self.cents - cents)
+
+    def __rsub__(self, other):
+        cents = self._other_cents(other)
+        return NotImplemented if cents is None else Money(cents - self.cents)
+
+    def __mul__(self, factor):
+        if isinstance(factor, int):
+            return Money(self.cents * factor)
+        if isinstance(factor, (Decimal, float)):
+            return Money.coerce(self.to_decimal() * Decimal(repr(factor)))
+        return NotImplemented
+
+    __rmul__ = __mul__
+
+    def __truediv__(self, other):
+        """Money / Money is a Decimal ratio; Money / number is Money"""
+        if isinstance(other, Money):
+            return Decimal(self.cents) / Decimal(other.cents)
+        if isinstance(other, (int, Decimal, float)):
+            return Money.coerce(self.to_decimal() / Decimal(repr(other)))
+        return NotImplemented
+
+    def _compare(self, other, op):
+        # Exact against every type; other values are not rounded to cents
+        if isinstance(other, Money):
+            return op(self.cents, other.cents)
+        if isinstance(other, int):
+            return op(self.cents, other * 100)
+        if isinstance(other, Decimal):
+            return op(self.to_decimal(), other)
+        if isinstance(other, float):
+            return op(self.to_decimal(), Decimal(other))
+        return NotImplemented
+
+    def __eq__(self, other):
+        return self._compare(other, operator.eq)
+
+    def __lt__(self, other):
+        return self._compare(other, operator.lt)
+
+    def __le__(self, other):
+        return self._compare(other, operator.le)
+
+    def __gt__(self, other):
+        return self._compare(other, operator.gt)
+
+    def __ge__(self, other):
+        return self._compare(other, operator.ge)
+
+
+def money_storage(dialect) -> str:
+    """Return the money storage an engine's dialect was configured with"""
+    return getattr(dialect, "money_storage", DEFAULT_MONEY_STORAGE)
+
+
+def set_money_storage(engine, storage: str) -> None:
+    """Choose how MoneyType columns are stored for engine
+
+    Must be called before the engine runs any statement involving a money
+    column, since SQLAlchemy caches the resolved column type per dialect.
+    """
+    if storage not in MONEY_STORAGES:
+        raise ValueError(f"Unknown money storage: {storage!r}")
+    engine.dialect.money_storage = storage
+
+
+class MoneyType(TypeDecorator):
+    """A column holding Money, stored as NUMERIC(p, 2) or as integer cents
+
+    The storage is chosen per engine with set_money_storage; either way
+    values are read back as Money, and Money, Decimal, int or float values
+    are accepted for writes and comparisons. Sums and other aggregates of a
+    money column come back as Money too.
+    """
+
+    impl = Numeric
+    cache_ok = True
+
+    def __init__(self, precision: int = 10):
+        super().__init__(precision=precision, scale=2)
+
+    def load_dialect_impl(self, dialect):
+        if money_storage(dialect) == "cents":
+            return dialect.type_descriptor(BigInteger())
+        return dialect.type_descriptor(self.impl)
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        amount = Money.coerce(value)
+        if money_storage(dialect) == "cents":
+            return amount.cents
+        return amount.to_decimal()
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        if money_storage(dialect) == "cents":
+            return Money(value)
+        return Money.coerce(value)
+
+
+def cents_expression(column, dialect):
+    """Return a SQL expression reading a money column as raw integer cents
+
+    Lets bulk readers fetch plain integers without building a Money per row.
+    """
+    if money_storage(dialect) == "cents":
+        return type_coerce(column, BigInteger)
+    return cast(func.round(type_coerce(column, Numeric(scale=2)) * 100), BigInteger)
+
+
+def money_columns(metadata):
+    """Yield (table, column) for every MoneyType column in metadata"""
+    for table in metadata.sorted_tables:
+        for column in table.columns:
+            if isinstance(column.type, MoneyType):
+                yield table, column
+
+
+def stored_money_storage(connection, table, column) -> str:
+    """Return how the database actually stores one money column"""
+    for info in inspect(connection).get_columns(table.name):
+        if info["name"] == column.name:
+            return "cents" if isinstance(info["type"], Integer) else "decimal"
+    raise LookupError(f"{table.name}.{column.name} does not exist")
+
+
+def convert_money_storage(connection, metadata, storage: str) -> list:
+    """Rewrite every money column in the database to the given storage
+
+    SQLite cannot change a column's type in place, so each table holding
+    money is rebuilt: renamed aside, created again with the new column
+    types and indexes, refilled with the amounts converted, and dropped.
+    Tables already in the target storage are left alone. Returns the names
+    of the tables converted. Run it inside a transaction.
+    """
+    if storage not in MONEY_STORAGES:
+        raise ValueError(f"Unknown money storage: {storage!r}")
+    dialect = connection.dialect
+    if dialect.name != "sqlite":
+        raise NotImplementedError(
+            f"Converting money storage is only supported on SQLite, not {dialect.name}"
+        )
+
+    # A fresh dialect, so the DDL resolves MoneyType with the new storage
+    ddl_dialect = type(dialect)()
+    ddl_dialect.money_storage = storage
+    preparer = ddl_dialect.identifier_preparer
+
+    tables = {}
+    for table, column in money_columns(metadata):
+        if stored_money_storage(connection, table, column) != storage:
+            tables.setdefault(table.name, table)
+
+    for table in tables.values():
+        name = preparer.format_table(table)
+        old_name = preparer.quote(f"_old_{table.name}")
+        connection.exec_driver_sql(f"ALTER TABLE {name} RENAME TO {old_name}")
+        # Indexes follow the renamed table; free their names for the new one
+        for index in table.indexes:
+            connection.exec_driver_sql(
+                f"DROP INDEX IF EXISTS {preparer.quote(index.name)}"
+            )
+        connection.exec_driver_sql(str(CreateTable(table).compile(dialect=ddl_dialect)))
+
+        columns, values = [], []
+        for column in table.columns:
+            quoted = preparer.quote(column.name)
+            columns.append(quoted)
+            if not isinstance(column.type, MoneyType):
+                values.append(quoted)
+            elif storage == "cents":
+                values.append(f"CAST(ROUND({quoted} * 100) AS INTEGER)")
+            else:
+                values.append(f"ROUND({quoted} / 100.0, 2)")
+        connection.exec_driver_sql(
+            f"INSERT INTO {name} ({', '.join(columns)}) "
+            f"SELECT {', '.join(values)} FROM {old_name}"
+        )
+        connection.exec_driver_sql(f"DROP TABLE {old_name}")
+        for index in table.indexes:
+            connection.exec_driver_sql(
+                str(CreateIndex(index).compile(dialect=ddl_dialect))
+            )
+
+    return sorted(tables)
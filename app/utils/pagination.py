@@ -0,0 +1,138 @@
+"""Keyset (cursor) pagination."""
+
+import base64
+import binascii
+import json
+from datetime import date, datetime
+from typing import Any, List, Optional, Sequence
+
+from sqlalchemy import bindparam, tuple_
+from sqlalchemy.orm import Query
+from sqlalchemy.sql.expression import ColumnElement
+
+NEXT = "n"
+PREV = "p"
+
+
+class InvalidCursor(ValueError):
+    """Raised when a pagination cursor cannot be decoded."""
+
+
+class KeysetPage:
+    """One page of keyset pagination results.
+
+    ``next_cursor`` and ``prev_cursor`` are opaque tokens for the pages after
+    and before this one, or None at either end of the result set.
+    """
+
+    def __init__(
+        self,
+        items: List[Any],
+        per_page: int,
+        next_cursor: Optional[str],
+        prev_cursor: Optional[str],
+    ):
+        self.items = items
+        self.per_page = per_page
+        self.next_cursor = next_cursor
+        self.prev_cursor = prev_cursor
+
+    @property
+    def has_next(self) -> bool:
+        return self.next_cursor is not None
+
+    @property
+    def has_prev(self) -> bool:
+        return self.prev_cursor is not None
+
+
+def _encode_value(value: Any) -> Any:
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return value
+
+
+def _decode_value(column: ColumnElement, value: Any) -> Any:
+    if value is None:
+        return None
+    python_type = column.type.python_type
+    if python_type is datetime:
+        return datetime.fromisoformat(value)
+    if python_type is date:
+        return date.fromisoformat(value)
+    return python_type(value)
+
+
+def encode_cursor(direction: str, values: Sequence[Any]) -> str:
+    """Return an opaque, URL-safe token for a position in the ordering."""
+    payload = json.dumps([direction, [_encode_value(v) for v in values]])
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(token: str, columns: Sequence[ColumnElement]):
+    """Return (direction, values) from a token made by encode_cursor."""
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        direction, values = json.loads(base64.urlsafe_b64decode(padded))
+        if direction not in (NEXT, PREV) or len(values) != len(columns):
+            raise ValueError
+        return direction, [_decode_value(c, v) for c, v in zip(columns, values)]
+    except (binascii.Error, TypeError, ValueError) as exc:
+        raise InvalidCursor("Invalid pagination cursor") from exc
+
+
+def keyset_paginate(
+    query: Query,
+    columns: Sequence[ColumnElement],
+    per_page: int = 20,
+    cursor: Optional[str] = None,
+) -> KeysetPage:
+    """Page through query in descending order of columns.
+
+    The columns must identify rows uniquely (end with the primary key) and
+    be non-null. Each page seeks past the cursor with a row-value comparison
+    on an index instead of skipping rows with OFFSET, and no total is
+    counted, so every page costs the same however deep it is.
+    """
+    direction, position = NEXT, None
+    if cursor:
+        direction, position = decode_cursor(cursor, columns)
+
+    keys = tuple_(*columns)
+    if position is not None:
+        bound = tuple_(
+            *(
+                bindparam(None, value, type_=column.type)
+                for column, value in zip(columns, position)
+            )
+        )
+        query = query.filter(keys < bound if direction == NEXT else keys > bound)
+
+    if direction == NEXT:
+        query = query.order_by(*(column.desc() for column in columns))
+    else:
+        query = query.order_by(*(column.asc() for column in columns))
+
+    # One extra row tells whether another page exists in this direction
+    rows = query.limit(per_page + 1).all()
+    more = len(rows) > per_page
+    rows = rows[:per_page]
+    if direction == PREV:
+        rows.reverse()
+
+    def position_of(row):
+        return [getattr(row, column.key) for column in columns]
+
+    # Arriving through a cursor means there are rows on the side we came from
+    has_next = more if direction == NEXT else position is not None
+    has_prev = more if direction == PREV else position is not None
+    return KeysetPage(
+        items=rows,
+        per_page=per_page,
+        next_cursor=(
+            encode_cursor(NEXT, position_of(rows[-1])) if rows and has_next else None
+        ),
+        prev_cursor=(
+            encode_cursor(PREV, position_of(rows[0])) if rows and has_prev else None
+        ),
+    )
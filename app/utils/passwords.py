@@ -0,0 +1,163 @@
+"""Password hashing with configurable cost, run on a bounded worker pool."""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+from flask import current_app
+from werkzeug.security import (
+    DEFAULT_PBKDF2_ITERATIONS,
+    check_password_hash,
+    generate_password_hash,
+)
+
+from app import db
+from app.utils.workers import BoundedExecutor, QueueFull
+
+DEFAULT_HASH_METHOD = "scrypt"
+DEFAULT_HASH_WORKERS = 2
+DEFAULT_HASH_TIMEOUT = 10.0
+
+# werkzeug's parameters for methods given without all of them
+_SCRYPT_DEFAULTS = ("32768", "8", "1")
+_PBKDF2_DEFAULTS = ("sha256", str(DEFAULT_PBKDF2_ITERATIONS))
+
+
+def canonical_hash_method(method: str) -> str:
+    """Spell method out with every parameter, as werkzeug stores it in a hash
+
+    "scrypt" becomes "scrypt:32768:8:1" and "pbkdf2:sha512" becomes
+    "pbkdf2:sha512:1000000", so methods compare equal to stored prefixes.
+    """
+    name, *args = method.split(":")
+    if name == "scrypt" and len(args) in (0, 3):
+        return ":".join([name, *(args or _SCRYPT_DEFAULTS)])
+    if name == "pbkdf2" and len(args) <= 2:
+        return ":".join([name, *args, *_PBKDF2_DEFAULTS[len(args) :]])
+    raise ValueError(f"Invalid password hash method: {method!r}")
+
+
+def configured_hash_method() -> str:
+    """Return the current application's PASSWORD_HASH_METHOD, spelled out"""
+    return canonical_hash_method(
+        current_app.config.get("PASSWORD_HASH_METHOD", DEFAULT_HASH_METHOD)
+    )
+
+
+def hash_password(password: str, method: Optional[str] = None) -> str:
+    """Hash password with method, or the configured method"""
+    return generate_password_hash(password, method=method or configured_hash_method())
+
+
+def needs_rehash(password_hash: str, method: str) -> bool:
+    """Whether password_hash was made with other parameters than method"""
+    return password_hash.partition("$")[0] != canonical_hash_method(method)
+
+
+class PasswordHasher:
+    """Verify and rehash passwords on a small thread pool
+
+    hashlib releases the GIL while hashing, so the pool's workers bound how
+    many cores password checks can take at once; a burst of logins queues
+    here instead of starving other requests. At most queue_size jobs are
+    queued or running: verify() raises workers.QueueFull beyond that and
+    concurrent.futures.TimeoutError after timeout seconds. With workers=0
+    hashing runs on the calling thread.
+    """
+
+    def __init__(self, workers, queue_size=None, timeout=DEFAULT_HASH_TIMEOUT):
+        self.workers = workers
+        self.queue_size = queue_size or max(workers, 1) * 4
+        self.timeout = timeout
+        self.rehashes = 0
+        self._pool = None
+        self._lock = threading.Lock()
+
+    def verify(self, password_hash: str, password: str) -> bool:
+        """Check password against password_hash"""
+        if not self.workers:
+            return check_password_hash(password_hash, password)
+        return self._get_pool().run(
+            check_password_hash, password_hash, password, timeout=self.timeout
+        )
+
+    def rehash_if_needed(self, user, password: str) -> bool:
+        """Replace user's hash in the background if its parameters are outdated
+
+        Call only after password was verified. The new hash is written by a
+        worker, and only if the stored hash is still the one that was
+        checked. Returns whether a rehash was started; a saturated pool
+        skips it until a later login.
+        """
+        method = configured_hash_method()
+        if not needs_rehash(user.password_hash, method):
+            return False
+
+        job = (
+            current_app._get_current_object(),
+            user.id,
+            user.password_hash,
+            password,
+            method,
+        )
+        if not self.workers:
+            self._rehash(*job)
+            return True
+        try:
+            self._get_pool().submit(self._rehash, *job)
+        except QueueFull:
+            return False
+        return True
+
+    def _rehash(self, app, user_id, old_hash, password, method):
+        from app.models.user import User
+
+        new_hash = generate_password_hash(password, method=method)
+        with app.app_context():
+            try:
+                user = db.session.get(User, user_id)
+                if user is None or user.password_hash != old_hash:
+                    return
+                user.password_hash = new_hash
+                db.session.commit()
+            except Exception:
+                app.logger.exception(
+                    "Rehashing the password of user %s failed", user_id
+                )
+                return
+        with self._lock:
+            self.rehashes += 1
+
+    def shutdown(self, wait=True):
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=wait)
+
+    def _get_pool(self):
+        # Started on first use so CLI commands never start threads
+        with self._lock:
+            if self._pool is None:
+                executor = ThreadPoolExecutor(
+                    max_workers=self.workers, thread_name_prefix="password-hash"
+                )
+                self._pool = BoundedExecutor(executor, self.queue_size)
+            return self._pool
+
+
+def init_password_hasher(app) -> PasswordHasher:
+    """Create the password hasher for app from its configuration"""
+    # Fail at startup rather than at the first registration
+    canonical_hash_method(app.config.get("PASSWORD_HASH_METHOD", DEFAULT_HASH_METHOD))
+    hasher = PasswordHasher(
+        workers=app.config.get("PASSWORD_HASH_WORKERS", DEFAULT_HASH_WORKERS),
+        queue_size=app.config.get("PASSWORD_HASH_QUEUE_SIZE"),
+        timeout=app.config.get("PASSWORD_HASH_TIMEOUT", DEFAULT_HASH_TIMEOUT),
+    )
+    app.extensions["password_hasher"] = hasher
+    return hasher
+
+
+def get_password_hasher() -> PasswordHasher:
+    """Return the current application's password hasher"""
+    return current_app.extensions["password_hasher"]
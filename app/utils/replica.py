@@ -0,0 +1,116 @@
+"""Route read-only request work to a replica database.
+
+A replica is configured as the "replica" entry of SQLALCHEMY_BINDS. Views
+opt in with the replica_reads decorator (or enable_replica_reads as a
+blueprint hook); their queries on the default database then go to the
+replica, while flushes, DML statements and anything after the session's
+first write stay on the primary. A user who has just changed data keeps
+reading from the primary for REPLICA_STICKY_SECONDS, so they always see
+their own writes however far the replica lags.
+
+This module is imported while ``db`` is created, so it reaches the
+extension through ``current_app`` rather than importing it.
+"""
+
+import time
+from functools import wraps
+
+from flask import current_app, has_request_context, session
+from flask_login import current_user
+from flask_sqlalchemy.session import Session
+
+REPLICA_BIND_KEY = "replica"
+DEFAULT_STICKY_SECONDS = 10.0
+
+# Session.info flags: reads may use the replica / the session has written
+_REPLICA_READS = "replica_reads"
+_WROTE = "wrote_to_primary"
+
+# Flask session key: read from the primary until this UNIX time
+_PRIMARY_UNTIL = "_primary_reads_until"
+
+
+class RoutingSession(Session):
+    """Flask-SQLAlchemy session that sends flagged reads to the replica bind"""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        engine = super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+        if (
+            bind is None
+            and self.info.get(_REPLICA_READS)
+            and not self.info.get(_WROTE)
+            and not self._flushing
+            and not (clause is not None and getattr(clause, "is_dml", False))
+        ):
+            engines = self._db.engines
+            if REPLICA_BIND_KEY in engines and engine is engines.get(None):
+                return engines[REPLICA_BIND_KEY]
+        return engine
+
+
+def _db_session():
+    return current_app.extensions["sqlalchemy"].session
+
+
+def reading_from_primary() -> bool:
+    """Whether the current visitor wrote recently and must see the primary"""
+    return session.get(_PRIMARY_UNTIL, 0) > time.time()
+
+
+def enable_replica_reads():
+    """Let the rest of this request read from the replica, if one is set up
+
+    Usable as a before_request hook. The user is loaded first, so sign-in
+    never depends on the replica having caught up.
+    """
+    if REPLICA_BIND_KEY not in current_app.extensions["sqlalchemy"].engines:
+        return
+    current_user._get_current_object()
+    if not reading_from_primary():
+        _db_session().info[_REPLICA_READS] = True
+
+
+def replica_reads(view):
+    """Decorate a read-only view so its queries may use the replica"""
+
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        enable_replica_reads()
+        return view(*args, **kwargs)
+
+    return wrapper
+
+
+def _end_replica_reads(exc=None):
+    info = _db_session().info
+    info.pop(_REPLICA_READS, None)
+    info.pop(_WROTE, None)
+
+
+def _mark_session_wrote(db_session, flush_context):
+    db_session.info[_WROTE] = True
+
+
+def _stick_to_primary(sender, user_ids, **kwargs):
+    """After a request's commit changed data, read the primary for a while"""
+    if has_request_context() and current_app.extensions.get("read_replica"):
+        session[_PRIMARY_UNTIL] = time.time() + current_app.config.get(
+            "REPLICA_STICKY_SECONDS", DEFAULT_STICKY_SECONDS
+        )
+
+
+def init_read_replica(app):
+    """Wire replica routing into app; a no-op without a replica bind"""
+    from sqlalchemy import event
+
+    from app import db
+    from app.models.data_version import data_changed
+
+    enabled = REPLICA_BIND_KEY in app.config.get("SQLALCHEMY_BINDS", {})
+    app.extensions["read_replica"] = enabled
+    if not enabled:
+        return
+    app.teardown_request(_end_replica_reads)
+    if not event.contains(db.session, "after_flush", _mark_session_wrote):
+        event.listen(db.session, "after_flush", _mark_session_wrote)
+    data_changed.connect(_stick_to_primary)
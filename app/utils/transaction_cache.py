@@ -0,0 +1,80 @@
+"""Per-application cache of each active user's transactions as arrays.
+
+Only the numpy aggregation backend reads it. The default SQL backend
+answers each chart from the monthly rollups plus the partial months at
+the edges of its range, a few indexed rows per query; holding every
+user's full history in memory to serve those would cost more than the
+queries it saves, so that backend neither fills nor consults the cache.
+"""
+
+from typing import Callable, Optional
+
+from flask import current_app
+
+from app.models.data_version import data_changed, get_data_version
+from app.utils.cache import LRUCache
+
+DEFAULT_MAX_USERS = 128
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+
+def _entry_nbytes(entry) -> int:
+    return sum(column.nbytes for column in entry[0])
+
+
+class TransactionArrayCache(LRUCache):
+    """LRU cache of vector_aggregation.TransactionArrays keyed by user id.
+
+    Each entry holds a user's whole history and the data version it was
+    loaded at, and is only served while that is still the user's current
+    version. Commits in this process drop the writers' entries at once;
+    writes from other processes are caught by the version check, so the
+    arrays always match the validators conditional_on_data_version sends.
+    """
+
+    def __init__(self, max_users: int, max_bytes: Optional[int]):
+        super().__init__(
+            max_entries=max_users, max_bytes=max_bytes, sizeof=_entry_nbytes
+        )
+        self.loads = 0
+        # Connected weakly, so the signal does not keep old apps' caches alive
+        data_changed.connect(self._on_data_changed)
+
+    def arrays_for(self, user_id: int, load: Callable[[int], tuple]):
+        """Return user_id's arrays, calling load(user_id) when stale or missing."""
+        # Read the version before loading: a write landing during the load
+        # then leaves an older version on the entry, which only forces a
+        # reload
+        version, _ = get_data_version(user_id)
+        entry = self.get(user_id)
+        if entry is not None and entry[1] == version:
+            return entry[0]
+
+        arrays = load(user_id)
+        self.loads += 1
+        self.set(user_id, (arrays, version))
+        return arrays
+
+    def stats(self):
+        stats = super().stats()
+        stats["loads"] = self.loads
+        return stats
+
+    def _on_data_changed(self, sender, user_ids, **kwargs):
+        user_ids = set(user_ids)
+        self.invalidate(lambda key: key in user_ids)
+
+
+def init_transaction_cache(app) -> TransactionArrayCache:
+    """Create the transaction array cache for app from its configuration."""
+    cache = TransactionArrayCache(
+        max_users=app.config.get("TRANSACTION_CACHE_MAX_USERS", DEFAULT_MAX_USERS),
+        max_bytes=app.config.get("TRANSACTION_CACHE_MAX_BYTES", DEFAULT_MAX_BYTES),
+    )
+    app.extensions["transaction_cache"] = cache
+    return cache
+
+
+def get_transaction_cache() -> TransactionArrayCache:
+    """Return the current application's transaction array cache."""
+    return current_app.extensions["transaction_cache"]
@@ -0,0 +1,61 @@
+"""Insert-or-update of a single row as one statement.
+
+Counters such as rollup totals and data versions are created by the first
+write that needs them. Updating first and inserting when nothing matched
+races: two writers can both miss the row, and one of their inserts then
+fails on the unique key. ``upsert`` lets the database settle it instead,
+with INSERT ... ON CONFLICT DO UPDATE (SQLite, PostgreSQL) or ON DUPLICATE
+KEY UPDATE (MySQL).
+"""
+
+from sqlalchemy import insert, literal, update
+
+
+class _Proposed:
+    """Stand-in for the excluded row on databases without native upserts"""
+
+    def __init__(self, table, values):
+        self._table = table
+        self._values = values
+
+    def __getattr__(self, name):
+        return literal(self._values[name], type_=self._table.c[name].type)
+
+
+def upsert(connection, table, values, key_columns, updates):
+    """Insert values into table, or update the row that has the same key
+
+    key_columns name a unique key of table. updates is called with the
+    proposed row's columns (``excluded`` in SQL) and returns the
+    {column name: expression} to set on the existing row, e.g.
+    ``lambda new: {"count": table.c.count + new.count}``.
+    """
+    dialect = connection.dialect.name
+    if dialect in ("sqlite", "postgresql"):
+        if dialect == "sqlite":
+            from sqlalchemy.dialects.sqlite import insert as dialect_insert
+        else:
+            from sqlalchemy.dialects.postgresql import insert as dialect_insert
+        statement = dialect_insert(table).values(**values)
+        statement = statement.on_conflict_do_update(
+            index_elements=[table.c[name] for name in key_columns],
+            set_=updates(statement.excluded),
+        )
+        return connection.execute(statement)
+
+    if dialect in ("mysql", "mariadb"):
+        from sqlalchemy.dialects.mysql import insert as mysql_insert
+
+        statement = mysql_insert(table).values(**values)
+        return connection.execute(
+            statement.on_duplicate_key_update(**updates(statement.inserted))
+        )
+
+    # No single-statement form: update, then insert if nothing matched
+    key = [table.c[name] == values[name] for name in key_columns]
+    result = connection.execute(
+        update(table).where(*key).values(**updates(_Proposed(table, values)))
+    )
+    if result.rowcount == 0:
+        result = connection.execute(insert(table).values(**values))
+    return result
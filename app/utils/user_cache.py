@@ -0,0 +1,104 @@
+"""Per-application cache of the users that authenticated requests load."""
+
+from typing import Optional
+
+from blinker import Namespace
+from flask import current_app
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import make_transient_to_detached
+
+from app import db
+from app.models.user import User
+from app.utils.cache import LRUCache
+
+DEFAULT_MAX_ENTRIES = 1024
+DEFAULT_TTL_SECONDS = 30.0
+
+_signals = Namespace()
+
+# Sent after a commit that changed or deleted users, with user_ids=set()
+users_changed = _signals.signal("users-changed")
+
+_CHANGED_KEY = "changed_user_ids"
+
+
+def _detached_copy(user: User) -> User:
+    """Return a session-less User holding user's column values"""
+    copy = User(
+        **{attr.key: getattr(user, attr.key) for attr in inspect(User).column_attrs}
+    )
+    make_transient_to_detached(copy)
+    return copy
+
+
+class UserCache(LRUCache):
+    """LRU cache of detached User rows keyed by id, for the login user loader.
+
+    Entries are copies that never join a session; each request gets its own
+    instance through ``session.merge(..., load=False)``, which costs no
+    query. Commits in this process that change or delete a user drop the
+    entry at once; changes made by other processes are seen once the entry
+    is ``ttl`` seconds old.
+    """
+
+    def __init__(self, max_entries: int, ttl: float):
+        super().__init__(max_entries=max_entries, ttl=ttl)
+        # Connected weakly, so the signal does not keep old apps' caches alive
+        users_changed.connect(self._on_users_changed)
+
+    def load(self, user_id: int) -> Optional[User]:
+        """Return the user in the current session, querying only on a miss"""
+        cached = self.get(user_id)
+        if cached is None:
+            user = db.session.get(User, user_id)
+            if user is not None:
+                self.set(user_id, _detached_copy(user))
+            return user
+        return db.session.merge(cached, load=False)
+
+    def _on_users_changed(self, sender, user_ids, **kwargs):
+        user_ids = set(user_ids)
+        self.invalidate(lambda key: key in user_ids)
+
+
+@event.listens_for(db.session, "after_flush")
+def _collect_changed_users(session, flush_context):
+    """Remember the users this flush updated or deleted"""
+    # Only column changes count; adding a user's transactions touches the
+    # user's collections too
+    changed = {
+        obj
+        for obj in session.dirty
+        if isinstance(obj, User) and session.is_modified(obj, include_collections=False)
+    }
+    changed |= {obj for obj in session.deleted if isinstance(obj, User)}
+    user_ids = {obj.id for obj in changed if obj.id is not None}
+    if user_ids:
+        session.info.setdefault(_CHANGED_KEY, set()).update(user_ids)
+
+
+@event.listens_for(db.session, "after_commit")
+def _announce_changed_users(session):
+    user_ids = session.info.pop(_CHANGED_KEY, None)
+    if user_ids:
+        users_changed.send(session, user_ids=user_ids)
+
+
+@event.listens_for(db.session, "after_soft_rollback")
+def _forget_changed_users(session, previous_transaction):
+    session.info.pop(_CHANGED_KEY, None)
+
+
+def init_user_cache(app) -> UserCache:
+    """Create the user cache for app from its configuration."""
+    cache = UserCache(
+        max_entries=app.config.get("USER_CACHE_MAX_ENTRIES", DEFAULT_MAX_ENTRIES),
+        ttl=app.config.get("USER_CACHE_TTL", DEFAULT_TTL_SECONDS),
+    )
+    app.extensions["user_cache"] = cache
+    return cache
+
+
+def get_user_cache() -> UserCache:
+    """Return the current application's user cache."""
+    return current_app.extensions["user_cache"]
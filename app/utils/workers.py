@@ -0,0 +1,59 @@
+"""Bounded worker pools for work that must stay off request threads."""
+
+import threading
+from concurrent.futures import Executor, Future
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Any, Callable, Optional
+
+
+class QueueFull(Exception):
+    """Raised when a pool already holds its maximum number of pending jobs."""
+
+
+class BoundedExecutor:
+    """Wrap an executor so at most ``max_pending`` jobs are queued or running.
+
+    Submitting beyond the bound fails fast with QueueFull instead of letting
+    the backlog, and every caller's wait, grow without limit.
+    """
+
+    def __init__(self, executor: Executor, max_pending: int):
+        if max_pending < 1:
+            raise ValueError("max_pending must be at least 1")
+        self.executor = executor
+        self.max_pending = max_pending
+        self._slots = threading.BoundedSemaphore(max_pending)
+
+    def submit(self, fn: Callable, *args: Any, **kwargs: Any) -> Future:
+        """Schedule fn, or raise QueueFull if every slot is taken."""
+        if not self._slots.acquire(blocking=False):
+            raise QueueFull(f"{self.max_pending} jobs already pending")
+        try:
+            future = self.executor.submit(fn, *args, **kwargs)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+
+    def run(
+        self,
+        fn: Callable,
+        *args: Any,
+        timeout: Optional[float] = None,
+        **kwargs: Any,
+    ) -> Any:
+        """Submit fn and wait up to timeout seconds for its result.
+
+        Raises QueueFull when saturated and concurrent.futures.TimeoutError
+        when the job overruns; a job that has not started yet is cancelled.
+        """
+        future = self.submit(fn, *args, **kwargs)
+        try:
+            return future.result(timeout=timeout)
+        except FutureTimeoutError:
+            future.cancel()
+            raise
+
+    def shutdown(self, wait: bool = True) -> None:
+        self.executor.shutdown(wait=wait, cancel_futures=True)
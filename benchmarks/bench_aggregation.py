@@ -0,0 +1,145 @@
+"""Compare the aggregation backends on large transaction histories.
+
+Seeds a throwaway SQLite database with one user's transactions, then times
+monthly per-type totals and per-category totals computed three ways: loading
+ORM rows and adding them up in a Python loop, GROUP BY in SQL, and the NumPy
+backend, with and without the time to load its arrays. Rollups are bypassed
+so every backend reads every row:
+
+    python -m benchmarks.bench_aggregation [--rows 10000 100000 1000000]
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import time
+from collections import defaultdict
+from datetime import date, timedelta
+
+from sqlalchemy import insert
+
+from app import create_app, db, migrations
+from app.forms.transaction import EXPENSE_CATEGORIES, INCOME_CATEGORIES
+from app.models.transaction import Transaction
+from app.models.user import User
+from app.utils.data_aggregation import aggregate_transactions
+from app.utils.money import Money
+from app.utils.vector_aggregation import group_totals, load_transaction_arrays
+
+QUERIES = {"month x type": ("month", "type"), "category": ("category",)}
+
+
+def seed(user_id, rows, chunk=50_000):
+    """Insert rows random transactions spread over ten years."""
+    rng = random.Random(7)
+    today = date.today()
+    categories = {
+        "income": [value for value, _ in INCOME_CATEGORIES],
+        "expense": [value for value, _ in EXPENSE_CATEGORIES],
+    }
+    for offset in range(0, rows, chunk):
+        batch = []
+        for _ in range(min(chunk, rows - offset)):
+            transaction_type = "income" if rng.random() < 0.2 else "expense"
+            batch.append(
+                {
+                    "user_id": user_id,
+                    "type": transaction_type,
+                    "category": rng.choice(categories[transaction_type]),
+                    "amount": Money(rng.randint(100, 500_000)),
+                    "date": today - timedelta(days=rng.randint(0, 3650)),
+                    "description": "Benchmark",
+                    "notes": None,
+                }
+            )
+        db.session.execute(insert(Transaction), batch)
+    db.session.commit()
+
+
+def python_loop(user_id, group_by):
+    """The pre-aggregation approach: every row through the ORM and a dict."""
+    totals = defaultdict(float)
+    for transaction in Transaction.query.filter_by(user_id=user_id):
+        key = tuple(
+            (
+                transaction.date.strftime("%Y-%m")
+                if dimension == "month"
+                else getattr(transaction, dimension)
+            )
+            for dimension in group_by
+        )
+        totals[key] += float(transaction.amount)
+    return totals
+
+
+def sql_backend(user_id, group_by):
+    return aggregate_transactions(
+        user_id, group_by=group_by, use_rollups=False, backend="sql"
+    )
+
+
+def numpy_backend(user_id, group_by):
+    return aggregate_transactions(user_id, group_by=group_by, backend="numpy")
+
+
+def timed(function, *args, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function(*args)
+        best = min(best, time.perf_counter() - started)
+        db.session.expunge_all()
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--rows", type=int, nargs="+", default=[10_000, 100_000, 1_000_000]
+    )
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument(
+        "--skip-loop", action="store_true", help="Skip the slow Python loop."
+    )
+    args = parser.parse_args()
+
+    backends = [("sql", sql_backend), ("numpy", numpy_backend)]
+    if not args.skip_loop:
+        backends.insert(0, ("python loop", python_loop))
+
+    for rows in args.rows:
+        db_fd, db_path = tempfile.mkstemp(suffix=".db")
+        app = create_app(
+            {
+                "SQLALCHEMY_DATABASE_URI": f"sqlite:///{db_path}",
+                "SECRET_KEY": "benchmark",
+                "CHART_RENDER_WORKERS": 0,
+            }
+        )
+        try:
+            with app.app_context():
+                migrations.upgrade(db.engine)
+                user = User(username="benchmark", password_hash="-")
+                db.session.add(user)
+                db.session.commit()
+                seed(user.id, rows)
+
+                print(f"{rows:,} transactions")
+                arrays = load_transaction_arrays(user.id)
+                for label, group_by in QUERIES.items():
+                    for name, backend in backends:
+                        elapsed = timed(backend, user.id, group_by, repeat=args.repeat)
+                        print(f"  {label:>12} {name:>14}: {elapsed * 1e3:9.1f} ms")
+                    elapsed = timed(group_totals, arrays, group_by, repeat=args.repeat)
+                    print(
+                        f"  {label:>12} {'numpy, loaded':>14}: {elapsed * 1e3:9.1f} ms"
+                    )
+                db.engine.dispose()
+        finally:
+            os.close(db_fd)
+            os.unlink(db_path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""Report what booting the web app imports and how long it takes.
+
+Starts fresh interpreters under ``python -X importtime`` that build the app
+with create_app, once as a web worker does and once also loading the
+Matplotlib stack the way a chart render does (what every worker used to
+pay at boot). Prints the boot time of each, whether Matplotlib and NumPy
+were imported, and the packages that took longest to import:
+
+    python -m benchmarks.bench_import_time [--repeat 5] [--top 10]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from collections import defaultdict
+
+WATCHED = ("matplotlib", "numpy", "PIL")
+
+BOOT = """
+import json, sys, time
+started = time.perf_counter()
+from app import create_app
+create_app({"SQLALCHEMY_DATABASE_URI": "sqlite://", "CHART_RENDER_WORKERS": 0})
+if %(render)s:
+    from app.utils.chart_render import load_matplotlib
+    load_matplotlib()
+elapsed = time.perf_counter() - started
+heavy = [name for name in %(watched)r if name in sys.modules]
+print(json.dumps({"seconds": elapsed, "heavy": heavy}))
+"""
+
+
+def boot(render):
+    """Return (seconds, heavy modules loaded, {package: self time in us})"""
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    result = subprocess.run(
+        [
+            sys.executable,
+            "-X",
+            "importtime",
+            "-c",
+            BOOT % {"render": render, "watched": WATCHED},
+        ],
+        capture_output=True,
+        text=True,
+        check=True,
+        cwd=root,
+    )
+    # stderr lines: "import time: self [us] | cumulative | imported package";
+    # summing self times per top-level package charges each module once
+    packages = defaultdict(int)
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+        own, _, name = line[len("import time:") :].split("|")
+        packages[name.strip().split(".")[0]] += int(own)
+    report = json.loads(result.stdout.splitlines()[-1])
+    return report["seconds"], report["heavy"], packages
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+
+    for label, render in (("web worker", False), ("with Matplotlib", True)):
+        runs = [boot(render) for _ in range(args.repeat)]
+        seconds = statistics.median(run[0] for run in runs)
+        heavy = runs[0][1]
+        print(
+            f"{label}: create_app in {seconds * 1e3:.0f} ms (median of "
+            f"{args.repeat}); imports {', '.join(heavy) or 'none'} of "
+            f"{', '.join(WATCHED)}"
+        )
+        packages = runs[-1][2]
+        for name, micros in sorted(packages.items(), key=lambda item: -item[1])[
+            : args.top
+        ]:
+            print(f"  {name:>20}: {micros / 1e3:7.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
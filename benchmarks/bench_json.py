@@ -0,0 +1,156 @@
+"""Compare the JSON encoders on representative chart API payloads.
+
+Builds payloads shaped like the chart bundle (spending by category, income
+vs expenses, a long savings trend, goals progress and the dashboard summary)
+and times turning them into responses with Flask's stock provider and with
+FinanceJSONProvider on the stdlib and orjson encoders. Amounts are floats,
+as data_aggregation returns them; the stock provider cannot encode the
+pre-encoded palette, so it gets the plain list:
+
+    python -m benchmarks.bench_json [--months 120] [--number 2000]
+"""
+
+import argparse
+import random
+import time
+
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+
+from app.utils import json_provider
+from app.utils.data_aggregation import CATEGORY_PALETTE, _category_palette
+from app.utils.json_provider import FinanceJSONProvider
+from app.utils.money import Money
+
+
+def make_bundle(months, goals, fragments=True):
+    """A chart bundle with the given history length and number of goals."""
+    rng = random.Random(3)
+
+    def amount(low, high):
+        return float(Money(rng.randint(low * 100, high * 100)))
+
+    categories = len(CATEGORY_PALETTE)
+    palette = _category_palette(categories)
+    labels = [f"Month {index}" for index in range(months)]
+    monthly_net = [amount(-2000, 3000) for _ in range(months)]
+    return {
+        "charts": {
+            "spending-by-category": {
+                "chart_data": {
+                    "labels": [f"category {index}" for index in range(categories)],
+                    "datasets": [
+                        {
+                            "data": [amount(10, 900) for _ in range(categories)],
+                            "backgroundColor": palette if fragments else palette.value,
+                            "borderWidth": 2,
+                            "borderColor": "#fff",
+                        }
+                    ],
+                },
+                "total_spending": amount(1000, 9000),
+                "category_count": categories,
+            },
+            "income-vs-expenses:months=24": {
+                "chart_data": {
+                    "labels": labels[:24],
+                    "datasets": [
+                        {
+                            "label": label,
+                            "data": [amount(100, 5000) for _ in range(24)],
+                            "backgroundColor": "rgba(46, 204, 113, 0.8)",
+                            "borderColor": "rgba(46, 204, 113, 1)",
+                            "borderWidth": 1,
+                        }
+                        for label in ("Income", "Expenses")
+                    ],
+                },
+                "total_income": amount(10_000, 90_000),
+                "total_expenses": amount(10_000, 90_000),
+                "net_savings": amount(-5000, 5000),
+            },
+            f"savings-trend:months={months}": {
+                "chart_data": {
+                    "labels": labels,
+                    "datasets": [
+                        {
+                            "label": "Cumulative Savings",
+                            "data": [amount(-5000, 90_000) for _ in range(months)],
+                            "borderColor": "rgba(52, 152, 219, 1)",
+                            "backgroundColor": "rgba(52, 152, 219, 0.2)",
+                            "fill": True,
+                            "tension": 0.4,
+                        },
+                        {
+                            "label": "Monthly Net",
+                            "data": monthly_net,
+                            "borderColor": "rgba(46, 204, 113, 1)",
+                            "backgroundColor": "rgba(46, 204, 113, 0.8)",
+                            "type": "bar",
+                            "yAxisID": "y1",
+                        },
+                    ],
+                },
+                "best_month": max(monthly_net),
+                "worst_month": min(monthly_net),
+            },
+            "goals-progress": {
+                "chart_data": {
+                    "labels": [f"Goal {index}" for index in range(goals)],
+                    "datasets": [
+                        {
+                            "label": "Progress %",
+                            "data": [rng.uniform(0, 100) for _ in range(goals)],
+                            "backgroundColor": ["rgba(46, 204, 113, 0.8)"] * goals,
+                            "borderColor": ["rgba(46, 204, 113, 1)"] * goals,
+                            "borderWidth": 1,
+                        }
+                    ],
+                },
+            },
+            "dashboard-summary": {
+                "total_income": amount(1000, 9000),
+                "total_expenses": amount(1000, 9000),
+                "transaction_count": 250,
+            },
+        }
+    }
+
+
+def timed(provider, payload, number):
+    started = time.perf_counter()
+    for _ in range(number):
+        provider.response(payload)
+    return (time.perf_counter() - started) / number
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--months", type=int, default=120)
+    parser.add_argument("--goals", type=int, default=20)
+    parser.add_argument("--number", type=int, default=2000)
+    args = parser.parse_args()
+
+    app = Flask(__name__)
+    providers = [("flask default", DefaultJSONProvider(app), False)]
+    for encoder in ("stdlib", "orjson"):
+        if encoder == "orjson" and json_provider.orjson is None:
+            print("orjson is not installed; skipping it")
+            continue
+        app.config["JSON_ENCODER"] = encoder
+        providers.append((encoder, FinanceJSONProvider(app), True))
+
+    payloads = {
+        fragments: make_bundle(args.months, args.goals, fragments)
+        for fragments in (False, True)
+    }
+    size = len(providers[-1][1].dumps(payloads[True]))
+    print(f"chart bundle, {args.months} months, {args.goals} goals: {size:,} bytes")
+    with app.test_request_context():
+        for name, provider, fragments in providers:
+            elapsed = timed(provider, payloads[fragments], args.number)
+            print(f"{name:>14}: {elapsed * 1e6:8.1f} us/response")
+
+
+if __name__ == "__main__":
+    main()
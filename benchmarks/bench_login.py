@@ -0,0 +1,106 @@
+"""Measure login throughput and page latency for password hash settings.
+
+For each hash method, a burst of concurrent logins verifies passwords either
+on the request threads themselves (workers 0, the old behaviour) or through
+a PasswordHasher pool, while another thread keeps serving a small CPU-bound
+"page". Reports logins per second and the page's median and 95th percentile
+latency:
+
+    python -m benchmarks.bench_login [--clients 16] [--seconds 3] \\
+        [--methods pbkdf2:sha256:600000 scrypt:16384:8:1] [--workers 0 2]
+"""
+
+import argparse
+import os
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from werkzeug.security import generate_password_hash
+
+from app.utils.passwords import PasswordHasher, canonical_hash_method
+from app.utils.workers import QueueFull
+
+DEFAULT_METHODS = [
+    "pbkdf2:sha256:100000",
+    "pbkdf2:sha256:1000000",
+    "scrypt:16384:8:1",
+    "scrypt:32768:8:1",
+]
+
+
+def page():
+    """Stand-in for rendering an ordinary page: a few ms of Python work"""
+    return sum(index * index for index in range(50_000))
+
+
+def run(method, workers, clients, seconds):
+    """Return (logins per second, rejected logins, page latencies in ms)"""
+    stored = generate_password_hash("correct horse", method=method)
+    hasher = PasswordHasher(workers=workers, queue_size=clients)
+    deadline = time.perf_counter() + seconds
+    logins = rejected = 0
+    lock = threading.Lock()
+
+    def client():
+        nonlocal logins, rejected
+        while time.perf_counter() < deadline:
+            try:
+                hasher.verify(stored, "correct horse")
+            except QueueFull:
+                with lock:
+                    rejected += 1
+                continue
+            with lock:
+                logins += 1
+
+    latencies = []
+
+    def pages():
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            page()
+            latencies.append((time.perf_counter() - started) * 1e3)
+
+    with ThreadPoolExecutor(max_workers=clients + 1) as executor:
+        futures = [executor.submit(client) for _ in range(clients)]
+        futures.append(executor.submit(pages))
+        for future in futures:
+            future.result()
+    hasher.shutdown()
+    return logins / seconds, rejected, latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--clients", type=int, default=16)
+    parser.add_argument("--seconds", type=float, default=3.0)
+    parser.add_argument("--methods", nargs="+", default=DEFAULT_METHODS)
+    parser.add_argument("--workers", type=int, nargs="+", default=[0, 2])
+    args = parser.parse_args()
+
+    idle = []
+    for _ in range(20):
+        started = time.perf_counter()
+        page()
+        idle.append((time.perf_counter() - started) * 1e3)
+    print(
+        f"{os.cpu_count()} CPUs, {args.clients} concurrent logins; "
+        f"idle page {statistics.median(idle):.1f} ms"
+    )
+
+    for method in args.methods:
+        print(canonical_hash_method(method))
+        for workers in args.workers:
+            rate, rejected, latencies = run(method, workers, args.clients, args.seconds)
+            p95 = statistics.quantiles(latencies, n=20)[-1]
+            label = "inline" if not workers else f"{workers} workers"
+            print(
+                f"  {label:>10}: {rate:7.1f} logins/s ({rejected} rejected), "
+                f"page p50 {statistics.median(latencies):6.1f} ms, p95 {p95:6.1f} ms"
+            )
+
+
+if __name__ == "__main__":
+    main()
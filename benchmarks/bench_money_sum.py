@@ -0,0 +1,72 @@
+"""Compare summing amounts as floats, Decimals and integer-cents Money.
+
+Mirrors the Python side of the aggregation code, which used to add Decimal
+totals into float accumulators. Reports time per pass and whether the result
+is exact:
+
+    python -m benchmarks.bench_money_sum [--rows 1000000] [--repeat 3]
+"""
+
+import argparse
+import random
+import time
+from decimal import Decimal
+
+from app.utils.money import Money
+
+
+def make_amounts(rows):
+    """Return the same random amounts as Decimal and as Money."""
+    rng = random.Random(42)
+    cents = [rng.randint(1, 500_000) for _ in range(rows)]
+    return [Decimal(c).scaleb(-2) for c in cents], [Money(c) for c in cents]
+
+
+def sum_float(decimals, moneys):
+    total = 0.0
+    for amount in decimals:
+        total += float(amount)
+    return Decimal(repr(total))
+
+
+def sum_decimal(decimals, moneys):
+    return sum(decimals, Decimal(0))
+
+
+def sum_money(decimals, moneys):
+    total = Money(0)
+    for amount in moneys:
+        total += amount
+    return total.to_decimal()
+
+
+def sum_money_cents(decimals, moneys):
+    return Money.sum(moneys).to_decimal()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    decimals, moneys = make_amounts(args.rows)
+    exact = sum(decimals, Decimal(0))
+    print(f"{args.rows:,} amounts, exact total {exact:,}")
+
+    for name, summer in (
+        ("float accumulator", sum_float),
+        ("Decimal", sum_decimal),
+        ("Money +=", sum_money),
+        ("Money.sum", sum_money_cents),
+    ):
+        started = time.perf_counter()
+        for _ in range(args.repeat):
+            total = summer(decimals, moneys)
+        elapsed = (time.perf_counter() - started) / args.repeat
+        status = "exact" if total == exact else f"off by {total - exact}"
+        print(f"{name:>18}: {elapsed * 1e3:8.1f} ms/pass  {status}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""Measure allocations of the PNG chart response path.
+
+Compares the old pipeline (base64-encode the PNG in the chart function, then
+decode it again in the route) with handing the route the raw bytes. Matplotlib
+rendering is identical in both, so only the export step is measured:
+
+    python -m benchmarks.bench_png_pipeline [--repeat 50]
+"""
+
+import argparse
+import base64
+import io
+import time
+import tracemalloc
+
+import numpy as np
+
+from app.utils.chart_render import new_figure
+
+
+def build_figure():
+    """Draw a chart roughly the size of the income vs expenses chart."""
+    fig, ax = new_figure(figsize=(12, 6))
+    x = np.arange(12)
+    ax.bar(x - 0.2, np.linspace(1000, 4000, 12), 0.4, label="Income")
+    ax.bar(x + 0.2, np.linspace(800, 3000, 12), 0.4, label="Expenses")
+    ax.legend()
+    ax.grid(True, alpha=0.3)
+    return fig
+
+
+def base64_round_trip(png):
+    """Old path: chart returns base64 text and the route decodes it."""
+    encoded = base64.b64encode(png).decode()
+    return io.BytesIO(base64.b64decode(encoded))
+
+
+def raw_bytes(png):
+    """New path: chart returns PNG bytes that the route wraps directly."""
+    return io.BytesIO(png)
+
+
+def measure(pipeline, png, repeat):
+    """Return (peak bytes allocated per request, mean seconds per request)."""
+    peaks = []
+    started = time.perf_counter()
+    for _ in range(repeat):
+        tracemalloc.start()
+        body = pipeline(png)
+        body.read()
+        peaks.append(tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+    elapsed = (time.perf_counter() - started) / repeat
+    return max(peaks), elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    fig = build_figure()
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format="png", dpi=150, bbox_inches="tight")
+    png = buffer.getvalue()
+
+    print(f"PNG size: {len(png):,} bytes")
+    results = {}
+    for name, pipeline in (
+        ("base64 round trip", base64_round_trip),
+        ("raw bytes", raw_bytes),
+    ):
+        peak, elapsed = measure(pipeline, png, args.repeat)
+        results[name] = peak
+        print(f"{name:>18}: peak {peak:>10,} bytes  {elapsed * 1e6:8.1f} us/request")
+
+    saved = results["base64 round trip"] - results["raw bytes"]
+    print(f"{'saved':>18}: {saved:>10,} bytes/request")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+"""Measure how SQLite pragmas affect readers while a bulk write runs.
+
+Seeds a throwaway database, then has reader threads fetch the dashboard
+summary in a loop while a writer inserts a large batch of transactions in a
+single transaction. With SQLite's defaults (rollback journal) readers stall
+once the writer's changes outgrow its page cache and it takes the exclusive
+lock; with the app's default pragmas (WAL) they keep reading the last
+committed data. Reports read latency and throughput during the write:
+
+    python -m benchmarks.bench_sqlite_concurrency [--rows 50000] \\
+        [--write-rows 200000] [--readers 4]
+"""
+
+import argparse
+import os
+import statistics
+import tempfile
+import threading
+import time
+
+from sqlalchemy.exc import OperationalError
+
+from app import create_app, db, migrations
+from app.models.user import User
+from app.utils.data_aggregation import get_transaction_summary_data
+from app.utils.database import DEFAULT_SQLITE_PRAGMAS
+from benchmarks.bench_aggregation import seed
+
+SETTINGS = {
+    "sqlite defaults": {name: None for name in DEFAULT_SQLITE_PRAGMAS},
+    "app defaults": {},
+}
+
+
+def run(pragmas, rows, write_rows, readers):
+    """Return (write seconds, read latencies in ms, failed reads)
+
+    Failed reads count towards the latencies with the time they waited.
+    """
+    db_fd, db_path = tempfile.mkstemp(suffix=".db")
+    app = create_app(
+        {
+            "SQLALCHEMY_DATABASE_URI": f"sqlite:///{db_path}",
+            "SQLALCHEMY_POOL_SIZE": readers + 1,
+            "SQLITE_PRAGMAS": pragmas,
+            "SECRET_KEY": "benchmark",
+            "CHART_RENDER_WORKERS": 0,
+        }
+    )
+    try:
+        with app.app_context():
+            migrations.upgrade(db.engine)
+            user = User(username="benchmark", password_hash="-")
+            db.session.add(user)
+            db.session.commit()
+            user_id = user.id
+            seed(user_id, rows)
+
+        writing = threading.Event()
+        done = threading.Event()
+        latencies = []
+        failures = 0
+        lock = threading.Lock()
+
+        def reader():
+            nonlocal failures
+            with app.app_context():
+                while not done.is_set():
+                    started = time.perf_counter()
+                    failed = False
+                    try:
+                        get_transaction_summary_data(user_id, 30)
+                    except OperationalError:
+                        # "database is locked" after busy_timeout
+                        failed = True
+                    finally:
+                        db.session.remove()
+                    if writing.is_set():
+                        with lock:
+                            latencies.append((time.perf_counter() - started) * 1e3)
+                            failures += failed
+
+        threads = [threading.Thread(target=reader) for _ in range(readers)]
+        for thread in threads:
+            thread.start()
+        time.sleep(0.2)
+
+        with app.app_context():
+            writing.set()
+            started = time.perf_counter()
+            seed(user_id, write_rows)
+            elapsed = time.perf_counter() - started
+            writing.clear()
+        done.set()
+        for thread in threads:
+            thread.join()
+
+        with app.app_context():
+            db.engine.dispose()
+        return elapsed, latencies, failures
+    finally:
+        os.close(db_fd)
+        for suffix in ("", "-wal", "-shm", "-journal"):
+            if os.path.exists(db_path + suffix):
+                os.unlink(db_path + suffix)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=50_000)
+    parser.add_argument("--write-rows", type=int, default=200_000)
+    parser.add_argument("--readers", type=int, default=4)
+    args = parser.parse_args()
+
+    print(
+        f"{args.rows:,} transactions, {args.readers} readers, "
+        f"{args.write_rows:,} rows written in one transaction"
+    )
+    for label, pragmas in SETTINGS.items():
+        elapsed, latencies, failures = run(
+            pragmas, args.rows, args.write_rows, args.readers
+        )
+        if latencies:
+            p95 = (
+                statistics.quantiles(latencies, n=20)[-1]
+                if len(latencies) > 1
+                else latencies[0]
+            )
+            reads = (
+                f"{len(latencies) / elapsed:7.1f} reads/s, "
+                f"p50 {statistics.median(latencies):7.1f} ms, "
+                f"p95 {p95:7.1f} ms, max {max(latencies):7.1f} ms"
+            )
+        else:
+            reads = "no reads completed"
+        print(
+            f"  {label:>15}: write {elapsed:5.2f} s; {reads}; "
+            f"{failures} failed reads"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""Measure app start-up with and without schema work in the factory.
+
+Migrates a throwaway SQLite database, then times create_app on it, both on
+its own (as it is now) and followed by what the factory used to do on every
+start: db.create_all(), a checkfirst CREATE INDEX for every index and the
+money storage check. Each start builds a new engine, as a new worker
+process would, and reports the median and the number of SQL statements:
+
+    python -m benchmarks.bench_startup [--repeat 50]
+"""
+
+import argparse
+import os
+import statistics
+import tempfile
+import time
+
+from sqlalchemy import event
+
+from app import create_app, db, migrations
+from app.utils.money import money_columns, stored_money_storage
+
+
+def schema_work():
+    """The start-up steps create_app used to run"""
+    db.create_all()
+    for table in db.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(db.engine, checkfirst=True)
+    with db.engine.connect() as connection:
+        for table, column in money_columns(db.metadata):
+            stored_money_storage(connection, table, column)
+
+
+def start(config, with_schema_work):
+    """Return (seconds, statements) for one app start"""
+    statements = []
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    started = time.perf_counter()
+    app = create_app(config)
+    with app.app_context():
+        event.listen(db.engine, "before_cursor_execute", count)
+        if with_schema_work:
+            schema_work()
+        elapsed = time.perf_counter() - started
+        db.engine.dispose()
+    return elapsed, len(statements)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    db_fd, db_path = tempfile.mkstemp(suffix=".db")
+    config = {
+        "SQLALCHEMY_DATABASE_URI": f"sqlite:///{db_path}",
+        "SECRET_KEY": "benchmark",
+        "CHART_RENDER_WORKERS": 0,
+        "PASSWORD_HASH_WORKERS": 0,
+    }
+    try:
+        app = create_app(config)
+        with app.app_context():
+            migrations.upgrade(db.engine)
+            db.engine.dispose()
+
+        for label, with_schema_work in (
+            ("factory + schema work", True),
+            ("factory only", False),
+        ):
+            # The first start also pays for imports; leave it out
+            start(config, with_schema_work)
+            runs = [start(config, with_schema_work) for _ in range(args.repeat)]
+            times = [elapsed * 1e3 for elapsed, _ in runs]
+            print(
+                f"{label:>22}: median {statistics.median(times):6.2f} ms, "
+                f"max {max(times):6.2f} ms, {runs[0][1]} SQL statements"
+            )
+    finally:
+        os.close(db_fd)
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(db_path + suffix):
+                os.unlink(db_path + suffix)
+
+
+if __name__ == "__main__":
+    main()
@@ -5,6 +5,7 @@ import tempfile
 from decimal import Decimal
 
 import pytest
+from sqlalchemy import event
 from werkzeug.security import generate_password_hash
 
 from app import create_app, db
@@ -25,6 +26,7 @@ def app():
             "SQLALCHEMY_DATABASE_URI": f"sqlite:///{db_path}",
             "WTF_CSRF_ENABLED": False,  # Disable CSRF for testing
             "SECRET_KEY": "test-secret-key",
+            "CHART_RENDER_WORKERS": 0,  # Render charts inline
         }
     )
 
@@ -49,6 +51,19 @@ def runner(app):
     return app.test_cli_runner()
 
 
+@pytest.fixture
+def captured_queries(app):
+    """Record every SQL statement (and its parameters) sent to the test database."""
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append((statement, parameters))
+
+    event.listen(db.engine, "before_cursor_execute", record)
+    yield statements
+    event.remove(db.engine, "before_cursor_execute", record)
+
+
 @pytest.fixture
 def auth(client):
     """Authentication helper."""
@@ -0,0 +1,202 @@
+"""Tests for the ASGI read API entry point."""
+
+import asyncio
+from datetime import datetime, timezone
+from decimal import Decimal
+from urllib.parse import parse_qsl
+
+import pytest
+from sqlalchemy.orm import Session
+from werkzeug.datastructures import MultiDict
+
+from app import db
+from app.asgi import (
+    async_database_uri,
+    create_asgi_app,
+    handle_read,
+    is_read_api,
+    session_user_id,
+)
+from app.models.transaction import Transaction
+from app.models.user import User
+
+
+def add_expenses(user_id):
+    for category, amount in (("food", "40.00"), ("bills", "75.00")):
+        db.session.add(
+            Transaction(
+                type="expense",
+                category=category,
+                amount=Decimal(amount),
+                description=f"{category} expense",
+                user_id=user_id,
+            )
+        )
+    db.session.commit()
+
+
+class TestReadAPI:
+    """Test the read API handlers shared with the async server."""
+
+    @pytest.mark.unit
+    def test_paths_and_uris(self):
+        """Test which paths are served and how database URIs are mapped."""
+        assert is_read_api("/charts/api/savings-trend")
+        assert is_read_api("/charts/api/bundle")
+        assert is_read_api("/goals/api/stats")
+        assert not is_read_api("/charts/api/cache-stats")
+        assert not is_read_api("/transactions/api/list")
+
+        assert async_database_uri("sqlite:////tmp/app.db") == (
+            "sqlite+aiosqlite:////tmp/app.db"
+        )
+        assert async_database_uri("postgresql://u:p@db/finance") == (
+            "postgresql+asyncpg://u:p@db/finance"
+        )
+        with pytest.raises(ValueError):
+            async_database_uri("oracle://db")
+
+    @pytest.mark.unit
+    def test_session_cookie_identifies_user(self, app, logged_in_user):
+        """Test the Flask session cookie is read without a request context."""
+        user = User.query.filter_by(username="testuser").first()
+        cookie = logged_in_user.get_cookie(app.config["SESSION_COOKIE_NAME"])
+        name = app.config["SESSION_COOKIE_NAME"]
+
+        assert session_user_id(app, f"{name}={cookie.value}") == user.id
+        assert session_user_id(app, f"{name}={cookie.value}x") is None
+        assert session_user_id(app, "other=1") is None
+
+    @pytest.mark.unit
+    def test_handle_read_matches_flask_routes(self, app, logged_in_user):
+        """Test payloads and ETags agree with the WSGI routes."""
+        user_id = User.query.filter_by(username="testuser").first().id
+        add_expenses(user_id)
+
+        for path, query in (
+            ("/charts/api/spending-by-category", MultiDict()),
+            ("/charts/api/savings-trend", MultiDict({"months": "24"})),
+            ("/goals/api/stats", MultiDict()),
+            (
+                "/charts/api/bundle",
+                MultiDict(
+                    [("chart", "goals-progress"), ("chart", "dashboard-summary")]
+                ),
+            ),
+        ):
+            url = path + ("?" + "&".join(f"{k}={v}" for k, v in query.items(True)))
+            expected = logged_in_user.get(url)
+            with Session(db.engine) as session:
+                status, payload, headers = handle_read(
+                    app, session, user_id, path, query, {}
+                )
+            assert status == 200
+            assert app.json.loads(app.json.dumps(payload)) == expected.get_json()
+            assert headers["ETag"] == expected.headers["ETag"]
+
+            with Session(db.engine) as session:
+                status, payload, _ = handle_read(
+                    app,
+                    session,
+                    user_id,
+                    path,
+                    query,
+                    {"HTTP_IF_NONE_MATCH": headers["ETag"]},
+                )
+            assert (status, payload) == (304, None)
+
+        for path, query in (
+            ("/charts/api/savings-trend", "months=0"),
+            ("/charts/api/income-vs-expenses", "months=six"),
+            ("/charts/api/spending-by-category", "start_date=2024-13-01"),
+        ):
+            expected = logged_in_user.get(f"{path}?{query}")
+            with Session(db.engine) as session:
+                status, payload, _ = handle_read(
+                    app, session, user_id, path, MultiDict(parse_qsl(query)), {}
+                )
+            assert status == expected.status_code == 400
+            assert payload == expected.get_json()
+
+        with Session(db.engine) as session:
+            unknown_user = handle_read(
+                app, session, 999, "/goals/api/stats", MultiDict(), {}
+            )
+        assert unknown_user[0] == 401
+
+    @pytest.mark.unit
+    def test_handle_read_ignores_if_modified_since(self, app, logged_in_user, mocker):
+        """Test a write in the second of the last fetch is not answered with 304."""
+        user_id = User.query.filter_by(username="testuser").first().id
+        clock = mocker.patch("app.models.data_version.datetime")
+        clock.now.return_value = datetime.now(timezone.utc).replace(microsecond=0)
+
+        add_expenses(user_id)
+        with Session(db.engine) as session:
+            _, _, first = handle_read(
+                app, session, user_id, "/goals/api/stats", MultiDict(), {}
+            )
+        add_expenses(user_id)
+        with Session(db.engine) as session:
+            status, _, second = handle_read(
+                app,
+                session,
+                user_id,
+                "/goals/api/stats",
+                MultiDict(),
+                {"HTTP_IF_MODIFIED_SINCE": first["Last-Modified"]},
+            )
+        assert status == 200
+        assert second["Last-Modified"] == first["Last-Modified"]
+        assert second["ETag"] != first["ETag"]
+
+    @pytest.mark.integration
+    def test_asgi_app_serves_read_api(self, app, logged_in_user):
+        """Test a request through the ASGI app over the async engine."""
+        user_id = User.query.filter_by(username="testuser").first().id
+        add_expenses(user_id)
+        name = app.config["SESSION_COOKIE_NAME"]
+        cookie = logged_in_user.get_cookie(name).value
+        asgi_app = create_asgi_app(app)
+
+        async def request(path, query=b"", headers=()):
+            scope = {
+                "type": "http",
+                "http_version": "1.1",
+                "method": "GET",
+                "path": path,
+                "query_string": query,
+                "headers": [(b"cookie", f"{name}={cookie}".encode()), *headers],
+            }
+            messages = []
+
+            async def receive():
+                return {"type": "http.request", "body": b"", "more_body": False}
+
+            async def send(message):
+                messages.append(message)
+
+            await asgi_app(scope, receive, send)
+            return messages[0]["status"], dict(messages[0]["headers"]), messages[1]
+
+        async def main():
+            results = await asyncio.gather(
+                *(request("/charts/api/spending-by-category") for _ in range(5))
+            )
+            _, headers, _ = results[0]
+            unchanged = await request(
+                "/charts/api/spending-by-category",
+                headers=[(b"if-none-match", headers[b"etag"])],
+            )
+            # Other paths are served by the Flask app through asgiref
+            page = await request("/transactions/api/list")
+            await asgi_app.engine.dispose()
+            return results, unchanged, page
+
+        results, unchanged, page = asyncio.run(main())
+        expected = logged_in_user.get("/charts/api/spending-by-category").get_json()
+        for status, _, body in results:
+            assert status == 200
+            assert app.json.loads(body["body"]) == expected
+        assert unchanged[0] == 304
+        assert page[0] == 200
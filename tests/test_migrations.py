@@ -0,0 +1,150 @@
+"""Tests for the schema migrations and the db CLI commands."""
+
+from datetime import date, timedelta
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import inspect
+
+from app import create_app, db, migrations
+from app.models.transaction import Transaction
+from app.models.user import User
+from app.utils.data_aggregation import (
+    aggregate_transactions,
+    get_income_vs_expenses_data,
+    get_spending_by_category_data,
+)
+
+
+@pytest.fixture
+def bare_app(tmp_path):
+    """An app whose database file has not been created yet."""
+    app = create_app(
+        {
+            "TESTING": True,
+            "SQLALCHEMY_DATABASE_URI": f"sqlite:///{tmp_path / 'finance.db'}",
+            "CHART_RENDER_WORKERS": 0,
+        }
+    )
+    with app.app_context():
+        yield app
+        db.engine.dispose()
+
+
+def schema(engine):
+    """Tables with their column and index names."""
+    inspector = inspect(engine)
+    return {
+        table: (
+            sorted(column["name"] for column in inspector.get_columns(table)),
+            sorted(index["name"] for index in inspector.get_indexes(table)),
+        )
+        for table in inspector.get_table_names()
+        if table != migrations.schema_version.name
+    }
+
+
+class TestMigrations:
+    """Test the migrations build the models' schema."""
+
+    @pytest.mark.unit
+    def test_factory_does_not_touch_database(self, bare_app, tmp_path):
+        """Test creating the app opens no database connection."""
+        assert not (tmp_path / "finance.db").exists()
+
+    @pytest.mark.integration
+    def test_upgrade_matches_models(self, bare_app):
+        """Test migrating an empty database yields the models' schema."""
+        result = bare_app.test_cli_runner().invoke(args=["db", "upgrade"])
+        assert result.exit_code == 0
+        assert "Applied 0001_initial" in result.output
+
+        migrated = schema(db.engine)
+        with db.engine.connect() as connection:
+            assert migrations.pending_migrations(connection) == []
+        db.drop_all()
+        db.create_all()
+        assert migrated == schema(db.engine)
+
+        result = bare_app.test_cli_runner().invoke(args=["db", "upgrade"])
+        assert "up to date" in result.output
+
+    @pytest.mark.integration
+    def test_upgrade_existing_database(self, bare_app):
+        """Test a database created before migrations gets missing indexes."""
+        db.create_all()
+        db.session.execute(db.text("DROP INDEX ix_transaction_user_category"))
+        db.session.commit()
+
+        applied = migrations.upgrade(db.engine)
+
+        assert [migration.version for migration in applied] == [1]
+        indexes = inspect(db.engine).get_indexes("transaction")
+        assert "ix_transaction_user_category" in {index["name"] for index in indexes}
+
+    @pytest.mark.integration
+    def test_upgrade_backfills_rollups(self, bare_app):
+        """Test migrating a database with transactions keeps chart totals."""
+        db.create_all()
+        user = User(username="olduser", password_hash="hash")
+        db.session.add(user)
+        db.session.commit()
+        today = date.today()
+        for days, kind, category, amount in (
+            (70, "income", "salary", "2500.00"),
+            (65, "expense", "food", "40.10"),
+            (64, "expense", "food", "19.95"),
+            (100, "expense", "bills", "75.00"),
+            (2, "expense", "food", "12.00"),
+        ):
+            db.session.add(
+                Transaction(
+                    type=kind,
+                    category=category,
+                    amount=Decimal(amount),
+                    date=today - timedelta(days=days),
+                    description=f"{category} {days}",
+                    user_id=user.id,
+                )
+            )
+        db.session.commit()
+        expected = (
+            get_income_vs_expenses_data(user.id, 6),
+            get_spending_by_category_data(user.id),
+        )
+
+        # As left by a version of the app that predates the rollups
+        db.session.execute(db.text("DROP TABLE monthly_rollup"))
+        db.session.commit()
+        migrations.upgrade(db.engine)
+
+        start = today.replace(day=1) - timedelta(days=150)
+        totals = {
+            use_rollups: sorted(
+                aggregate_transactions(
+                    user.id, ("month", "type"), start, today, use_rollups=use_rollups
+                )
+            )
+            for use_rollups in (True, False)
+        }
+        assert totals[True] == totals[False]
+        assert (
+            get_income_vs_expenses_data(user.id, 6),
+            get_spending_by_category_data(user.id),
+        ) == expected
+
+    @pytest.mark.unit
+    def test_stamp_and_current(self, bare_app):
+        """Test stamping records versions without running migrations."""
+        runner = bare_app.test_cli_runner()
+
+        result = runner.invoke(args=["db", "stamp", "1"])
+        assert result.exit_code == 0
+        assert inspect(db.engine).get_table_names() == ["schema_version"]
+        assert "0001_initial (applied)" in runner.invoke(args=["db", "current"]).output
+
+        runner.invoke(args=["db", "stamp", "0"])
+        assert "0001_initial (pending)" in runner.invoke(args=["db", "current"]).output
+
+        result = runner.invoke(args=["db", "stamp", "99"])
+        assert result.exit_code != 0
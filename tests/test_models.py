@@ -7,7 +7,9 @@ import pytest
 from werkzeug.security import check_password_hash, generate_password_hash
 
 from app import db
+from app.models.data_version import data_changed, get_data_version
 from app.models.goal import Goal
+from app.models.rollup import MonthlyRollup, apply_rollup_deltas
 from app.models.transaction import Transaction
 from app.models.user import User
 
@@ -387,3 +389,234 @@ class TestGoal:
             assert retrieved.current_amount == Decimal("123.45")
             assert str(retrieved.target_amount) == "1234.56"
             assert str(retrieved.current_amount) == "123.45"
+
+
+class TestMonthlyRollup:
+    """Test MonthlyRollup maintenance on transaction writes."""
+
+    @staticmethod
+    def rollups(user_id):
+        return {
+            (r.month, r.type, r.category): (r.total, r.count)
+            for r in MonthlyRollup.query.filter_by(user_id=user_id).all()
+        }
+
+    @pytest.mark.models
+    def test_rollups_follow_create_edit_delete(self, app):
+        """Test rollups are updated on insert, update and delete."""
+        user = User(username="rollupuser", password_hash="hash")
+        db.session.add(user)
+        db.session.commit()
+        day = date(2024, 3, 15)
+
+        first = Transaction(
+            type="expense",
+            category="food",
+            amount=Decimal("20.00"),
+            description="Lunch",
+            date=day,
+            user_id=user.id,
+        )
+        second = Transaction(
+            type="expense",
+            category="food",
+            amount=Decimal("5.50"),
+            description="Coffee",
+            date=day,
+            user_id=user.id,
+        )
+        db.session.add_all([first, second])
+        db.session.commit()
+        assert self.rollups(user.id) == {
+            ("2024-03", "expense", "food"): (Decimal("25.50"), 2)
+        }
+
+        # Moving a transaction to another month and category
+        second.date = date(2024, 4, 2)
+        second.category = "bills"
+        second.amount = Decimal("7.25")
+        db.session.commit()
+        assert self.rollups(user.id) == {
+            ("2024-03", "expense", "food"): (Decimal("20.00"), 1),
+            ("2024-04", "expense", "bills"): (Decimal("7.25"), 1),
+        }
+
+        # Untracked columns leave the rollups alone
+        first.notes = "Team lunch"
+        db.session.commit()
+
+        db.session.delete(first)
+        db.session.commit()
+        assert self.rollups(user.id) == {
+            ("2024-04", "expense", "bills"): (Decimal("7.25"), 1)
+        }
+
+    @pytest.mark.models
+    def test_rollups_survive_rollback(self, app):
+        """Test a rolled back write leaves no rollup behind."""
+        user = User(username="rollbackuser", password_hash="hash")
+        db.session.add(user)
+        db.session.commit()
+
+        db.session.add(
+            Transaction(
+                type="income",
+                category="salary",
+                amount=Decimal("100.00"),
+                description="Pay",
+                user_id=user.id,
+            )
+        )
+        db.session.flush()
+        db.session.rollback()
+
+        assert self.rollups(user.id) == {}
+
+    @pytest.mark.models
+    def test_counters_are_upserted(self, app, captured_queries):
+        """Test rollup and version rows are written by single upserts."""
+        user = User(username="upsertuser", password_hash="hash")
+        db.session.add(user)
+        db.session.commit()
+        # Another writer created this month's row first
+        apply_rollup_deltas(
+            db.session.connection(),
+            {(user.id, "2024-03", "expense", "food"): (Decimal("5.00"), 1)},
+        )
+        db.session.commit()
+        captured_queries.clear()
+
+        db.session.add(
+            Transaction(
+                type="expense",
+                category="food",
+                amount=Decimal("20.00"),
+                description="Lunch",
+                date=date(2024, 3, 15),
+                user_id=user.id,
+            )
+        )
+        db.session.commit()
+
+        writes = [
+            statement
+            for statement, _ in captured_queries
+            if "monthly_rollup" in statement or "data_version" in statement
+        ]
+        assert len(writes) == 2
+        assert all(
+            statement.startswith("INSERT") and "ON CONFLICT" in statement
+            for statement in writes
+        )
+        assert self.rollups(user.id) == {
+            ("2024-03", "expense", "food"): (Decimal("25.00"), 2)
+        }
+        assert get_data_version(user.id)[0] == 1
+
+    @pytest.mark.models
+    def test_rebuild_command(self, app, runner):
+        """Test the CLI rebuild recreates rollups from transactions."""
+        user = User(username="rebuilduser", password_hash="hash")
+        db.session.add(user)
+        db.session.commit()
+        db.session.add(
+            Transaction(
+                type="income",
+                category="salary",
+                amount=Decimal("1500.00"),
+                description="Pay",
+                date=date(2024, 1, 31),
+                user_id=user.id,
+            )
+        )
+        db.session.commit()
+        expected = self.rollups(user.id)
+        MonthlyRollup.query.delete()
+        db.session.commit()
+
+        result = runner.invoke(args=["rollups", "rebuild"])
+
+        assert "Rebuilt 1 monthly rollup rows" in result.output
+        assert self.rollups(user.id) == expected
+
+
+class TestDataVersion:
+    """Test per-user data versions bumped on transaction and goal writes."""
+
+    @pytest.mark.models
+    def test_version_bumps_on_writes(self, app):
+        """Test creates, edits and deletes each bump the owner's version."""
+        user = User(username="versionuser", password_hash="hash")
+        other = User(username="otheruser", password_hash="hash")
+        db.session.add_all([user, other])
+        db.session.commit()
+        assert get_data_version(user.id) == (0, None)
+
+        transaction = Transaction(
+            type="expense",
+            category="food",
+            amount=Decimal("12.00"),
+            description="Snack",
+            user_id=user.id,
+        )
+        db.session.add(transaction)
+        db.session.commit()
+        version, updated_at = get_data_version(user.id)
+        assert version == 1
+        assert updated_at is not None
+
+        transaction.amount = Decimal("15.00")
+        db.session.commit()
+        db.session.add(
+            Goal(
+                name="Bike",
+                target_amount=Decimal("300.00"),
+                deadline=date(2030, 1, 1),
+                user_id=user.id,
+            )
+        )
+        db.session.commit()
+        db.session.delete(transaction)
+        db.session.commit()
+
+        assert get_data_version(user.id)[0] == 4
+        assert get_data_version(other.id)[0] == 0
+
+    @pytest.mark.models
+    def test_changes_announced_after_commit_only(self, app):
+        """Test data_changed fires on commit and not for rolled back writes."""
+        user = User(username="signaluser", password_hash="hash")
+        db.session.add(user)
+        db.session.commit()
+        received = []
+
+        def record(sender, user_ids, **kwargs):
+            received.append(user_ids)
+
+        with data_changed.connected_to(record):
+            db.session.add(
+                Transaction(
+                    type="income",
+                    category="salary",
+                    amount=Decimal("50.00"),
+                    description="Pay",
+                    user_id=user.id,
+                )
+            )
+            db.session.flush()
+            db.session.rollback()
+            assert received == []
+            assert get_data_version(user.id)[0] == 0
+
+            db.session.add(
+                Transaction(
+                    type="income",
+                    category="salary",
+                    amount=Decimal("50.00"),
+                    description="Pay",
+                    user_id=user.id,
+                )
+            )
+            db.session.commit()
+
+        assert received == [{user.id}]
@@ -0,0 +1,164 @@
+"""Query-plan checks for the hot per-user access paths."""
+
+import re
+from datetime import date, timedelta
+from decimal import Decimal
+
+import pytest
+
+from app import db
+from app.models.goal import Goal
+from app.models.transaction import Transaction
+from app.models.user import User
+from app.utils.data_aggregation import (
+    get_income_vs_expenses_data,
+    get_savings_trend_data,
+    get_spending_by_category_data,
+    get_transaction_summary_data,
+)
+
+# A plan step such as "SCAN transaction" reads every row of the table; index
+# access shows up as "SEARCH ... USING INDEX" or "SCAN ... USING INDEX".
+FULL_SCAN = re.compile(
+    r'\bSCAN "?(transaction|goal|monthly_rollup)"?(?!.*\bUSING\b.*INDEX)'
+)
+
+
+def full_table_scans(statements):
+    """Return (statement, plan step) pairs that scan transaction or goal rows."""
+    scans = []
+    connection = db.session.connection()
+    for statement, parameters in statements:
+        if not statement.lstrip().upper().startswith("SELECT"):
+            continue
+        plan = connection.exec_driver_sql(
+            f"EXPLAIN QUERY PLAN {statement}", parameters
+        ).fetchall()
+        for row in plan:
+            detail = row[-1]
+            if FULL_SCAN.search(detail):
+                scans.append((statement, detail))
+    return scans
+
+
+@pytest.fixture
+def seeded_user(app):
+    """Create a user with a mix of transactions and goals."""
+    user = User(username="planuser")
+    user.set_password("TestPass123!")
+    db.session.add(user)
+    db.session.commit()
+
+    today = date.today()
+    for i in range(12):
+        db.session.add(
+            Transaction(
+                type="income" if i % 3 == 0 else "expense",
+                category="salary" if i % 3 == 0 else "food",
+                amount=Decimal(f"{100 + i}.00"),
+                description=f"Plan transaction {i}",
+                date=today - timedelta(days=i * 20),
+                user_id=user.id,
+            )
+        )
+    db.session.add(
+        Goal(
+            name="Plan Goal",
+            target_amount=Decimal("1000.00"),
+            deadline=today + timedelta(days=90),
+            user_id=user.id,
+        )
+    )
+    db.session.commit()
+    return user
+
+
+class TestHotQueryPlans:
+    """Every hot query must be answered through an index, not a table scan."""
+
+    @pytest.mark.integration
+    def test_indexes_are_declared(self, app):
+        """Test the composite indexes exist in the database."""
+        index_names = {
+            row[1]
+            for table in ("transaction", "goal")
+            for row in db.session.connection()
+            .exec_driver_sql(f'PRAGMA index_list("{table}")')
+            .fetchall()
+        }
+        assert {
+            "ix_transaction_user_date_created",
+            "ix_transaction_user_type_date",
+            "ix_transaction_user_category",
+            "ix_goal_user_status_deadline",
+        } <= index_names
+
+    @pytest.mark.integration
+    def test_dashboard_queries_use_indexes(self, client, seeded_user, captured_queries):
+        """Test the dashboard home page queries."""
+        client.post(
+            "/auth/login", data={"username": "planuser", "password": "TestPass123!"}
+        )
+        captured_queries.clear()
+
+        response = client.get("/")
+
+        assert response.status_code == 200
+        assert captured_queries
+        assert full_table_scans(captured_queries) == []
+
+    @pytest.mark.integration
+    def test_transaction_list_queries_use_indexes(
+        self, client, seeded_user, captured_queries
+    ):
+        """Test the transaction list queries with and without filters."""
+        client.post(
+            "/auth/login", data={"username": "planuser", "password": "TestPass123!"}
+        )
+        start = (date.today() - timedelta(days=90)).strftime("%Y-%m-%d")
+        end = date.today().strftime("%Y-%m-%d")
+        captured_queries.clear()
+
+        for url in (
+            "/transactions/",
+            "/transactions/?type=expense",
+            "/transactions/?category=food",
+            f"/transactions/?type=income&start_date={start}&end_date={end}",
+        ):
+            assert client.get(url).status_code == 200
+
+        assert full_table_scans(captured_queries) == []
+
+    @pytest.mark.integration
+    def test_cursor_pages_use_indexes(self, client, seeded_user, captured_queries):
+        """Test keyset pages seek through an index."""
+        client.post(
+            "/auth/login", data={"username": "planuser", "password": "TestPass123!"}
+        )
+        first = client.get("/transactions/api/list?per_page=5").get_json()
+        captured_queries.clear()
+
+        response = client.get(
+            f"/transactions/api/list?per_page=5&cursor={first['next_cursor']}"
+        )
+
+        assert response.status_code == 200
+        assert len(response.get_json()["transactions"]) == 5
+        assert full_table_scans(captured_queries) == []
+
+    @pytest.mark.integration
+    def test_aggregation_queries_use_indexes(self, seeded_user, captured_queries):
+        """Test the chart aggregation queries."""
+        user_id = seeded_user.id
+        captured_queries.clear()
+
+        get_spending_by_category_data(
+            user_id, date.today() - timedelta(days=30), date.today()
+        )
+        get_spending_by_category_data(user_id)
+        get_income_vs_expenses_data(user_id)
+        get_savings_trend_data(user_id)
+        get_transaction_summary_data(user_id)
+
+        assert len(captured_queries) >= 5
+        assert full_table_scans(captured_queries) == []
@@ -1,15 +1,24 @@
 """Tests for application routes."""
 
-from datetime import date, timedelta
+import io
+import json
+import tempfile
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from datetime import date, datetime, timedelta, timezone
 from decimal import Decimal
 
 import pytest
 from flask import url_for
 
 from app import db
+from app.models.data_version import bump_data_versions
 from app.models.goal import Goal
 from app.models.transaction import Transaction
 from app.models.user import User
+from app.utils import exporter
+from app.utils.passwords import init_password_hasher
+from app.utils.workers import QueueFull
 
 
 class TestAuthRoutes:
@@ -87,6 +96,44 @@ class TestAuthRoutes:
         response = logged_in_user.get("/auth/logout")
         assert response.status_code == 302  # Redirect after logout
 
+    @pytest.mark.routes
+    def test_login_rehashes_outdated_passwords(self, app, client, user, mocker):
+        """Test a login upgrades the stored hash to PASSWORD_HASH_METHOD."""
+        app.config["PASSWORD_HASH_METHOD"] = "pbkdf2:sha256:1000"
+        app.config["PASSWORD_HASH_WORKERS"] = 0
+        init_password_hasher(app)
+
+        old_hash = User.query.filter_by(username="testuser").first().password_hash
+        assert old_hash.startswith("scrypt:")
+        response = client.post(
+            "/auth/login", data={"username": "testuser", "password": "TestPass123!"}
+        )
+        assert response.status_code == 302
+
+        db.session.expire_all()
+        new_hash = User.query.filter_by(username="testuser").first().password_hash
+        assert new_hash.startswith("pbkdf2:sha256:1000$")
+        assert app.extensions["password_hasher"].rehashes == 1
+
+        # Already current: checked, not rewritten
+        client.get("/auth/logout")
+        client.post(
+            "/auth/login", data={"username": "testuser", "password": "TestPass123!"}
+        )
+        db.session.expire_all()
+        assert User.query.filter_by(username="testuser").first().password_hash == (
+            new_hash
+        )
+
+        client.get("/auth/logout")
+        mocker.patch.object(
+            app.extensions["password_hasher"], "verify", side_effect=QueueFull
+        )
+        response = client.post(
+            "/auth/login", data={"username": "testuser", "password": "TestPass123!"}
+        )
+        assert response.status_code == 503
+
     @pytest.mark.routes
     def test_login_required_redirect(self, client):
         """Test that protected routes redirect to login."""
@@ -113,6 +160,15 @@ class TestMainRoutes:
         assert b"Dashboard" in response.data
 
 
+class LegacySpooledTemporaryFile(tempfile.SpooledTemporaryFile):
+    """SpooledTemporaryFile as before Python 3.11, without the IOBase methods"""
+
+    def __getattribute__(self, name):
+        if name in ("readable", "seekable", "writable", "read1", "readinto1"):
+            raise AttributeError(name)
+        return super().__getattribute__(name)
+
+
 class TestTransactionRoutes:
     """Test transaction routes."""
 
@@ -228,6 +284,176 @@ class TestTransactionRoutes:
         response = logged_in_user.get("/transactions/?category=food")
         assert response.status_code == 200
 
+    @pytest.mark.routes
+    def test_transaction_index_totals_in_sql(self, logged_in_user, captured_queries):
+        """Test list totals and paging do not load the whole filtered set."""
+        user = User.query.filter_by(username="testuser").first()
+        for i in range(45):
+            db.session.add(
+                Transaction(
+                    type="income" if i % 5 == 0 else "expense",
+                    category="salary" if i % 5 == 0 else "food",
+                    amount=Decimal("10.00"),
+                    description=f"Entry {i}",
+                    user_id=user.id,
+                )
+            )
+        db.session.commit()
+        captured_queries.clear()
+
+        response = logged_in_user.get("/transactions/")
+
+        assert response.status_code == 200
+        # The shared COUNT still drives pagination: 45 rows make three pages
+        assert b"page=3" in response.data
+        assert b"page=4" not in response.data
+        transaction_selects = [
+            statement
+            for statement, _ in captured_queries
+            if 'FROM "transaction"' in statement or "FROM transaction" in statement
+        ]
+        # Aggregate totals, one page of rows, distinct categories
+        assert len(transaction_selects) == 3
+        page_query = next(s for s in transaction_selects if "LIMIT" in s)
+        assert "count(" not in page_query.lower()
+
+    @pytest.mark.routes
+    def test_transaction_cursor_pagination(self, logged_in_user):
+        """Test the JSON list and the HTML cursor mode page by keyset."""
+        user = User.query.filter_by(username="testuser").first()
+        for i in range(30):
+            db.session.add(
+                Transaction(
+                    type="expense",
+                    category="food" if i % 2 else "bills",
+                    amount=Decimal("10.00"),
+                    description=f"Entry {i}",
+                    date=date.today() - timedelta(days=i),
+                    user_id=user.id,
+                )
+            )
+        db.session.commit()
+
+        seen = []
+        cursor = None
+        while True:
+            url = "/transactions/api/list?category=food&per_page=6"
+            response = logged_in_user.get(url + (f"&cursor={cursor}" if cursor else ""))
+            assert response.status_code == 200
+            data = response.get_json()
+            seen.extend(t["description"] for t in data["transactions"])
+            cursor = data["next_cursor"]
+            if cursor is None:
+                break
+        assert seen == [f"Entry {i}" for i in range(1, 30, 2)]
+
+        bad = logged_in_user.get("/transactions/api/list?cursor=garbage")
+        assert bad.status_code == 400
+
+        response = logged_in_user.get("/transactions/?mode=cursor")
+        assert response.status_code == 200
+        assert b"Older" in response.data
+        assert b"Total Income" not in response.data
+
+    @pytest.mark.routes
+    def test_transaction_import_upload(self, logged_in_user):
+        """Test uploading a CSV export imports its rows."""
+        day = (date.today() - timedelta(days=2)).isoformat()
+        csv_bytes = (
+            f"date,description,amount,category\n"
+            f"{day},Train ticket,-12.50,transportation\n"
+            f"{day},?,-1.00,\n"
+        ).encode()
+
+        response = logged_in_user.post(
+            "/transactions/import",
+            data={"file": (io.BytesIO(csv_bytes), "export.csv")},
+            content_type="multipart/form-data",
+        )
+
+        assert response.status_code == 200
+        assert b"Imported 1 transactions" in response.data
+        assert b"Description must be between 2 and 200 characters" in response.data
+        user = User.query.filter_by(username="testuser").first()
+        imported = Transaction.query.filter_by(user_id=user.id).one()
+        assert (imported.type, imported.amount) == ("expense", Decimal("12.50"))
+
+    @pytest.mark.routes
+    def test_transaction_import_spooled_upload(self, app, logged_in_user, monkeypatch):
+        """Test uploads Werkzeug spools to a temporary file are imported."""
+        monkeypatch.setattr(
+            app.request_class,
+            "_get_file_stream",
+            lambda *args, **kwargs: LegacySpooledTemporaryFile(max_size=16),
+        )
+        day = (date.today() - timedelta(days=2)).isoformat()
+        csv_bytes = (
+            "\ufeffdate,description,amount,category\r\n"
+            f'{day},"Caf\u00e9, corner",-3.20,food\r\n'
+        ).encode()
+
+        response = logged_in_user.post(
+            "/transactions/import",
+            data={"file": (io.BytesIO(csv_bytes), "export.csv")},
+            content_type="multipart/form-data",
+        )
+
+        assert response.status_code == 200
+        assert b"Imported 1 transactions" in response.data
+        user = User.query.filter_by(username="testuser").first()
+        imported = Transaction.query.filter_by(user_id=user.id).one()
+        assert (imported.description, imported.amount) == (
+            "Caf\u00e9, corner",
+            Decimal("3.20"),
+        )
+
+    @pytest.mark.routes
+    def test_transaction_export_formats(self, logged_in_user):
+        """Test exports stream the filtered list in every format."""
+        user = User.query.filter_by(username="testuser").first()
+        for i in range(5):
+            db.session.add(
+                Transaction(
+                    type="income" if i == 4 else "expense",
+                    category="salary" if i == 4 else "food",
+                    amount=Decimal("10.25") * (i + 1),
+                    description=f"Entry {i}",
+                    notes="memo" if i % 2 else None,
+                    date=date.today() - timedelta(days=i),
+                    user_id=user.id,
+                )
+            )
+        db.session.commit()
+
+        response = logged_in_user.get("/transactions/export?type=expense")
+        assert response.status_code == 200
+        assert response.is_streamed
+        assert response.mimetype == "text/csv"
+        assert "transactions.csv" in response.headers["Content-Disposition"]
+        lines = response.get_data(as_text=True).splitlines()
+        assert lines[0] == "id,date,type,category,amount,description,notes"
+        assert len(lines) == 5
+        assert lines[1].endswith(",expense,food,41.00,Entry 3,memo")
+
+        response = logged_in_user.get("/transactions/export?format=ndjson")
+        assert response.mimetype == "application/x-ndjson"
+        rows = [
+            json.loads(line) for line in response.get_data(as_text=True).splitlines()
+        ]
+        assert [row["description"] for row in rows][0] == "Entry 4"
+        assert rows[0]["amount"] == 51.25
+
+        response = logged_in_user.get("/transactions/export?format=columnar")
+        rows = list(exporter.read_columnar(io.BytesIO(response.get_data())))
+        assert len(rows) == 5
+        assert rows[-1]["amount"] == Decimal("10.25")
+        assert [row["notes"] for row in rows] == [None, "memo", None, "memo", None]
+
+        bad = logged_in_user.get("/transactions/export?format=xlsx")
+        assert bad.status_code == 400
+        bad = logged_in_user.get("/transactions/export?start_date=yesterday")
+        assert bad.status_code == 400
+
     @pytest.mark.routes
     def test_categories_api(self, logged_in_user):
         """Test categories API endpoint."""
@@ -493,3 +719,465 @@ class TestErrorHandling:
         """Test accessing non-existent goal."""
         response = logged_in_user.get("/goals/99999/edit")
         assert response.status_code == 404
+
+
+class TestChartRoutes:
+    """Test chart data API routes."""
+
+    @pytest.mark.routes
+    def test_chart_apis_return_aggregates(self, logged_in_user):
+        """Test the Chart.js data endpoints aggregate the user's transactions."""
+        user = User.query.filter_by(username="testuser").first()
+        for category, amount in (
+            ("food", "40.00"),
+            ("food", "10.00"),
+            ("bills", "75.00"),
+        ):
+            db.session.add(
+                Transaction(
+                    type="expense",
+                    category=category,
+                    amount=Decimal(amount),
+                    description=f"{category} expense",
+                    user_id=user.id,
+                )
+            )
+        db.session.commit()
+
+        response = logged_in_user.get("/charts/api/spending-by-category")
+        assert response.status_code == 200
+        data = response.get_json()
+        assert data["chart_data"]["labels"] == ["bills", "food"]
+        assert data["chart_data"]["datasets"][0]["data"] == [75.0, 50.0]
+
+        response = logged_in_user.get("/charts/api/dashboard-summary")
+        assert response.status_code == 200
+        assert response.get_json()["total_expenses"] == 125.0
+
+    @pytest.mark.routes
+    def test_dashboard_reads_transactions_once(
+        self, app, logged_in_user, captured_queries
+    ):
+        """Test the numpy backend serves every chart API from one load."""
+        app.config["AGGREGATION_BACKEND"] = "numpy"
+        cache = app.extensions["transaction_cache"]
+        user = User.query.filter_by(username="testuser").first()
+        user_id = user.id
+        for category, amount in (("food", "40.00"), ("bills", "75.00")):
+            db.session.add(
+                Transaction(
+                    type="expense",
+                    category=category,
+                    amount=Decimal(amount),
+                    description=f"{category} expense",
+                    user_id=user_id,
+                )
+            )
+        db.session.commit()
+
+        def load_dashboard():
+            captured_queries.clear()
+            for endpoint in (
+                "spending-by-category",
+                "income-vs-expenses",
+                "goals-progress",
+                "savings-trend",
+                "dashboard-summary",
+            ):
+                assert logged_in_user.get(f"/charts/api/{endpoint}").status_code in (
+                    200,
+                    404,
+                )
+            return [sql for sql, _ in captured_queries if 'FROM "transaction"' in sql]
+
+        assert len(load_dashboard()) == 1
+        assert load_dashboard() == []
+        assert cache.stats()["loads"] == 1
+
+        # Adding a transaction through the blueprint drops the cached arrays
+        response = logged_in_user.post(
+            "/transactions/create",
+            data={
+                "type": "expense",
+                "category": "food",
+                "amount": "10.00",
+                "date": date.today().isoformat(),
+                "description": "Lunch",
+            },
+        )
+        assert response.status_code == 302
+        assert user_id not in cache
+        summary = logged_in_user.get("/charts/api/dashboard-summary").get_json()
+        assert summary["total_expenses"] == 125.0
+
+        # Another process's write is found on the next request, and the
+        # validators sent with the body follow it
+        etag = logged_in_user.get("/charts/api/dashboard-summary").headers["ETag"]
+        with db.engine.begin() as connection:
+            connection.execute(
+                Transaction.__table__.insert().values(
+                    type="expense",
+                    category="food",
+                    amount=Decimal("5.00"),
+                    date=date.today(),
+                    description="Elsewhere",
+                    user_id=user_id,
+                )
+            )
+            bump_data_versions(connection, {user_id})
+        response = logged_in_user.get(
+            "/charts/api/dashboard-summary", headers={"If-None-Match": etag}
+        )
+        assert response.status_code == 200
+        assert response.headers["ETag"] != etag
+        assert response.get_json()["total_expenses"] == 130.0
+        assert cache.stats()["loads"] == 3
+
+    @pytest.mark.routes
+    def test_chart_bundle(self, app, logged_in_user, captured_queries):
+        """Test the bundle's datasets, backends and ETags."""
+        user = User.query.filter_by(username="testuser").first()
+        user_id = user.id
+        for category, amount in (("food", "40.00"), ("bills", "75.00")):
+            db.session.add(
+                Transaction(
+                    type="expense",
+                    category=category,
+                    amount=Decimal(amount),
+                    description=f"{category} expense",
+                    user_id=user_id,
+                )
+            )
+        db.session.commit()
+
+        url = (
+            "/charts/api/bundle?chart=spending-by-category"
+            "&chart=income-vs-expenses:months=3&chart=savings-trend:months=24"
+            "&chart=dashboard-summary:days=7&chart=goals-progress"
+        )
+        captured_queries.clear()
+        response = logged_in_user.get(url)
+        assert response.status_code == 200
+        charts = response.get_json()["charts"]
+        assert charts["spending-by-category"]["chart_data"]["labels"] == [
+            "bills",
+            "food",
+        ]
+        assert charts["dashboard-summary:days=7"]["total_expenses"] == 115.0
+        assert charts["savings-trend:months=24"]["current_savings"] == -115.0
+        assert charts["goals-progress"] is None
+        # The SQL backend reads rollups and never loads the whole history
+        assert app.extensions["transaction_cache"].stats()["loads"] == 0
+        assert any("monthly_rollup" in sql for sql, _ in captured_queries)
+
+        # The numpy backend builds every dataset from one load
+        app.config["AGGREGATION_BACKEND"] = "numpy"
+        captured_queries.clear()
+        assert logged_in_user.get(url).get_json()["charts"] == charts
+        transaction_reads = [
+            sql for sql, _ in captured_queries if 'FROM "transaction"' in sql
+        ]
+        assert len(transaction_reads) == 1
+        app.config["AGGREGATION_BACKEND"] = "sql"
+
+        etag = response.headers["ETag"]
+        assert "no-cache" in response.headers["Cache-Control"]
+        captured_queries.clear()
+        unchanged = logged_in_user.get(url, headers={"If-None-Match": etag})
+        assert unchanged.status_code == 304
+        assert len(captured_queries) <= 2  # the session user and data version
+
+        db.session.add(
+            Transaction(
+                type="income",
+                category="salary",
+                amount=Decimal("10.00"),
+                description="Refund",
+                user_id=user_id,
+            )
+        )
+        db.session.commit()
+        changed = logged_in_user.get(url, headers={"If-None-Match": etag})
+        assert changed.status_code == 200
+        assert changed.headers["ETag"] != etag
+
+        for bad in ("", "?chart=pie", "?chart=savings-trend:months=0"):
+            assert logged_in_user.get(f"/charts/api/bundle{bad}").status_code == 400
+
+    @pytest.mark.routes
+    def test_conditional_responses_follow_data_version(
+        self, logged_in_user, captured_queries, mocker
+    ):
+        """Test chart, stats and PNG routes answer revalidation with 304."""
+        user = User.query.filter_by(username="testuser").first()
+        user_id = user.id
+        db.session.add(
+            Transaction(
+                type="expense",
+                category="food",
+                amount=Decimal("12.50"),
+                description="Lunch",
+                user_id=user_id,
+            )
+        )
+        db.session.commit()
+        render = mocker.patch(
+            "app.utils.charts.render_chart", return_value=b"\x89PNG fake"
+        )
+
+        urls = (
+            "/charts/api/spending-by-category",
+            "/charts/api/savings-trend?months=6",
+            "/charts/spending-by-category.png",
+            "/goals/api/stats",
+        )
+        etags = {}
+        for url in urls:
+            response = logged_in_user.get(url)
+            assert response.status_code == 200
+            assert response.headers["Last-Modified"]
+            assert "private" in response.headers["Cache-Control"]
+            etags[url] = response.headers["ETag"]
+        assert len(set(etags.values())) == len(urls)
+
+        for url in urls:
+            captured_queries.clear()
+            response = logged_in_user.get(url, headers={"If-None-Match": etags[url]})
+            assert response.status_code == 304
+            assert response.headers["ETag"] == etags[url]
+            assert len(captured_queries) <= 2  # the session user and data version
+        assert render.call_count == 1
+
+        # Other query strings are other resources
+        other = logged_in_user.get(
+            "/charts/api/savings-trend?months=12",
+            headers={"If-None-Match": etags["/charts/api/savings-trend?months=6"]},
+        )
+        assert other.status_code == 200
+
+        # Only the ETag validates; Last-Modified is too coarse
+        last_modified = logged_in_user.get("/goals/api/stats").headers["Last-Modified"]
+        response = logged_in_user.get(
+            "/goals/api/stats", headers={"If-Modified-Since": last_modified}
+        )
+        assert response.status_code == 200
+
+        db.session.add(
+            Goal(
+                name="Bike",
+                target_amount=Decimal("300.00"),
+                deadline=date.today() + timedelta(days=90),
+                user_id=user_id,
+            )
+        )
+        db.session.commit()
+        response = logged_in_user.get(
+            "/goals/api/stats", headers={"If-None-Match": etags["/goals/api/stats"]}
+        )
+        assert response.status_code == 200
+        assert response.get_json()["total_goals"] == 1
+
+    @pytest.mark.routes
+    def test_same_second_writes_change_responses(self, logged_in_user, mocker):
+        """Test a write in the second of the last fetch is not answered with 304."""
+        user_id = User.query.filter_by(username="testuser").first().id
+        clock = mocker.patch("app.models.data_version.datetime")
+        clock.now.return_value = datetime.now(timezone.utc).replace(microsecond=0)
+
+        def add_goal(name):
+            db.session.add(
+                Goal(
+                    name=name,
+                    target_amount=Decimal("300.00"),
+                    deadline=date.today() + timedelta(days=90),
+                    user_id=user_id,
+                )
+            )
+            db.session.commit()
+
+        add_goal("Bike")
+        first = logged_in_user.get("/goals/api/stats")
+        add_goal("Laptop")
+        headers = {"If-Modified-Since": first.headers["Last-Modified"]}
+        second = logged_in_user.get("/goals/api/stats", headers=headers)
+
+        assert second.status_code == 200
+        assert second.headers["Last-Modified"] == first.headers["Last-Modified"]
+        assert second.get_json()["total_goals"] == 2
+        headers["If-None-Match"] = first.headers["ETag"]
+        assert (
+            logged_in_user.get("/goals/api/stats", headers=headers).status_code == 200
+        )
+        headers["If-None-Match"] = second.headers["ETag"]
+        assert (
+            logged_in_user.get("/goals/api/stats", headers=headers).status_code == 304
+        )
+
+    @pytest.mark.routes
+    def test_png_charts_are_cached_per_data_version(self, app, logged_in_user, mocker):
+        """Test rendered charts are reused until the user's data changes."""
+        user = User.query.filter_by(username="testuser").first()
+        user_id = user.id
+
+        def add_expense(amount):
+            db.session.add(
+                Transaction(
+                    type="expense",
+                    category="food",
+                    amount=Decimal(amount),
+                    description="Groceries",
+                    user_id=user_id,
+                )
+            )
+            db.session.commit()
+
+        add_expense("30.00")
+        render = mocker.patch(
+            "app.utils.charts.render_chart", return_value=b"\x89PNG fake"
+        )
+
+        for _ in range(2):
+            response = logged_in_user.get("/charts/spending-by-category.png")
+            assert response.status_code == 200
+            assert response.data == b"\x89PNG fake"
+        assert render.call_count == 1
+
+        # Process-wide counters are for operators only
+        assert logged_in_user.get("/charts/api/cache-stats").status_code == 404
+        app.config["CHART_CACHE_STATS"] = True
+        stats = logged_in_user.get("/charts/api/cache-stats").get_json()
+        assert (stats["hits"], stats["misses"], stats["entries"]) == (1, 1, 1)
+
+        # A write drops the user's cached images and changes the cache key
+        add_expense("5.00")
+        stats = logged_in_user.get("/charts/api/cache-stats").get_json()
+        assert stats["entries"] == 0
+        logged_in_user.get("/charts/spending-by-category.png")
+        assert render.call_count == 2
+
+    @pytest.mark.routes
+    def test_png_chart_render_pool_errors(self, app, logged_in_user, mocker):
+        """Test a saturated, broken or slow render pool maps to 503 or 504."""
+        user = User.query.filter_by(username="testuser").first()
+        db.session.add(
+            Goal(
+                name="Holiday",
+                target_amount=Decimal("500.00"),
+                deadline=date.today() + timedelta(days=60),
+                user_id=user.id,
+            )
+        )
+        db.session.commit()
+        pool = app.extensions["chart_render_pool"]
+
+        mocker.patch.object(pool, "render", side_effect=QueueFull)
+        assert logged_in_user.get("/charts/goals-progress.png").status_code == 503
+
+        mocker.patch.object(pool, "render", side_effect=FutureTimeoutError)
+        assert logged_in_user.get("/charts/goals-progress.png").status_code == 504
+
+        # A dead worker: 503, and the next render starts a fresh executor
+        mocker.stopall()
+        broken = mocker.Mock()
+        broken.run.side_effect = BrokenProcessPool
+        mocker.patch.object(pool, "workers", 1)
+        mocker.patch.object(pool, "_pool", broken)
+        assert logged_in_user.get("/charts/goals-progress.png").status_code == 503
+        assert pool._pool is None
+        broken.shutdown.assert_called_once_with(wait=False)
+
+        healthy = mocker.Mock()
+        healthy.run.return_value = b"\x89PNG"
+        mocker.patch.object(pool, "_get_pool", return_value=healthy)
+        assert logged_in_user.get("/charts/goals-progress.png").status_code == 200
+
+
+class TestReadReplica:
+    """Test read-only views use the replica bind with read-your-writes."""
+
+    @pytest.fixture
+    def replica_app(self, tmp_path):
+        from app import create_app
+
+        primary, replica = tmp_path / "primary.db", tmp_path / "replica.db"
+        app = create_app(
+            {
+                "TESTING": True,
+                "SQLALCHEMY_DATABASE_URI": f"sqlite:///{primary}",
+                "SQLALCHEMY_BINDS": {"replica": f"sqlite:///{replica}"},
+                "WTF_CSRF_ENABLED": False,
+                "SECRET_KEY": "test-secret-key",
+                "CHART_RENDER_WORKERS": 0,
+            }
+        )
+        with app.app_context():
+            db.create_all()
+            user = User(username="testuser")
+            user.set_password("TestPass123!")
+            db.session.add(user)
+            db.session.commit()
+
+            # The replica is a snapshot of the primary; later writes only
+            # reach the primary, as if replication lagged behind them
+            db.metadata.create_all(db.engines["replica"])
+            rows = db.session.execute(db.select(User.__table__)).mappings().all()
+            with db.engines["replica"].begin() as conn:
+                conn.execute(User.__table__.insert(), [dict(row) for row in rows])
+            db.session.add(
+                Transaction(
+                    type="expense",
+                    category="food",
+                    amount=Decimal("12.50"),
+                    description="Lunch",
+                    user_id=user.id,
+                )
+            )
+            db.session.commit()
+            yield app
+            db.session.remove()
+            for engine in db.engines.values():
+                engine.dispose()
+        # init_app registered a metadata for the bind on the shared db; apps
+        # created later have no such bind
+        db.metadatas.pop("replica", None)
+
+    @pytest.mark.integration
+    def test_reads_follow_replica_until_user_writes(self, replica_app):
+        """Test reads use the replica, and the primary right after a write."""
+        client = replica_app.test_client()
+        client.post(
+            "/auth/login", data={"username": "testuser", "password": "TestPass123!"}
+        )
+        with client.session_transaction() as session:
+            session.pop("_primary_reads_until", None)
+
+        def listed():
+            response = client.get("/transactions/api/list")
+            assert response.status_code == 200
+            return [t["description"] for t in response.get_json()["transactions"]]
+
+        assert listed() == []
+
+        response = client.post(
+            "/transactions/create",
+            data={
+                "type": "expense",
+                "description": "Dinner",
+                "amount": "30.00",
+                "category": "food",
+                "date": date.today().strftime("%Y-%m-%d"),
+            },
+        )
+        assert response.status_code == 302
+        assert sorted(listed()) == ["Dinner", "Lunch"]
+
+        with client.session_transaction() as session:
+            session["_primary_reads_until"] = 0
+        assert listed() == []
+
+        with db.engines["replica"].connect() as conn:
+            replica_rows = conn.scalar(
+                db.select(db.func.count()).select_from(Transaction.__table__)
+            )
+        assert replica_rows == 0
+        assert db.session.scalar(db.select(db.func.count(Transaction.id))) == 2
@@ -0,0 +1,983 @@
+"""Tests for utility modules."""
+
+import base64
+import io
+import os
+import subprocess
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+import pytest
+from werkzeug.security import generate_password_hash
+
+from app import create_app, db
+from app.models.data_version import get_data_version
+from app.models.goal import Goal
+from app.models.transaction import Transaction
+from app.models.user import User, load_user
+from app.utils import exporter, json_provider
+from app.utils.cache import LRUCache
+from app.utils.chart_render import render_chart
+from app.utils.charts import ChartRenderPool, create_spending_by_category_chart
+from app.utils.data_aggregation import (
+    aggregate_transactions,
+    get_dashboard_data,
+    get_income_vs_expenses_data,
+    get_savings_trend_data,
+    get_spending_by_category_data,
+    get_transaction_summary_data,
+)
+from app.utils.database import engine_options, sqlite_pragmas
+from app.utils.helpers import TransactionHelper, format_currency
+from app.utils.importer import import_transactions
+from app.utils.json_provider import FinanceJSONProvider, JSONFragment
+from app.utils.money import Money, stored_money_storage
+from app.utils.pagination import InvalidCursor, encode_cursor, keyset_paginate
+from app.utils.passwords import PasswordHasher, canonical_hash_method, needs_rehash
+from app.utils.workers import BoundedExecutor, QueueFull
+
+
+@pytest.fixture
+def ledger(app):
+    """Create a user with a known set of transactions in two months."""
+    user = User(username="ledger", password_hash="hash")
+    db.session.add(user)
+    db.session.commit()
+
+    this_month = date.today().replace(day=1)
+    last_month = (this_month - timedelta(days=1)).replace(day=1)
+    rows = [
+        ("income", "salary", "3000.00", this_month),
+        ("expense", "food", "120.50", this_month),
+        ("expense", "food", "79.50", this_month),
+        ("expense", "bills", "400.00", this_month),
+        ("income", "salary", "2800.00", last_month),
+        ("expense", "travel", "900.25", last_month),
+    ]
+    for transaction_type, category, amount, day in rows:
+        db.session.add(
+            Transaction(
+                type=transaction_type,
+                category=category,
+                amount=Decimal(amount),
+                description=f"{category} entry",
+                date=day,
+                user_id=user.id,
+            )
+        )
+    db.session.commit()
+    return user
+
+
+class TestDataAggregation:
+    """Test SQL-side aggregation of transactions."""
+
+    @pytest.mark.unit
+    def test_group_by_category(self, ledger):
+        """Test expense totals grouped by category."""
+        rows = aggregate_transactions(
+            ledger.id, group_by=("category",), transaction_type="expense"
+        )
+        totals = {row.category: row.total for row in rows}
+
+        assert totals == {
+            "food": Decimal("200.00"),
+            "bills": Decimal("400.00"),
+            "travel": Decimal("900.25"),
+        }
+        assert sum(row.count for row in rows) == 4
+
+    @pytest.mark.unit
+    def test_group_by_month_and_type(self, ledger):
+        """Test month keys and per-type totals."""
+        rows = aggregate_transactions(ledger.id, group_by=("month", "type"))
+        this_month = date.today().strftime("%Y-%m")
+
+        assert {row.month for row in rows} == {
+            this_month,
+            (date.today().replace(day=1) - timedelta(days=1)).strftime("%Y-%m"),
+        }
+        current = {row.type: row.total for row in rows if row.month == this_month}
+        assert current == {"income": Decimal("3000.00"), "expense": Decimal("600.00")}
+
+    @pytest.mark.unit
+    def test_unknown_dimension(self, ledger):
+        """Test grouping by an unsupported column is rejected."""
+        with pytest.raises(ValueError):
+            aggregate_transactions(ledger.id, group_by=("description",))
+
+    @pytest.mark.unit
+    def test_each_chart_issues_grouped_queries(self, ledger, captured_queries):
+        """Test chart data comes from rollups plus at most two edge queries."""
+        user_id = ledger.id
+        for build in (
+            get_spending_by_category_data,
+            get_income_vs_expenses_data,
+            get_savings_trend_data,
+            get_transaction_summary_data,
+        ):
+            captured_queries.clear()
+            build(user_id)
+            assert 1 <= len(captured_queries) <= 3
+            assert all("GROUP BY" in sql for sql, _ in captured_queries)
+
+    @pytest.mark.unit
+    def test_rollups_match_raw_totals(self, ledger):
+        """Test rollup-backed totals equal a direct scan for partial ranges."""
+        start = date.today().replace(day=1) - timedelta(days=20)
+        for start_date, end_date in (
+            (None, None),
+            (start, date.today()),
+            (start, None),
+        ):
+            with_rollups = aggregate_transactions(
+                ledger.id,
+                group_by=("month", "type", "category"),
+                start_date=start_date,
+                end_date=end_date,
+            )
+            direct = aggregate_transactions(
+                ledger.id,
+                group_by=("month", "type", "category"),
+                start_date=start_date,
+                end_date=end_date,
+                use_rollups=False,
+            )
+            assert sorted(with_rollups) == sorted(direct)
+
+    @pytest.mark.unit
+    def test_numpy_backend_matches_sql(self, app, ledger):
+        """Test the NumPy backend groups exactly like the SQL backend."""
+        start = date.today().replace(day=1) - timedelta(days=20)
+        for group_by in (
+            (),
+            ("type",),
+            ("category",),
+            ("month", "type"),
+            ("month", "type", "category"),
+        ):
+            for start_date in (None, start):
+                sql = aggregate_transactions(
+                    ledger.id, group_by=group_by, start_date=start_date
+                )
+                vectorized = aggregate_transactions(
+                    ledger.id, group_by=group_by, start_date=start_date, backend="numpy"
+                )
+                assert sorted(vectorized) == sorted(sql)
+        long_ago = date.today() - timedelta(days=400)
+        assert (
+            aggregate_transactions(ledger.id, end_date=long_ago, backend="numpy") == []
+        )
+
+        app.config["AGGREGATION_BACKEND"] = "numpy"
+        assert get_savings_trend_data(ledger.id) == get_savings_trend_data(
+            ledger.id, backend="sql"
+        )
+        with pytest.raises(ValueError):
+            aggregate_transactions(ledger.id, backend="pandas")
+
+    @pytest.mark.unit
+    def test_chart_payloads(self, ledger):
+        """Test the Chart.js payloads carry the aggregated figures."""
+        spending = get_spending_by_category_data(ledger.id)
+        assert spending["chart_data"]["labels"] == ["travel", "bills", "food"]
+        assert spending["total_spending"] == pytest.approx(1500.25)
+
+        summary = get_transaction_summary_data(ledger.id, days=400)
+        assert summary["total_income"] == pytest.approx(5800.00)
+        assert summary["total_expenses"] == pytest.approx(1500.25)
+        assert summary["transaction_count"] == 6
+        assert summary["top_spending_categories"][0] == ("travel", 900.25)
+
+        trend = get_savings_trend_data(ledger.id)
+        assert trend["current_savings"] == pytest.approx(4299.75)
+
+
+class TestLRUCache:
+    """Test the bounded LRU cache."""
+
+    @pytest.mark.unit
+    def test_evicts_least_recently_used(self):
+        """Test the entry bound evicts the oldest unused key."""
+        cache = LRUCache(max_entries=2)
+        cache.set("a", b"1")
+        cache.set("b", b"2")
+        assert cache.get("a") == b"1"
+        cache.set("c", b"3")
+
+        assert "b" not in cache
+        assert cache.get("a") == b"1"
+        assert cache.get("c") == b"3"
+        assert cache.stats()["evictions"] == 1
+
+    @pytest.mark.unit
+    def test_byte_budget(self):
+        """Test the byte bound evicts entries and rejects oversized values."""
+        cache = LRUCache(max_entries=10, max_bytes=10)
+        cache.set("a", b"x" * 6)
+        cache.set("b", b"y" * 6)
+
+        assert "a" not in cache
+        assert cache.stats()["bytes"] == 6
+        assert cache.set("huge", b"z" * 11) is False
+        assert "b" in cache
+
+    @pytest.mark.unit
+    def test_ttl_expiry(self, monkeypatch):
+        """Test entries older than the TTL are treated as misses."""
+        now = [1000.0]
+        monkeypatch.setattr("app.utils.cache.time.monotonic", lambda: now[0])
+        cache = LRUCache(max_entries=4, ttl=5)
+        cache.set("a", b"1")
+
+        now[0] += 4
+        assert cache.get("a") == b"1"
+        now[0] += 2
+        assert cache.get("a") is None
+        assert len(cache) == 0
+
+    @pytest.mark.unit
+    def test_invalidate_and_stats(self):
+        """Test predicate invalidation and the hit/miss counters."""
+        cache = LRUCache(max_entries=4)
+        cache.set((1, "pie"), b"1")
+        cache.set((1, "bar"), b"2")
+        cache.set((2, "pie"), b"3")
+
+        assert cache.invalidate(lambda key: key[0] == 1) == 2
+        assert cache.get((1, "pie")) is None
+        assert cache.get((2, "pie")) == b"3"
+
+        stats = cache.stats()
+        assert (stats["hits"], stats["misses"], stats["invalidations"]) == (1, 1, 2)
+        assert stats["hit_rate"] == 0.5
+
+
+class TestUserCache:
+    """Test the cached user loader."""
+
+    @pytest.mark.unit
+    def test_user_loader_reuses_cached_users(self, app, user, captured_queries):
+        """Test loads skip the database until the user changes or is deleted."""
+        cache = app.extensions["user_cache"]
+        user_id = User.query.filter_by(username="testuser").first().id
+
+        def load_in_new_request():
+            # Each request has its own app context and session
+            with app.app_context():
+                loaded = load_user(str(user_id))
+                return None if loaded is None else loaded.username
+
+        def user_reads():
+            return [sql for sql, _ in captured_queries if "FROM user" in sql]
+
+        captured_queries.clear()
+        for _ in range(3):
+            assert load_in_new_request() == "testuser"
+        assert len(user_reads()) == 1
+        assert (cache.stats()["hits"], cache.stats()["misses"]) == (2, 1)
+
+        # Adding a transaction is not a change to the user
+        owner = db.session.get(User, user_id)
+        db.session.add(
+            Transaction(
+                type="expense",
+                category="food",
+                amount=Decimal("3.00"),
+                description="Coffee",
+                user=owner,
+            )
+        )
+        db.session.commit()
+        assert user_id in cache
+
+        owner.set_password("NewPass456!")
+        db.session.commit()
+        assert user_id not in cache
+        captured_queries.clear()
+        assert load_in_new_request() == "testuser"
+        assert len(user_reads()) == 1
+
+        Transaction.query.filter_by(user_id=user_id).delete()
+        db.session.delete(owner)
+        db.session.commit()
+        assert user_id not in cache
+        assert load_in_new_request() is None
+
+
+class TestPasswords:
+    """Test password hashing settings and the hashing pool."""
+
+    @pytest.mark.unit
+    def test_hash_methods_compare_with_stored_hashes(self):
+        """Test methods are spelled out like the prefix werkzeug stores."""
+        assert canonical_hash_method("scrypt") == "scrypt:32768:8:1"
+        assert canonical_hash_method("pbkdf2:sha512").startswith("pbkdf2:sha512:")
+        stored = generate_password_hash("secret", method="pbkdf2:sha256:1000")
+        assert not needs_rehash(stored, "pbkdf2:sha256:1000")
+        assert needs_rehash(stored, "pbkdf2:sha256:2000")
+        assert needs_rehash(stored, "scrypt")
+        with pytest.raises(ValueError):
+            canonical_hash_method("md5")
+
+    @pytest.mark.unit
+    def test_pool_verifies_passwords(self):
+        """Test verification on the pool and its bound on pending checks."""
+        stored = generate_password_hash("secret", method="pbkdf2:sha256:1000")
+        hasher = PasswordHasher(workers=1, queue_size=1)
+        try:
+            assert hasher.verify(stored, "secret")
+            assert not hasher.verify(stored, "guess")
+
+            started, release = threading.Event(), threading.Event()
+            hasher._get_pool().submit(lambda: (started.set(), release.wait(5)))
+            started.wait(5)
+            with pytest.raises(QueueFull):
+                hasher.verify(stored, "secret")
+            release.set()
+        finally:
+            hasher.shutdown()
+
+
+class TestDatabaseSettings:
+    """Test the pool settings and SQLite pragmas applied to the engines."""
+
+    @pytest.mark.unit
+    def test_pragmas_run_on_connect(self, app):
+        """Test new connections are in WAL mode with the default pragmas."""
+        with db.engine.connect() as connection:
+
+            def pragma(name):
+                return connection.exec_driver_sql(f"PRAGMA {name}").scalar()
+
+            assert pragma("journal_mode") == "wal"
+            assert pragma("synchronous") == 1  # NORMAL
+            assert pragma("busy_timeout") == 5000
+            assert pragma("cache_size") == -65536
+
+    @pytest.mark.unit
+    def test_settings_from_config(self):
+        """Test overrides, disabled pragmas and pool keys."""
+        pragmas = sqlite_pragmas(
+            {"SQLITE_PRAGMAS": {"journal_mode": None, "synchronous": "full"}}
+        )
+        assert "journal_mode" not in pragmas
+        assert pragmas["synchronous"] == "full"
+        assert pragmas["busy_timeout"] == 5000
+        with pytest.raises(ValueError):
+            sqlite_pragmas({"SQLITE_PRAGMAS": {"cache_size": "1; DROP TABLE user"}})
+
+        assert engine_options(
+            {
+                "SQLALCHEMY_POOL_SIZE": 3,
+                "SQLALCHEMY_POOL_RECYCLE": 60,
+                "SQLALCHEMY_ENGINE_OPTIONS": {"pool_recycle": 30},
+            }
+        ) == {"pool_size": 3, "pool_recycle": 30}
+
+    @pytest.mark.unit
+    def test_pool_size_reaches_engine(self, tmp_path):
+        """Test the pool keys configure the engine create_app builds."""
+        app = create_app(
+            {
+                "TESTING": True,
+                "SQLALCHEMY_DATABASE_URI": f"sqlite:///{tmp_path / 'pool.db'}",
+                "SQLALCHEMY_POOL_SIZE": 7,
+                "SQLITE_PRAGMAS": {"journal_mode": "delete"},
+                "CHART_RENDER_WORKERS": 0,
+            }
+        )
+        with app.app_context():
+            assert db.engine.pool.size() == 7
+            with db.engine.connect() as connection:
+                mode = connection.exec_driver_sql("PRAGMA journal_mode").scalar()
+            assert mode == "delete"
+            db.engine.dispose()
+
+
+class TestChartOutput:
+    """Test the PNG output modes of the chart functions."""
+
+    @pytest.mark.unit
+    def test_output_modes(self, ledger):
+        """Test base64, bytes and buffer outputs carry the same PNG."""
+        user_id = ledger.id
+        png = create_spending_by_category_chart(user_id, output="bytes")
+        buffer = create_spending_by_category_chart(user_id, output="buffer")
+        encoded = create_spending_by_category_chart(user_id)
+
+        assert png.startswith(b"\x89PNG")
+        assert buffer.tell() == 0
+        assert buffer.getvalue() == png
+        assert base64.b64decode(encoded) == png
+
+    @pytest.mark.unit
+    def test_concurrent_rendering_leaves_no_global_figures(self):
+        """Test charts render in parallel threads without pyplot figures."""
+        data = {
+            "months": ["2024-01", "2024-02", "2024-03"],
+            "income": [3000.0, 3100.0, 2900.0],
+            "expenses": [2000.0, 2500.0, 2700.0],
+        }
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            pngs = list(
+                pool.map(lambda _: render_chart("income-vs-expenses", data), range(8))
+            )
+
+        assert all(png.startswith(b"\x89PNG") for png in pngs)
+        assert len(set(pngs)) == 1
+        assert "matplotlib.pyplot" not in sys.modules or not (
+            sys.modules["matplotlib.pyplot"].get_fignums()
+        )
+
+    @pytest.mark.unit
+    def test_unknown_output_mode(self, ledger):
+        """Test an unsupported output mode is rejected."""
+        with pytest.raises(ValueError):
+            create_spending_by_category_chart(ledger.id, output="svg")
+
+    @pytest.mark.unit
+    def test_app_boots_without_matplotlib(self):
+        """Test the web app imports Matplotlib and NumPy only to render."""
+        script = (
+            "import sys\n"
+            "from app import create_app\n"
+            "app = create_app({'SQLALCHEMY_DATABASE_URI': 'sqlite://'})\n"
+            "app.test_client().get('/auth/login')\n"
+            "print(sorted(m for m in ('matplotlib', 'numpy') if m in sys.modules))\n"
+        )
+        result = subprocess.run(
+            [sys.executable, "-c", script],
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        )
+        assert result.stdout.strip() == "[]"
+
+
+class TestWorkers:
+    """Test the bounded executor and the chart render pool."""
+
+    @pytest.mark.unit
+    def test_bounded_executor_rejects_when_full(self):
+        """Test submissions beyond max_pending fail fast and slots are freed."""
+        release = threading.Event()
+        pool = BoundedExecutor(ThreadPoolExecutor(max_workers=1), max_pending=2)
+        try:
+            first = pool.submit(release.wait)
+            pool.submit(release.wait)
+            with pytest.raises(QueueFull):
+                pool.submit(release.wait)
+
+            release.set()
+            first.result(timeout=5)
+            assert pool.run(sum, (1, 2), timeout=5) == 3
+        finally:
+            release.set()
+            pool.shutdown()
+
+    @pytest.mark.unit
+    def test_bounded_executor_timeout(self):
+        """Test run() raises TimeoutError for jobs that overrun."""
+        release = threading.Event()
+        pool = BoundedExecutor(ThreadPoolExecutor(max_workers=1), max_pending=1)
+        try:
+            with pytest.raises(FutureTimeoutError):
+                pool.run(release.wait, timeout=0.05)
+        finally:
+            release.set()
+            pool.shutdown()
+
+    @pytest.mark.slow
+    def test_render_pool_uses_worker_processes(self):
+        """Test charts render in a spawned worker from plain data."""
+        pool = ChartRenderPool(workers=1, timeout=120)
+        try:
+            png = pool.render(
+                "goals-progress",
+                {"names": ["Car"], "percentages": [40.0], "targets": [5000.0]},
+            )
+        finally:
+            pool.shutdown()
+
+        assert png.startswith(b"\x89PNG")
+
+
+class TestDashboardData:
+    """Test the consolidated home page dashboard provider."""
+
+    @pytest.mark.unit
+    def test_dashboard_totals_and_counts(self, ledger):
+        """Test totals, goal counts, recent transactions and active goals."""
+        user_id = ledger.id
+        for name, status in (
+            ("Car", "active"),
+            ("House", "overdue"),
+            ("Laptop", "completed"),
+            ("Boat", "cancelled"),
+        ):
+            db.session.add(
+                Goal(
+                    name=name,
+                    target_amount=Decimal("1000.00"),
+                    deadline=date.today() + timedelta(days=30),
+                    status=status,
+                    user_id=user_id,
+                )
+            )
+        db.session.commit()
+
+        data = get_dashboard_data(user_id)
+
+        assert data["financial_summary"] == (
+            Decimal("5800.00"),
+            Decimal("1500.25"),
+            Decimal("4299.75"),
+        )
+        assert data["goal_summary"].active_goals == 2
+        assert data["goal_summary"].completed_goals == 1
+        assert data["goal_summary"].total_goals == 4
+        assert len(data["recent_transactions"]) == 5
+        assert {goal.name for goal in data["active_goals"]} == {"Car", "House"}
+
+    @pytest.mark.unit
+    def test_dashboard_query_count(self, ledger, captured_queries):
+        """Test the dashboard needs three queries however much data exists."""
+        user_id = ledger.id
+        captured_queries.clear()
+
+        get_dashboard_data(user_id)
+
+        assert len(captured_queries) == 3
+
+    @pytest.mark.unit
+    def test_dashboard_empty_user(self, app):
+        """Test a user without data gets zero totals."""
+        user = User(username="emptydash", password_hash="hash")
+        db.session.add(user)
+        db.session.commit()
+
+        data = get_dashboard_data(user.id)
+
+        assert data["financial_summary"] == (0, 0, 0)
+        assert tuple(data["goal_summary"]) == (0, 0, 0)
+        assert data["recent_transactions"] == []
+        assert data["active_goals"] == []
+
+
+class TestTransactionHelper:
+    """Test filtered transaction list helpers."""
+
+    @pytest.mark.unit
+    def test_filtered_totals(self, ledger):
+        """Test totals and counts follow the same filters as the list."""
+        user_id = ledger.id
+        this_month = date.today().replace(day=1)
+
+        totals = TransactionHelper.calculate_filtered_totals(
+            TransactionHelper.build_filters(user_id)
+        )
+        assert totals == {
+            "count": 6,
+            "income": Decimal("5800.00"),
+            "expenses": Decimal("1500.25"),
+            "net": Decimal("4299.75"),
+        }
+
+        filters = TransactionHelper.build_filters(
+            user_id, transaction_type="expense", start_date=this_month
+        )
+        totals = TransactionHelper.calculate_filtered_totals(filters)
+        assert totals["count"] == 3
+        assert totals["income"] == 0
+        assert totals["expenses"] == Decimal("600.00")
+        assert Transaction.query.filter(*filters).count() == 3
+
+
+class TestKeysetPagination:
+    """Test cursor pagination over (date, created_at, id)."""
+
+    KEYSET = (Transaction.date, Transaction.created_at, Transaction.id)
+
+    @pytest.fixture
+    def history(self, app):
+        """Create 25 transactions, several sharing a date and timestamp."""
+        user = User(username="keyset", password_hash="hash")
+        db.session.add(user)
+        db.session.commit()
+        stamp = datetime(2024, 1, 1, 12, 0, 0)
+        for i in range(25):
+            db.session.add(
+                Transaction(
+                    type="expense",
+                    category="food",
+                    amount=Decimal("1.00"),
+                    description=f"Entry {i}",
+                    date=date(2024, 1, 1) + timedelta(days=i // 3),
+                    created_at=stamp,
+                    user_id=user.id,
+                )
+            )
+        db.session.commit()
+        return user.id
+
+    def expected_order(self, user_id):
+        return [
+            t.id
+            for t in Transaction.query.filter_by(user_id=user_id)
+            .order_by(*(column.desc() for column in self.KEYSET))
+            .all()
+        ]
+
+    @pytest.mark.unit
+    def test_walks_forward_and_back(self, history):
+        """Test next and prev cursors cover every row exactly once."""
+        query = Transaction.query.filter_by(user_id=history)
+
+        pages = [keyset_paginate(query, self.KEYSET, per_page=10)]
+        while pages[-1].has_next:
+            pages.append(keyset_paginate(query, self.KEYSET, 10, pages[-1].next_cursor))
+
+        assert [len(page.items) for page in pages] == [10, 10, 5]
+        assert not pages[0].has_prev
+        assert [t.id for page in pages for t in page.items] == self.expected_order(
+            history
+        )
+
+        back = keyset_paginate(query, self.KEYSET, 10, pages[-1].prev_cursor)
+        assert [t.id for t in back.items] == [t.id for t in pages[1].items]
+        assert back.has_next and back.has_prev
+
+        first = keyset_paginate(query, self.KEYSET, 10, back.prev_cursor)
+        assert [t.id for t in first.items] == [t.id for t in pages[0].items]
+        assert not first.has_prev
+
+    @pytest.mark.unit
+    def test_invalid_cursor(self, history):
+        """Test malformed tokens raise InvalidCursor."""
+        query = Transaction.query.filter_by(user_id=history)
+        for token in ("not-a-cursor", encode_cursor("x", [1, 2, 3])):
+            with pytest.raises(InvalidCursor):
+                keyset_paginate(query, self.KEYSET, 10, token)
+
+
+class TestImporter:
+    """Test the streaming bank export importer."""
+
+    @pytest.fixture
+    def importer_user(self, app):
+        user = User(username="importer", password_hash="hash")
+        db.session.add(user)
+        db.session.commit()
+        return user.id
+
+    @pytest.mark.unit
+    def test_csv_import_in_chunks(self, importer_user, captured_queries):
+        """Test valid rows are bulk inserted per chunk and bad rows reported."""
+        day = date.today() - timedelta(days=3)
+        future = date.today() + timedelta(days=3)
+        csv_text = "\n".join(
+            [
+                "Date,Description,Amount,Type,Category,Notes",
+                f"{day},Paycheck,2500.00,income,salary,",
+                f"{day},Groceries,-82.40,,Food & Dining,weekly shop",
+                f"{day},Cinema,15,expense,entertainment,",
+                f"{day},Bad amount,12.345,expense,food,",
+                f"{future},Future,10.00,expense,food,",
+                f"{day},Wrong category,10.00,income,food,",
+                f"{day},Bus pass,-45.00,,,",
+            ]
+        )
+        captured_queries.clear()
+
+        result = import_transactions(
+            importer_user, io.StringIO(csv_text), "csv", chunk_size=2
+        )
+
+        assert result.imported == 4
+        assert [line for line, _ in result.errors] == [5, 6, 7]
+        assert "2 decimal places" in result.errors[0][1]
+        assert "future" in result.errors[1][1]
+        assert "valid category" in result.errors[2][1]
+
+        rows = {
+            t.description: t for t in Transaction.query.filter_by(user_id=importer_user)
+        }
+        assert rows["Groceries"].type == "expense"
+        assert rows["Groceries"].category == "food"
+        assert rows["Groceries"].amount == Decimal("82.40")
+        assert rows["Bus pass"].category == "other_expense"
+        assert rows["Paycheck"].created_at is not None
+
+        inserts = [s for s, _ in captured_queries if s.startswith("INSERT INTO")]
+        assert sum('INSERT INTO "transaction"' in s for s in inserts) == 2
+
+        # Rollups and the data version follow the bulk writes
+        assert aggregate_transactions(
+            importer_user, group_by=("type",)
+        ) == aggregate_transactions(
+            importer_user, group_by=("type",), use_rollups=False
+        )
+        assert get_data_version(importer_user)[0] == 2
+
+    @pytest.mark.unit
+    def test_ofx_and_qif_import(self, importer_user):
+        """Test OFX (SGML) and QIF statements are parsed and signed by amount."""
+        day = date.today() - timedelta(days=10)
+        ofx = f"""OFXHEADER:100
+DATA:OFXSGML
+
+<OFX><BANKMSGSRSV1><STMTTRNRS><STMTRS><BANKTRANLIST>
+<STMTTRN>
+<TRNTYPE>DEBIT
+<DTPOSTED>{day:%Y%m%d}120000
+<TRNAMT>-23.50
+<NAME>Coffee Shop
+<MEMO>Card 1234
+</STMTTRN>
+<STMTTRN><TRNTYPE>CREDIT<DTPOSTED>{day:%Y%m%d}<TRNAMT>1200.00<NAME>Employer</STMTTRN>
+</BANKTRANLIST></STMTRS></STMTTRNRS></BANKMSGSRSV1></OFX>
+"""
+        qif = f"""!Type:Bank
+D{day:%m/%d/%Y}
+T-64.10
+PPower Company
+LBills:Electricity
+^
+D{day:%m/%d'%y}
+T300.00
+PSide project
+Lfreelance
+^
+"""
+        ofx_result = import_transactions(importer_user, io.StringIO(ofx), "ofx")
+        qif_result = import_transactions(importer_user, io.StringIO(qif), "qif")
+
+        assert (ofx_result.imported, ofx_result.failed) == (2, 0)
+        assert (qif_result.imported, qif_result.failed) == (2, 0)
+        rows = {
+            t.description: (t.type, t.category, t.amount, t.notes)
+            for t in Transaction.query.filter_by(user_id=importer_user)
+        }
+        assert rows == {
+            "Coffee Shop": ("expense", "other_expense", Decimal("23.50"), "Card 1234"),
+            "Employer": ("income", "other_income", Decimal("1200.00"), None),
+            "Power Company": ("expense", "bills", Decimal("64.10"), None),
+            "Side project": ("income", "freelance", Decimal("300.00"), None),
+        }
+
+    @pytest.mark.unit
+    def test_import_command(self, importer_user, runner, tmp_path):
+        """Test the CLI import reports counts and row errors."""
+        day = date.today() - timedelta(days=1)
+        path = tmp_path / "export.csv"
+        path.write_text(f"date,description,amount\n{day},Refund,19.99\n{day},x,5.00\n")
+
+        result = runner.invoke(
+            args=["transactions", "import", str(path), "--user-id", str(importer_user)]
+        )
+
+        assert result.exit_code == 0
+        assert "Imported 1 transactions, skipped 1 rows" in result.output
+        assert "line 3:" in result.output
+
+
+class TestExporter:
+    """Test the streaming transaction exporter."""
+
+    @pytest.mark.unit
+    def test_csv_export_round_trips_through_importer(self, app):
+        """Test a CSV export in small batches imports back unchanged."""
+        source = User(username="source", password_hash="hash")
+        target = User(username="target", password_hash="hash")
+        db.session.add_all([source, target])
+        db.session.commit()
+        for i in range(7):
+            db.session.add(
+                Transaction(
+                    type="expense",
+                    category="food",
+                    amount=Decimal("3.10") + i,
+                    description=f'Lunch, "day" {i}',
+                    notes="with team" if i == 3 else None,
+                    date=date.today() - timedelta(days=i),
+                    user_id=source.id,
+                )
+            )
+        db.session.commit()
+
+        filters = TransactionHelper.build_filters(source.id)
+        batches = list(exporter.iter_batches(filters, batch_size=3))
+        assert [len(batch) for batch in batches] == [3, 3, 1]
+
+        chunks = list(exporter.export_chunks(filters, "csv", batch_size=3))
+        assert len(chunks) == 3
+        result = import_transactions(target.id, io.StringIO("".join(chunks)), "csv")
+        assert (result.imported, result.failed) == (7, 0)
+
+        def snapshot(user_id):
+            return sorted(
+                (t.date, t.type, t.category, t.amount, t.description, t.notes)
+                for t in Transaction.query.filter_by(user_id=user_id)
+            )
+
+        assert snapshot(target.id) == snapshot(source.id)
+
+        with pytest.raises(ValueError):
+            exporter.export_chunks(filters, "xlsx")
+
+
+class TestMoney:
+    """Test the integer-cents money type and its storage."""
+
+    @pytest.mark.unit
+    def test_money_arithmetic(self):
+        """Test Money is exact and interoperates with plain numbers."""
+        assert Money.coerce("12.345") == Money(1235)
+        assert Money.coerce(0.1) + Money.coerce(0.2) == Decimal("0.30")
+        assert Money.sum(["0.10"] * 1000) == 100
+        assert Money(1999) - 20 == Money(-1)
+        assert str(Money(-1)) == "-0.01"
+        assert f"{Money(123456789):,.2f}" == "1,234,567.89"
+        assert Money(250) / Money(1000) == Decimal("0.25")
+        assert Money(1000) * 3 == Money(3000)
+        assert hash(Money(1250)) == hash(Decimal("12.50"))
+        assert not Money(0)
+        assert max(Money(-5), Money(0)) == 0
+        with pytest.raises(TypeError):
+            Money.coerce("abc")
+
+    @pytest.mark.unit
+    def test_models_hold_money(self, app):
+        """Test amounts are Money on assignment and after a reload."""
+        user = User(username="saver", password_hash="hash")
+        db.session.add(user)
+        db.session.commit()
+        goal = Goal(
+            name="Bike",
+            target_amount=Decimal("300.00"),
+            deadline=date.today() + timedelta(days=30),
+            user_id=user.id,
+        )
+        db.session.add(goal)
+        db.session.commit()
+        goal.add_progress("75.5")
+        db.session.commit()
+        db.session.expire_all()
+
+        assert isinstance(goal.current_amount, Money)
+        assert goal.current_amount == Decimal("75.50")
+        assert goal.remaining_amount == Money(22450)
+        assert goal.progress_percentage == pytest.approx(25.1666, rel=1e-3)
+        assert format_currency(goal.target_amount) == "$300.00"
+
+    @pytest.mark.unit
+    def test_convert_to_cents_storage(self, app, runner):
+        """Test the convert command and reading amounts back as cents."""
+        user = User(username="cents", password_hash="hash")
+        db.session.add(user)
+        db.session.commit()
+        for amount in ("0.10", "0.20", "1234.56"):
+            db.session.add(
+                Transaction(
+                    type="expense",
+                    category="food",
+                    amount=Decimal(amount),
+                    description="Snack",
+                    date=date.today(),
+                    user_id=user.id,
+                )
+            )
+        db.session.commit()
+        user_id = user.id
+        table = Transaction.__table__
+
+        result = runner.invoke(args=["money", "convert", "--to", "cents"])
+        assert result.exit_code == 0
+        assert "Converted goal, monthly_rollup, transaction" in result.output
+        with db.engine.connect() as connection:
+            assert stored_money_storage(connection, table, table.c.amount) == "cents"
+            stored = connection.exec_driver_sql(
+                'SELECT amount FROM "transaction" ORDER BY id'
+            ).scalars()
+            assert list(stored) == [10, 20, 123456]
+
+        result = runner.invoke(args=["money", "convert", "--to", "cents"])
+        assert "already stored as cents" in result.output
+
+        cents_app = create_app(
+            {
+                "TESTING": True,
+                "SQLALCHEMY_DATABASE_URI": app.config["SQLALCHEMY_DATABASE_URI"],
+                "MONEY_STORAGE": "cents",
+                "CHART_RENDER_WORKERS": 0,
+            }
+        )
+        with cents_app.app_context():
+            totals = TransactionHelper.calculate_filtered_totals(
+                TransactionHelper.build_filters(user_id)
+            )
+            assert totals["expenses"] == Money(123486)
+            assert aggregate_transactions(user_id)[0].total == Money(123486)
+            db.engine.dispose()
+
+        result = runner.invoke(args=["money", "convert", "--to", "decimal"])
+        assert result.exit_code == 0
+        db.session.expire_all()
+        amounts = [t.amount for t in Transaction.query.order_by(Transaction.id)]
+        assert amounts == [Decimal("0.10"), Decimal("0.20"), Decimal("1234.56")]
+
+
+class TestJSONProvider:
+    """Test the money-aware JSON provider and its encoders."""
+
+    @pytest.mark.unit
+    def test_encoders_agree(self, app):
+        """Test both encoders turn money, dates and fragments into the same JSON."""
+        import numpy as np
+
+        payload = {
+            "amount": Money(1234),
+            "ratio": Decimal("12.5"),
+            "day": date(2024, 2, 29),
+            "colors": JSONFragment(["#fff", "#000"]),
+            "counts": np.array([1, 2], dtype=np.int64),
+            "total": np.int64(7),
+        }
+        expected = {
+            "amount": 12.34,
+            "ratio": 12.5,
+            "day": "2024-02-29",
+            "colors": ["#fff", "#000"],
+            "counts": [1, 2],
+            "total": 7,
+        }
+
+        encoders = ["stdlib"]
+        if json_provider.orjson is not None:
+            encoders.append("orjson")
+        for encoder in encoders:
+            app.config["JSON_ENCODER"] = encoder
+            provider = FinanceJSONProvider(app)
+            assert provider.use_orjson == (encoder == "orjson")
+            assert provider.loads(provider.dumps(payload)) == expected
+            with app.test_request_context():
+                response = provider.response(payload)
+            assert response.get_json() == expected
+
+        app.config["JSON_ENCODER"] = "simdjson"
+        with pytest.raises(ValueError):
+            FinanceJSONProvider(app)
+
+    @pytest.mark.unit
+    def test_fragments_compare_by_value(self):
+        """Test a fragment stands in for its value in comparisons."""
+        fragment = JSONFragment({"b": 1, "a": [True, None]})
+        assert fragment.encoded == '{"a":[true,null],"b":1}'
+        assert fragment == {"a": [True, None], "b": 1}
+        assert fragment == JSONFragment({"a": [True, None], "b": 1})